@@ -0,0 +1 @@
+"""Benchmarks of inels-mqtt hot paths."""
@@ -0,0 +1,78 @@
+"""Threads and publish latency of many sites connected from one process.
+
+Every site has its own client and broker connection. With loop_start
+each client runs its own network thread, in the pool all of them share
+two network loops. Each site subscribes one status topic and publishes
+to it once, reports added threads, publish latency and delivered
+messages. Needs a running broker.
+
+    python -m benchmarks.broker_pool [host] [port]
+"""
+import sys
+import threading
+import time
+
+from inelsmqtt import InelsMqtt
+from inelsmqtt.const import MQTT_HOST, MQTT_PORT, MQTT_TIMEOUT
+from inelsmqtt.pool import BrokerPool
+
+SITES = 50
+LOOPS = 2
+
+
+def topic_of(index: int) -> str:
+    """Status topic of the site."""
+    return f"inels/status/{index:012X}/02/000001"
+
+
+def run(name: str, config: dict, pool: BrokerPool = None) -> None:
+    """Connect all sites, publish once per site and print results."""
+    threads = threading.active_count()
+    received = set()
+    clients = []
+
+    for index in range(SITES):
+        if pool is not None:
+            mqtt = pool.add(f"site{index}", config)
+        else:
+            mqtt = InelsMqtt(config)
+        mqtt.subscribe_listener(
+            topic_of(index), lambda payload, index=index: received.add(index)
+        )
+        mqtt.subscribe_many([topic_of(index)], wait=False)
+        clients.append(mqtt)
+
+    start = time.perf_counter()
+    for index, mqtt in enumerate(clients):
+        mqtt.publish(topic_of(index), b"02\n01\n", retain=False)
+    elapsed = time.perf_counter() - start
+
+    deadline = time.monotonic() + 2
+    while len(received) < SITES and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    print(
+        f"{name:<10} threads {threading.active_count() - threads:4d}"
+        f" {elapsed / SITES * 1e3:6.2f} ms/publish"
+        f" delivered {len(received):3d}/{SITES}"
+    )
+
+    if pool is not None:
+        pool.close()
+    else:
+        for mqtt in clients:
+            mqtt.close()
+
+
+def main() -> None:
+    """Run benchmark."""
+    host = sys.argv[1] if len(sys.argv) > 1 else "127.0.0.1"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 1883
+    config = {MQTT_HOST: host, MQTT_PORT: port, MQTT_TIMEOUT: 3}
+
+    run("loop_start", config)
+    run("pool", config, BrokerPool(loops=LOOPS))
+
+
+if __name__ == "__main__":
+    main()
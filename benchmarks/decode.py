@@ -0,0 +1,59 @@
+"""Decoding time of one status payload for every supported element.
+
+Column "decode" builds DeviceValue every time, "device" goes through
+create_value used by Device, which shares values of cacheable elements.
+
+    python -m benchmarks.decode
+"""
+import timeit
+
+from inelsmqtt.const import DEVICE_TYPE_DICT, INELS_DEVICE_TYPE_DICT, Element
+from inelsmqtt.util import DeviceValue, create_value
+
+ROUNDS = 20_000
+REPEAT = 5
+
+PAYLOADS = {
+    Element.RFSC_61: b"02\n01\n",
+    Element.RFJA_12: b"03\n01\n",
+    Element.RFDAC_71B: b"D1\n1F\n",
+    Element.RFSTI_11B: b"07\n01\n92\n09\n",
+    Element.RFATV_2: b"50\n34\n00\n40\n00\n",
+    Element.RFTI_10B: b"00\nB4\n0A\n6E\n0A\n",
+    Element.RFGB_40: b"20\n01\nDA\n23\n54\n",
+    Element.RFTC_10_G: b"2A\n00\n80\n00\n00\n",
+}
+
+PLATFORMS = {
+    INELS_DEVICE_TYPE_DICT[dev_type]: platform
+    for dev_type, platform in DEVICE_TYPE_DICT.items()
+}
+
+
+def main() -> None:
+    """Run benchmark."""
+    total = [0.0, 0.0]
+    print(f"{'element':<10} {'decode':>8} {'device':>8} us/message")
+    for element, payload in PAYLOADS.items():
+        platform = PLATFORMS[element]
+
+        def decode() -> DeviceValue:
+            return DeviceValue(platform, element, inels_value=payload)
+
+        def device() -> DeviceValue:
+            return create_value(platform, element, payload)
+
+        elapsed = [
+            timeit.timeit(fnc, number=ROUNDS) / ROUNDS for fnc in (decode, device)
+        ]
+        total = [a + b for a, b in zip(total, elapsed)]
+        print(f"{element.value:<10} {elapsed[0] * 1e6:8.2f} {elapsed[1] * 1e6:8.2f}")
+
+    print(
+        f"{'mean':<10} {total[0] / len(PAYLOADS) * 1e6:8.2f} "
+        f"{total[1] / len(PAYLOADS) * 1e6:8.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
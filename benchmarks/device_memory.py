@@ -0,0 +1,72 @@
+"""Memory kept by one Device in a very large installation.
+
+Builds 50k switches, lights and sensors on a broker stand-in which keeps
+nothing, so all measured memory belongs to the devices, and reports
+bytes per device and time to create one.
+
+    python -m benchmarks.device_memory
+"""
+import gc
+import time
+import tracemalloc
+
+from inelsmqtt.devices import Device
+from inelsmqtt.devices.light import Light
+from inelsmqtt.devices.sensor import Sensor
+from inelsmqtt.devices.switch import Switch
+
+DEVICES = 50_000
+COORDINATORS = 50
+
+KINDS = ((Switch, "02"), (Light, "05"), (Sensor, "10"))
+
+
+class NullMqtt:
+    """Broker which accepts subscriptions without keeping them."""
+
+    def is_subscribed(self, topic: str) -> bool:
+        """Availability was subscribed in bulk."""
+        return True
+
+    def subscribe(self, *args) -> None:
+        """Nothing to subscribe."""
+
+    def subscribe_listener(self, topic: str, fnc) -> None:
+        """Listener is not kept."""
+
+
+def topics() -> list[tuple[type, str]]:
+    """Status topics of all devices, as they come from the broker."""
+    return [
+        (cls, f"inels/status/{uid % COORDINATORS:012X}/{dev_type}/{uid:06X}")
+        for uid in range(DEVICES)
+        for cls, dev_type in (KINDS[uid % len(KINDS)],)
+    ]
+
+
+def main() -> None:
+    """Run benchmark."""
+    mqtt = NullMqtt()
+
+    start = time.perf_counter()
+    devices: list[Device] = [cls(mqtt, topic) for cls, topic in topics()]
+    elapsed = time.perf_counter() - start
+    del devices
+
+    items = topics()
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    devices = [cls(mqtt, topic) for cls, topic in items]
+    for device in devices:
+        device.info()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"devices  {len(devices):8d}")
+    print(f"memory   {(after - before) / DEVICES:8.0f} B/device")
+    print(f"create   {elapsed / DEVICES * 1e6:8.2f} us/device")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Encoding time of brightness commands while the slider is dragged.
+
+Compares the former linear search over the values of the dimmer table
+with the precomputed brightness table. Column "encode" is the codec
+alone, "device" is the whole DeviceValue created by set_ha_value.
+
+    python -m benchmarks.dimmer_slider
+"""
+import timeit
+
+from inelsmqtt.codec import get_codec
+from inelsmqtt.const import DEVICE_TYPE_05_HEX_VALUES, Element, Platform
+from inelsmqtt.util import DeviceValue
+
+ROUNDS = 200
+REPEAT = 5
+
+# slider dragged up and down by one percent, then a few fractional steps
+STREAM = [*range(101), *range(100, -1, -1), 12.5, 33.3, 57.8, 99.9]
+
+
+def linear(ha_value: int, last_value: int) -> str:
+    """Former lookup, lists of keys and values built for every command."""
+    keys = list(DEVICE_TYPE_05_HEX_VALUES.keys())
+    vals = list(DEVICE_TYPE_05_HEX_VALUES.values())
+    try:
+        return keys[vals.index(round(ha_value, -1))]
+    except ValueError:
+        return keys[vals.index(last_value)]
+
+
+def main() -> None:
+    """Run benchmark."""
+    encode = get_codec(Element.RFDAC_71B).encode
+
+    def former() -> None:
+        for value in STREAM:
+            linear(value, 50)
+
+    def table() -> None:
+        for value in STREAM:
+            encode(value, 50)
+
+    def device() -> None:
+        for value in STREAM:
+            DeviceValue(
+                Platform.LIGHT, Element.RFDAC_71B, ha_value=value, last_value=50
+            )
+
+    commands = ROUNDS * len(STREAM)
+    for name, fnc in (("linear", former), ("encode", table), ("device", device)):
+        elapsed = min(timeit.repeat(fnc, number=ROUNDS, repeat=REPEAT))
+        print(f"{name:<8} {elapsed / commands * 1e6:8.3f} us/command")
+
+
+if __name__ == "__main__":
+    main()
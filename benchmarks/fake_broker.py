@@ -0,0 +1,81 @@
+"""In-process stand-in for the paho client used by the benchmarks.
+
+The fake answers CONNACK and PUBACK from a timer thread after a fixed
+round trip time, so the benchmarks measure the library and not the network.
+"""
+import itertools
+import threading
+
+from unittest.mock import patch
+
+import paho.mqtt.client as mqtt
+
+from inelsmqtt.const import MQTT_HOST, MQTT_PORT
+
+CONFIG = {MQTT_HOST: "127.0.0.1", MQTT_PORT: 1883}
+
+
+class FakeClient:
+    """Minimal paho client answering after `rtt` seconds."""
+
+    rtt = 0.002
+
+    def __init__(self, *args, **kwargs) -> None:
+        self.on_connect = None
+        self.on_publish = None
+        self.on_subscribe = None
+        self.on_disconnect = None
+        self.on_message = None
+        self._connected = False
+        self._mid = itertools.count(1)
+
+    def enable_logger(self, *args) -> None:
+        """Logging is not interesting for the benchmark."""
+
+    def username_pw_set(self, *args) -> None:
+        """Credentials are not checked."""
+
+    def max_inflight_messages_set(self, *args) -> None:
+        """Inflight window is not limited by the fake."""
+
+    def is_connected(self) -> bool:
+        """Connection state."""
+        return self._connected
+
+    def connect(self, *args, **kwargs) -> int:
+        """Answer CONNACK after one round trip."""
+        self._connected = True
+        self._later(self.on_connect, self, None, {}, mqtt.CONNACK_ACCEPTED)
+        return mqtt.MQTT_ERR_SUCCESS
+
+    def loop_start(self) -> None:
+        """Network loop is simulated with timers."""
+
+    def loop_stop(self) -> None:
+        """Network loop is simulated with timers."""
+
+    def disconnect(self) -> None:
+        """Drop connection."""
+        self._connected = False
+
+    def publish(self, *args, **kwargs) -> mqtt.MQTTMessageInfo:
+        """Answer PUBACK after one round trip."""
+        info = mqtt.MQTTMessageInfo(next(self._mid))
+        self._later(self.on_publish, self, None, info.mid)
+        return info
+
+    def subscribe(self, *args, **kwargs) -> tuple[int, int]:
+        """Answer SUBACK after one round trip."""
+        mid = next(self._mid)
+        self._later(self.on_subscribe, self, None, mid, (0,))
+        return mqtt.MQTT_ERR_SUCCESS, mid
+
+    def _later(self, fnc, *args) -> None:
+        """Call paho callback from another thread like the network loop does."""
+        if fnc is not None:
+            threading.Timer(self.rtt, fnc, args).start()
+
+
+def fake_client():
+    """Patch paho client used by inelsmqtt with the fake one."""
+    return patch("inelsmqtt.mqtt.Client", FakeClient)
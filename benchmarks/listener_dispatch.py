@@ -0,0 +1,54 @@
+"""Dispatch time of one message with 10k registered listeners.
+
+Compares the topic trie with the former exact dict lookup (no wildcard
+support) and with a linear scan over wildcard filters.
+
+    python -m benchmarks.listener_dispatch
+"""
+import timeit
+
+from paho.mqtt.client import topic_matches_sub
+
+from inelsmqtt.router import TopicRouter
+
+LISTENERS = 10_000
+COORDINATORS = 20
+ROUNDS = 20_000
+
+TOPICS = [
+    f"inels/status/{uid % COORDINATORS:012X}/02/{uid:06X}" for uid in range(LISTENERS)
+]
+
+
+def listener(payload) -> None:
+    """Listener doing nothing."""
+
+
+def main() -> None:
+    """Run benchmark."""
+    router = TopicRouter()
+    filters = {}
+    for topic in TOPICS:
+        router.add(topic, listener)
+        filters[topic] = listener
+    router.add(f"inels/status/{0:012X}/#", listener)
+    filters[f"inels/status/{0:012X}/#"] = listener
+
+    topic = TOPICS[LISTENERS // 2]
+
+    def scan() -> list:
+        return [fnc for sub, fnc in filters.items() if topic_matches_sub(sub, topic)]
+
+    assert len(router.match(topic)) == len(scan())
+
+    for name, fnc, rounds in (
+        ("dict", lambda: filters.get(topic), ROUNDS),
+        ("trie", lambda: router.match(topic), ROUNDS),
+        ("linear", scan, 20),
+    ):
+        elapsed = timeit.timeit(fnc, number=rounds)
+        print(f"{name:<8} {elapsed / rounds * 1e6:10.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Latency of InelsMqtt.publish with a broker acknowledging in 2 ms.
+
+Compares the former 100 ms sleep-polling wait with the event driven one.
+
+    python -m benchmarks.publish_latency
+"""
+import statistics
+import threading
+import time
+
+from inelsmqtt import InelsMqtt
+
+from benchmarks.fake_broker import CONFIG, FakeClient, fake_client
+
+ROUNDS = 50
+
+
+def polling_publish(client: FakeClient) -> bool:
+    """Replica of the former wait loop."""
+    published = threading.Event()
+    client.on_publish = lambda *args: published.set()
+    client.publish("inels/set/1/02/1", "01\n00\n00\n")
+
+    start = time.monotonic()
+    while not published.is_set():
+        if time.monotonic() - start > 5:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def measure(fnc) -> list[float]:
+    """Latencies in milliseconds."""
+    result = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fnc()
+        result.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def report(name: str, samples: list[float]) -> None:
+    """Print latency distribution."""
+    pct = statistics.quantiles(samples, n=100, method="inclusive")
+    print(
+        f"{name:<10} p50 {pct[49]:7.2f} ms  p90 {pct[89]:7.2f} ms  "
+        f"p99 {pct[98]:7.2f} ms  max {max(samples):7.2f} ms"
+    )
+
+
+def main() -> None:
+    """Run benchmark."""
+    with fake_client():
+        client = FakeClient()
+        report("polling", measure(lambda: polling_publish(client)))
+
+        mqtt = InelsMqtt(CONFIG)
+        report("event", measure(lambda: mqtt.publish("inels/set/1/02/1", "01")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Scene switching many devices through the publish scheduler.
+
+Three coordinators with 20 devices each first get a background status
+poll of every device, then a scene sets every device three times, like
+a dimmer slider. The scheduler sends 20 messages per second to every
+coordinator. Reports how many messages reached the broker, how long
+user commands and polls waited and the queue stats of coordinators.
+
+    python -m benchmarks.publish_scheduler
+"""
+import time
+
+from inelsmqtt import PublishAck
+from inelsmqtt.const import PublishPriority
+from inelsmqtt.scheduler import PublishScheduler
+
+COORDINATORS = ("2C4A4F103290", "4254524524", "1A2B3C4D5E")
+DEVICES = 20
+REPEAT = 3
+RATE = 20
+BURST = 5
+
+
+def main() -> None:
+    """Run benchmark."""
+    sent: dict[str, float] = {}
+
+    def publish(topic, payload, qos, retain, properties) -> PublishAck:
+        sent[topic] = time.monotonic()
+        ack = PublishAck(len(sent))
+        ack._resolve(True)  # pylint: disable=protected-access
+        return ack
+
+    scheduler = PublishScheduler(publish, RATE, BURST)
+    start = time.monotonic()
+
+    polls, commands = [], []
+    for serial in COORDINATORS:
+        for uid in range(DEVICES):
+            topic = f"inels/set/{serial}/05/{uid:06X}/poll"
+            polls.append(
+                (
+                    topic,
+                    scheduler.submit(topic, b"", priority=PublishPriority.BACKGROUND),
+                )
+            )
+    for level in range(REPEAT):
+        for serial in COORDINATORS:
+            for uid in range(DEVICES):
+                topic = f"inels/set/{serial}/05/{uid:06X}"
+                commands.append(
+                    (
+                        topic,
+                        scheduler.submit(
+                            topic, f"{level}\n".encode(), priority=PublishPriority.USER
+                        ),
+                    )
+                )
+
+    for _, ack in polls + commands:
+        ack.wait()
+    elapsed = time.monotonic() - start
+    scheduler.stop()
+
+    def waited(items) -> float:
+        topics = {topic for topic, _ in items}
+        return sum(sent[topic] - start for topic in topics) / len(topics)
+
+    print(f"submitted {len(polls) + len(commands):6d} sent {len(sent):6d}")
+    print(f"elapsed   {elapsed:6.2f} s")
+    print(f"user wait {waited(commands) * 1e3:6.0f} ms")
+    print(f"poll wait {waited(polls) * 1e3:6.0f} ms")
+    for serial, stats in scheduler.stats().items():
+        print(
+            f"{serial:<13} sent {stats.sent:3d} collapsed {stats.collapsed:3d}"
+            f" wait {stats.wait * 1e3:5.0f} ms max {stats.max_wait * 1e3:5.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
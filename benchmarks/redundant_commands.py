@@ -0,0 +1,80 @@
+"""Automation asserting "off" on 500 lights which already are off.
+
+Every light has a confirmed off status. Each round sends off to all of
+them, once with redundant commands suppressed and once without. Reports
+published messages and time spent in set_ha_value per light.
+
+    python -m benchmarks.redundant_commands
+"""
+import time
+
+from inelsmqtt.devices.light import Light
+
+LIGHTS = 500
+ROUNDS = 20
+OFF_STATUS = b"D8\nEF\n"
+
+
+class StubMqtt:
+    """Broker keeping messages and counting publishes."""
+
+    def __init__(self, suppress_redundant: bool) -> None:
+        """Create broker without messages."""
+        self.suppress_redundant = suppress_redundant
+        self.suppressed_publishes = 0
+        self.published = 0
+        self.__messages: dict[str, bytes] = {}
+
+    def is_subscribed(self, topic: str) -> bool:
+        """Availability was subscribed in bulk."""
+        return True
+
+    def subscribe_listener(self, topic: str, fnc) -> None:
+        """Listener is not kept."""
+
+    def messages(self) -> dict[str, bytes]:
+        """Stored payloads."""
+        return self.__messages
+
+    def publish(self, topic, payload, qos=0, retain=True, priority=None) -> bool:
+        """Count message, broker acknowledges at once."""
+        self.published += 1
+        return True
+
+    def publish_suppressed(self, topic: str) -> None:
+        """Count suppressed message."""
+        self.suppressed_publishes += 1
+
+
+def run(suppress_redundant: bool) -> tuple[float, StubMqtt]:
+    """Seconds per set_ha_value."""
+    mqtt = StubMqtt(suppress_redundant)
+    lights = []
+    for uid in range(LIGHTS):
+        light = Light(mqtt, f"inels/status/2C4A4F103290/05/{uid:06X}")
+        mqtt.messages()[light.state_topic] = OFF_STATUS
+        light.get_value()
+        lights.append(light)
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for light in lights:
+            light.set_ha_value(0)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / (ROUNDS * LIGHTS), mqtt
+
+
+def main() -> None:
+    """Run benchmark."""
+    for name, suppress in (("publish", False), ("suppress", True)):
+        elapsed, mqtt = run(suppress)
+        print(
+            f"{name:<9} published {mqtt.published:6d}"
+            f" suppressed {mqtt.suppressed_publishes:6d}"
+            f" {elapsed * 1e6:6.2f} us/command"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Time to switch a 40 light scene with a broker acknowledging in 2 ms.
+
+Publishing one by one pays one round trip per light, pipelined publishes
+pay about one round trip for the whole scene.
+
+    python -m benchmarks.scene_publish
+"""
+import time
+
+from inelsmqtt import InelsMqtt
+from inelsmqtt.const import MQTT_MAX_INFLIGHT
+
+from benchmarks.fake_broker import CONFIG, fake_client
+
+LIGHTS = [f"inels/set/2C4A4F103290/05/{uid:06X}" for uid in range(40)]
+
+
+def sequential(mqtt: InelsMqtt) -> bool:
+    """Wait for every light before the next one."""
+    return all(mqtt.publish(topic, "01 8A CF") for topic in LIGHTS)
+
+
+def pipelined(mqtt: InelsMqtt) -> bool:
+    """Send all lights, then wait for all acknowledges."""
+    acks = [mqtt.publish_nowait(topic, "01 8A CF") for topic in LIGHTS]
+    return all(ack.wait(5) for ack in acks)
+
+
+def main() -> None:
+    """Run benchmark."""
+    with fake_client():
+        mqtt = InelsMqtt({**CONFIG, MQTT_MAX_INFLIGHT: len(LIGHTS)})
+        mqtt.publish(LIGHTS[0], "01 8A CF")
+
+        for fnc in (sequential, pipelined):
+            start = time.perf_counter()
+            assert fnc(mqtt)
+            print(f"{fnc.__name__:<10} {(time.perf_counter() - start) * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time the network thread spends per message when a listener is slow.
+
+Listener of every device sleeps 200 us, like a database write. Messages
+of 200 devices are passed to the message callback as fast as paho would
+read them. Inline the network thread waits for every listener, with
+dispatch it only queues the message. With latest the listeners get only
+the newest payload of every device.
+
+    python -m benchmarks.slow_listener
+"""
+import time
+
+from inelsmqtt import InelsMqtt
+from inelsmqtt.const import (
+    MQTT_DISPATCH_COALESCE,
+    MQTT_DISPATCH_OVERFLOW,
+    MQTT_DISPATCH_QUEUE_SIZE,
+    MQTT_DISPATCH_WORKERS,
+    MQTT_HOST,
+    MQTT_PORT,
+)
+
+MESSAGES = 5_000
+DEVICES = 200
+LISTENER_DELAY = 0.0002
+
+
+class Message:
+    """Paho message stand-in."""
+
+    __slots__ = ("topic", "payload")
+
+    def __init__(self, topic: str, payload: bytes) -> None:
+        """Create message."""
+        self.topic = topic
+        self.payload = payload
+
+
+def run(**config) -> tuple[float, InelsMqtt]:
+    """Seconds of the network thread per message."""
+    mqtt = InelsMqtt({MQTT_HOST: "localhost", MQTT_PORT: 1883, **config})
+    on_message = mqtt._InelsMqtt__on_message  # pylint: disable=protected-access
+    mqtt.subscribe_listener("inels/status/#", lambda _: time.sleep(LISTENER_DELAY))
+
+    messages = [
+        Message(f"inels/status/2C4A4F103290/02/{uid % DEVICES:06X}", b"02\n01\n")
+        for uid in range(MESSAGES)
+    ]
+
+    start = time.perf_counter()
+    for msg in messages:
+        on_message(None, None, msg)
+    elapsed = time.perf_counter() - start
+
+    mqtt.close()
+    return elapsed / MESSAGES, mqtt
+
+
+def main() -> None:
+    """Run benchmark."""
+    for name, config in (
+        ("inline", {}),
+        ("block", {MQTT_DISPATCH_WORKERS: 4}),
+        (
+            "drop",
+            {
+                MQTT_DISPATCH_WORKERS: 4,
+                MQTT_DISPATCH_QUEUE_SIZE: 100,
+                MQTT_DISPATCH_OVERFLOW: "drop_oldest",
+            },
+        ),
+        (
+            "coalesce",
+            {
+                MQTT_DISPATCH_WORKERS: 4,
+                MQTT_DISPATCH_QUEUE_SIZE: 400,
+                MQTT_DISPATCH_OVERFLOW: "coalesce",
+            },
+        ),
+        ("latest", {MQTT_DISPATCH_WORKERS: 4, MQTT_DISPATCH_COALESCE: True}),
+    ):
+        elapsed, mqtt = run(**config)
+        stats = mqtt.dispatch_stats
+        line = f"{name:<9} {elapsed * 1e6:8.1f} us/msg"
+        if stats is not None:
+            line += (
+                f"  handled {stats.dispatched:5d}"
+                f"  max depth {stats.max_depth:5d}"
+                f"  max lag {stats.max_lag * 1e3:7.1f} ms"
+                f"  dropped {stats.dropped:5d}  coalesced {stats.coalesced:5d}"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
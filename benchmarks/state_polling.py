@@ -0,0 +1,89 @@
+"""Cost of polling state of 10k devices, e.g. by HA after a restart.
+
+Every device got one message. Column "first" is the first read after
+the message, which decodes it, "again" are the following reads served
+from the stored values. Column "decode" decodes the payload on every
+read, as last_values did before.
+
+    python -m benchmarks.state_polling
+"""
+import timeit
+
+from inelsmqtt.availability import AvailabilityTable
+from inelsmqtt.devices import Device
+from inelsmqtt.devices.sensor import Sensor
+from inelsmqtt.devices.switch import Switch
+from inelsmqtt.util import create_value
+
+DEVICES = 10_000
+REPEAT = 5
+
+KINDS = (
+    (Switch, "02", b"02\n01\n"),
+    (Sensor, "10", b"00\nB4\n0A\n6E\n0A\n"),
+)
+
+
+class StubMqtt:
+    """Broker keeping messages and availability only."""
+
+    def __init__(self) -> None:
+        self.availability = AvailabilityTable()
+        self.__messages: dict[str, bytes] = {}
+
+    def is_subscribed(self, topic: str) -> bool:
+        """Availability was subscribed in bulk."""
+        return True
+
+    def subscribe_listener(self, topic: str, fnc) -> None:
+        """Listener is not kept."""
+
+    def messages(self) -> dict[str, bytes]:
+        """Stored payloads."""
+        return self.__messages
+
+    def last_value(self, topic: str) -> bytes:
+        """Previous payload is the same as the current one."""
+        return self.__messages.get(topic)
+
+
+def main() -> None:
+    """Run benchmark."""
+    mqtt = StubMqtt()
+    devices: list[Device] = []
+    for uid in range(DEVICES):
+        cls, dev_type, payload = KINDS[uid % len(KINDS)]
+        device = cls(mqtt, f"inels/status/2C4A4F103290/{dev_type}/{uid:06X}")
+        mqtt.messages()[device.state_topic] = payload
+        mqtt.availability.update(device.connected_topic, b"on\n")
+        device._callback(payload)
+        devices.append(device)
+
+    def poll() -> None:
+        for device in devices:
+            device.state
+
+    def available() -> None:
+        for device in devices:
+            device.is_available
+
+    def decode() -> None:
+        for device in devices:
+            create_value(
+                device.device_type,
+                device.inels_type,
+                mqtt.last_value(device.state_topic),
+            ).ha_value
+
+    first = timeit.timeit(poll, number=1)
+    results = [("first", first), ("decode", min(timeit.repeat(decode, number=1)))]
+    results += [
+        ("again", min(timeit.repeat(poll, number=1, repeat=REPEAT))),
+        ("avail", min(timeit.repeat(available, number=1, repeat=REPEAT))),
+    ]
+    for name, elapsed in results:
+        print(f"{name:<8} {elapsed / DEVICES * 1e9:8.0f} ns/device")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Cost of status messages of temperature sensors nobody reads.
+
+Column "callback" is the message delivered to the device only, the
+payload is decoded first time the state is read. Column "read" reads
+the state after every message, which is what every message cost when
+DeviceValue was decoded eagerly.
+
+    python -m benchmarks.telemetry_flood
+"""
+import timeit
+
+from inelsmqtt import InelsMqtt
+from inelsmqtt.devices import Device
+
+from benchmarks.fake_broker import CONFIG, fake_client
+
+ROUNDS = 200
+REPEAT = 5
+
+DEVICES = {
+    "RFTI-10B": "inels/status/2C4A4F103290/10/3A5A0E",
+    "RFATV-2": "inels/status/2C4A4F103290/09/3A5A0F",
+}
+
+# temperature rising by 0.01 °C, every payload differs
+SENSOR_PAYLOADS = [
+    f"00\n{t & 0xFF:02X}\n{t >> 8:02X}\n6E\n0A\n".encode() for t in range(2300, 2400)
+]
+VALVE_PAYLOADS = [f"50\n{t:02X}\n00\n40\n00\n".encode() for t in range(40, 140)]
+
+
+def main() -> None:
+    """Run benchmark."""
+    with fake_client():
+        mqtt = InelsMqtt(CONFIG)
+
+        print(f"{'element':<10} {'callback':>9} {'read':>9} us/message")
+        for (name, topic), payloads in zip(
+            DEVICES.items(), (SENSOR_PAYLOADS, VALVE_PAYLOADS)
+        ):
+            device = Device(mqtt, topic)
+
+            def callback() -> None:
+                for payload in payloads:
+                    device._callback(payload)
+
+            def read() -> None:
+                for payload in payloads:
+                    device._callback(payload)
+                    device.state
+
+            messages = ROUNDS * len(payloads)
+            elapsed = [
+                min(timeit.repeat(fnc, number=ROUNDS, repeat=REPEAT)) / messages
+                for fnc in (callback, read)
+            ]
+            print(f"{name:<10} {elapsed[0] * 1e6:9.2f} {elapsed[1] * 1e6:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
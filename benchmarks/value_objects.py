@@ -0,0 +1,62 @@
+"""Cost of one decoded value object per message.
+
+Compares the former anonymous class created by type() for every message
+with the predefined slotted value class.
+
+    python -m benchmarks.value_objects
+"""
+import gc
+import timeit
+import tracemalloc
+
+from inelsmqtt.const import Element, Platform
+from inelsmqtt.util import DeviceValue, SwitchTempValue, new_object
+
+ROUNDS = 100_000
+MESSAGE = "07\n01\n92\n09\n"
+
+
+def anonymous() -> object:
+    """Value as the former per message class."""
+    return new_object(on=True, temperature=24.5)
+
+
+def slotted() -> object:
+    """Value as instance of the predefined class."""
+    return SwitchTempValue(on=True, temperature=24.5)
+
+
+def decode() -> object:
+    """Whole decoding of RFSTI-11B message."""
+    return DeviceValue(Platform.SWITCH, Element.RFSTI_11B, inels_value=MESSAGE)
+
+
+def allocated(fnc, rounds: int = 1_000) -> float:
+    """Bytes kept alive per created value."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    values = [fnc() for _ in range(rounds)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del values
+
+    return (after - before) / rounds
+
+
+def main() -> None:
+    """Run benchmark."""
+    for name, fnc in (
+        ("type()", anonymous),
+        ("slots", slotted),
+        ("decode", decode),
+    ):
+        elapsed = timeit.timeit(fnc, number=ROUNDS)
+        print(
+            f"{name:<8} {elapsed / ROUNDS * 1e6:8.2f} us/message "
+            f"{allocated(fnc):8.0f} B/message"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,443 +1,1041 @@
-"""Library specified for inels-mqtt."""
-import logging
-import time
-import uuid
-import copy
-
-from datetime import datetime
-from typing import Any, Callable
-
-import paho.mqtt.client as mqtt
-
-from .const import (
-    MQTT_CLIENT_ID,
-    MQTT_HOST,
-    MQTT_PASSWORD,
-    MQTT_PORT,
-    MQTT_TIMEOUT,
-    MQTT_TRANSPORT,
-    MQTT_USERNAME,
-    MQTT_PROTOCOL,
-    MQTT_TRANSPORTS,
-    VERSION,
-    DEVICE_TYPE_DICT,
-    FRAGMENT_DEVICE_TYPE,
-    FRAGMENT_STATE,
-    TOPIC_FRAGMENTS,
-    DISCOVERY_TIMEOUT_IN_SEC,
-    MQTT_DISCOVER_TOPIC,
-)
-
-__version__ = VERSION
-
-_LOGGER = logging.getLogger(__name__)
-
-# when no topic were detected, then stop discovery
-__DISCOVERY_TIMEOUT__ = DISCOVERY_TIMEOUT_IN_SEC
-
-
-class InelsMqtt:
-    """Wrapper for mqtt client."""
-
-    def __init__(
-        self,
-        config: dict[str, Any],
-    ) -> None:
-        """InelsMqtt instance initialization.
-
-        Args:
-            config dict[str, Any]: config for mqtt connection
-            host (str): mqtt broker host. Can be IP address
-            port (int): broker port on which listening
-            protocol (int): mqtt version of protocol whitch will be used
-            transport (str): transportation protocol. Can be used tcp or websockets, defaltut tcp
-            debug (bool): flag for debuging mqtt comunication. Default False
-        """
-        proto = (
-            config.get(MQTT_PROTOCOL) if config.get(MQTT_PROTOCOL) else mqtt.MQTTv311
-        )
-
-        _t: str = (
-            config.get(MQTT_TRANSPORT) if config.get(MQTT_TRANSPORT) else "tcp"
-        ).lower()
-
-        if _t not in MQTT_TRANSPORTS:
-            raise Exception
-
-        if (client_id := config.get(MQTT_CLIENT_ID)) is None:
-            client_id = mqtt.base62(uuid.uuid4().int, padding=22)
-
-        self.__client = mqtt.Client(client_id, protocol=proto, transport=_t)
-
-        self.__client.on_connect = self.__on_connect
-        self.client.on_publish = self.__on_publish
-        self.client.on_subscribe = self.__on_subscribe
-        self.client.on_disconnect = self.__on_disconect
-
-        self.__client.enable_logger()
-
-        u_name = config.get(MQTT_USERNAME)
-        u_pwd = config.get(MQTT_PASSWORD)
-
-        if u_name is not None:
-            self.__client.username_pw_set(u_name, u_pwd)
-
-        self.__host = config[MQTT_HOST]
-        self.__port = config[MQTT_PORT]
-
-        _t = config.get(MQTT_TIMEOUT)
-        self.__timeout = _t if _t is not None else __DISCOVERY_TIMEOUT__
-
-        self.__listeners = dict[str, Callable[[Any], Any]]()
-        self.__is_subscribed_list = dict[str, bool]()
-        self.__last_values = dict[str, str]()
-        self.__try_connect = False
-        self.__message_readed = False
-        self.__messages = dict[str, str]()
-        self.__discovered = dict[str, str]()
-        self.__is_available = False
-        self.__discover_start_time = None
-        self.__published = False
-
-    @property
-    def client(self) -> mqtt.Client:
-        """Paho mqtt client."""
-        return self.__client
-
-    @property
-    def is_available(self) -> bool:
-        """Is broker available
-
-        Returns:
-            bool: Get information of mqtt broker availability
-        """
-        return self.__is_available
-
-    @property
-    def list_of_listeners(self) -> dict[str, Callable[[Any], Any]]:
-        """List of listeners."""
-        return self.__listeners
-
-    def is_subscribed(self, topic) -> bool:
-        """Get info if the topic is subscribed in device
-
-        Returns:
-            bool: state
-        """
-        is_subscribed = self.__is_subscribed_list.get(topic)
-        return False if is_subscribed is None else is_subscribed
-
-    def last_value(self, topic) -> str:
-        """Get last value of the selected topic
-
-        Args:
-            topic (str): topic name
-
-        Returns:
-            str: last value of the topic
-        """
-        return self.__last_values.get(topic)
-
-    def messages(self) -> dict[str, str]:
-        """List of all messages
-
-        Returns:
-            dist[str, str]: List of all messages (topics)
-            from broker subscribed.
-            It is key-value dictionary. Key is topic and value
-            is payload of topic
-        """
-        return self.__messages
-
-    def test_connection(self) -> bool:
-        """Test connection. It's used only for connection
-            testing. After that is disconnected
-        Returns:
-            bool: Is broker available or not
-        """
-        self.__connect()
-        self.disconnect()
-
-        return self.__is_available
-
-    def subscribe_listener(self, topic: str, fnc: Callable[[Any], Any]) -> None:
-        """Append new item into the datachange listener."""
-        self.__listeners[topic] = fnc
-
-    def unsubscribe_listeners(self) -> bool:
-        """Unsubscribe listeners."""
-        self.__listeners.clear()
-
-    def __connect(self) -> None:
-        """Create connection and register callback function to neccessary
-        purposes.
-        """
-        if self.__client.is_connected() is False:
-            self.__client.connect(self.__host, self.__port)
-            self.__client.loop_start()
-
-        start_time = datetime.now()
-
-        while self.__try_connect is False:
-            # there should be timeout to discover all topics
-            time_delta = datetime.now() - start_time
-            if time_delta.total_seconds() > self.__timeout:
-                self.__try_connect = self.__is_available = False
-                break
-
-            time.sleep(0.1)
-
-    def __on_disconect(
-        self,
-        client: mqtt.Client,  # pylint: disable=unused-argument
-        userdata,  # pylint: disable=unused-argument
-        reason_code,
-    ) -> None:
-        """On disconnect callback function
-
-        Args:
-            client (mqtt.Client): instance of the mqtt client
-            userdata (Any): users data
-            reason_code (number): reason code
-        """
-        _LOGGER.info("%s - disconnecting reason [%s]", self.__host, reason_code)
-
-        for item in self.__is_subscribed_list.keys():
-            self.__is_subscribed_list[item] = False
-            _LOGGER.debug("Disconnected %s", item)
-
-    def __on_connect(
-        self,
-        client: mqtt.Client,  # pylint: disable=unused-argument
-        userdata,  # pylint: disable=unused-argument
-        flag,  # pylint: disable=unused-argument
-        reason_code,
-        properties=None,  # pylint: disable=unused-argument
-    ) -> None:
-        """On connection callback function
-
-        Args:
-            client (MqttClient): instance of mqtt client
-            properties (_type_, optional): Props from mqtt sets. Defaults None
-        """
-        self.__try_connect = True
-        self.__is_available = reason_code == mqtt.CONNACK_ACCEPTED
-        _LOGGER.info(
-            "Mqtt broker %s:%s %s",
-            self.__host,
-            self.__port,
-            "is connected" if self.__is_available else "is not connected",
-        )
-
-    def publish(self, topic, payload, qos=0, retain=True, properties=None) -> bool:
-        """Publish to mqtt broker. Will automatically connect
-        establish all neccessary callback functions. Made
-        publishing and disconnect from broker
-
-        Args:
-            topic (str): topic string where to publish
-            payload (str): data content
-            qos (int, optional): quality of service
-              https://mosquitto.org/man/mqtt-7.html. Defaults to 0.
-            retain (bool, optional): Broke will keep message after sending it
-              to all subscribers. Defaults to True.
-            properties (_type_, optional): Props from mqtt sets.
-              Defaults to None.
-        """
-        self.__published = False
-        self.__connect()
-        self.client.publish(topic, payload, qos, retain, properties)
-
-        start_time = datetime.now()
-
-        while self.__published is False:
-            # there should be timeout to discover all topics
-            time_delta = datetime.now() - start_time
-            if time_delta.total_seconds() > self.__timeout:
-                self.__published = False
-                break
-
-            time.sleep(0.1)
-
-        return self.__published
-
-    def __on_publish(
-        self,
-        client: mqtt.Client,  # pylint: disable=unused-argument
-        userdata,  # pylint: disable=unused-argument
-        mid,  # pylint: disable=unused-argument
-    ) -> None:
-        """Callback function called after publish
-          has been created. Will log it.
-
-        Args:
-            client (MqttClient): Instance of mqtt broker
-            userdata (object): Published data
-            mid (_type_): MID
-        """
-        self.__published = True
-
-    def subscribe(self, topic, qos=0, options=None, properties=None) -> Any:
-        """Subscribe to selected topic. Will connect, set all
-        callback function and subscribe to the topic. After that
-        will automatically disconnect from broker.
-
-        Args:
-            topic (str): Topic string representation
-            qos (_type_): Quality of service.
-            options (_type_): Options is not used, but callback must
-              have implemented
-            properties (_type_, optional): Props from mqtt set.
-              Defaults to None.
-        """
-        self.__message_readed = False
-        self.client.on_message = self.__on_message
-
-        self.__connect()
-        self.client.subscribe(topic, qos, options, properties)
-
-        start_time = datetime.now()
-
-        while self.__message_readed is False:
-            # there should be timeout to discover all topics
-            time_delta = datetime.now() - start_time
-            if time_delta.total_seconds() > self.__timeout:
-                self.__message_readed = False
-                break
-
-            time.sleep(0.1)
-
-        return self.__messages.get(topic)
-
-    def discovery_all(self) -> dict[str, str]:
-        """Subscribe to selected topic. This method is primary used for
-        subscribing with wild-card (#,+).
-        When wild-card is used, then all topic matching this will
-        be subscribed and collected therir payloads and topic representation.
-
-        e.g.: prefix/status/groundfloor/# - will match all groundfloor topics
-                    prefix/status/groundfloor/kitchen/temp - yes
-                    prefix/status/groundfloor/linvingroom/temp - yes
-                    prefix/status/firstfloor/bathroom/temp - no
-                    prefix/status/groundfloor/kitchen/fridge/temp - yes
-
-              prefix/status/groundfoor/+/temp - will get all groundfloor temp
-                    prefix/status/groundfloor/kitchen/temp - yes
-                    prefix/status/groundfloor/kitchen/lamp - no
-                    prefix/status/groundfloor/livingroom/temp - yes
-                    prefix/status/groundfloor/kitchen/fridge/temp - no
-
-        Returns:
-            dict[str, str]: Dictionary of all topics with their payloads
-        """
-        self.client.on_message = self.__on_discover
-
-        self.__connect()
-        self.client.subscribe(MQTT_DISCOVER_TOPIC, 0, None, None)
-
-        self.__discover_start_time = datetime.now()
-
-        while True:
-            # there should be timeout to discover all topics
-            time_delta = datetime.now() - self.__discover_start_time
-            if time_delta.total_seconds() > self.__timeout:
-                break
-
-            time.sleep(0.1)
-
-        self.__messages = self.__discovered.copy()
-
-        return self.__discovered
-
-    def __on_discover(
-        self,
-        client: mqtt.Client,  # pylint: disable=unused-argument
-        userdata,  # pylint: disable=unused-argument
-        msg,
-    ) -> None:
-        """Special callback function used only in discover_all function
-        placed in on_message. It is the same as on_mesage callback func,
-        but do different things
-
-        Args:
-            client (MqttClient): Mqtt broker instance
-            msg (object): Topic with payload from broker
-        """
-        # set discovery_start_time to now evry message was returned
-        # will be doing till messages will rising
-        self.__discover_start_time = datetime.now()
-
-        # pass only those who belongs to known device types
-        fragments = msg.topic.split("/")
-        device_type = fragments[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]
-        status = fragments[TOPIC_FRAGMENTS[FRAGMENT_STATE]]
-
-        if device_type in DEVICE_TYPE_DICT and status == "status":
-            self.__discovered[msg.topic] = msg.payload
-            self.__last_values[msg.topic] = msg.payload
-            self.__is_subscribed_list[msg.topic] = True
-
-    def __on_message(
-        self,
-        client: mqtt.Client,  # pylint: disable=unused-argument
-        userdata,  # pylint: disable=unused-argument
-        msg,
-    ) -> None:
-        """Callback function which is used for subscription
-
-        Args:
-            client (MqttClient): Instance of mqtt broker
-            userdata (_type_): Date about user
-            msg (object): Topic with payload from broker
-        """
-        self.__message_readed = True
-        device_type = msg.topic.split("/")[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]
-
-        if device_type in DEVICE_TYPE_DICT:
-            # keep last value
-            self.__last_values[msg.topic] = (
-                copy.copy(self.__messages[msg.topic])
-                if msg.topic in self.__messages
-                else msg.payload
-            )
-            self.__messages[msg.topic] = msg.payload
-            # update info that the topic is subscribed
-            self.__is_subscribed_list[msg.topic] = True
-
-        if len(self.__listeners) > 0 and msg.topic in self.__listeners:
-            # This pass data change directely into the device.
-            self.__listeners[msg.topic](msg.payload)
-
-    def __on_subscribe(
-        self,
-        client: mqtt.Client,  # pylint: disable=unused-argument
-        userdata,  # pylint: disable=unused-argument
-        mid,  # pylint: disable=unused-argument
-        granted_qos,  # pylint: disable=unused-argument
-        properties=None,  # pylint: disable=unused-argument
-    ):
-        """Callback for subscribe function. Is called after subscribe to
-        the topic. Will handle disconnection from mqtt broker loop
-
-        Args:
-            client (MqttClient): Instance of mqtt broker
-            userdata (_type_): Data about user
-            mid (_type_): MID
-            granted_qos (_type_): Quality of service is granted
-            properties (_type_, optional): Props from broker set.
-                Defaults to None.
-        """
-        _LOGGER.debug(mid)
-
-    def __disconnect(self) -> None:
-        """Disconnecting from broker and stopping broker's loop"""
-        self.close()
-        self.client.disconnect()
-
-    def close(self) -> None:
-        """Close loop."""
-        self.client.loop_stop()
-
-    def disconnect(self) -> None:
-        """Disconnect mqtt client."""
-        return self.__disconnect()
+"""Library specified for inels-mqtt."""
+import logging
+import threading
+import time
+import uuid
+import copy
+
+from typing import Any, Callable, Optional, Union
+
+import paho.mqtt.client as mqtt
+
+from .availability import AvailabilityTable
+from .dispatcher import Dispatcher, DispatchStats
+from .network import NetworkLoop
+from .quiescence import DiscoveryReport, QuiescenceDetector
+from .router import TopicRouter
+from .scheduler import CoordinatorStats, PublishScheduler, ScheduledAck
+from .util import parse_topic
+from .const import (
+    MQTT_CLIENT_ID,
+    MQTT_HOST,
+    MQTT_PASSWORD,
+    MQTT_PORT,
+    MQTT_TIMEOUT,
+    MQTT_TRANSPORT,
+    MQTT_USERNAME,
+    MQTT_PROTOCOL,
+    MQTT_TRANSPORTS,
+    MQTT_MAX_INFLIGHT,
+    MQTT_DISCOVERY_MIN_QUIET,
+    MQTT_DISCOVERY_MAX_QUIET,
+    MQTT_DISCOVERY_SENTINEL,
+    MQTT_DISPATCH_WORKERS,
+    MQTT_DISPATCH_QUEUE_SIZE,
+    MQTT_DISPATCH_OVERFLOW,
+    MQTT_DISPATCH_COALESCE,
+    MQTT_PUBLISH_RATE,
+    MQTT_PUBLISH_BURST,
+    MQTT_PUBLISH_QUEUE_TIMEOUT,
+    MQTT_SUPPRESS_REDUNDANT,
+    MAX_INFLIGHT_MESSAGES,
+    VERSION,
+    DISCOVERY_TIMEOUT_IN_SEC,
+    DISCOVERY_MIN_QUIET_IN_SEC,
+    DISPATCH_QUEUE_SIZE,
+    PUBLISH_BURST,
+    PUBLISH_QUEUE_TIMEOUT,
+    MQTT_CONNECTED_PREFIX,
+    MQTT_CONNECTED_TOPIC,
+    MQTT_DISCOVER_TOPIC,
+    MQTT_DISCOVERY_SENTINEL_TOPIC,
+    DiscoveryEnd,
+    OverflowPolicy,
+    PublishPriority,
+)
+
+__version__ = VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+# when no topic were detected, then stop discovery
+__DISCOVERY_TIMEOUT__ = DISCOVERY_TIMEOUT_IN_SEC
+
+
+def create_client(config: dict[str, Any]) -> mqtt.Client:
+    """Create paho mqtt client from the config
+
+    Args:
+        config (dict[str, Any]): config for mqtt connection
+
+    Returns:
+        mqtt.Client: client without any callback registered
+    """
+    proto = config.get(MQTT_PROTOCOL) if config.get(MQTT_PROTOCOL) else mqtt.MQTTv311
+
+    _t: str = (
+        config.get(MQTT_TRANSPORT) if config.get(MQTT_TRANSPORT) else "tcp"
+    ).lower()
+
+    if _t not in MQTT_TRANSPORTS:
+        raise Exception
+
+    if (client_id := config.get(MQTT_CLIENT_ID)) is None:
+        client_id = mqtt.base62(uuid.uuid4().int, padding=22)
+
+    client = mqtt.Client(client_id, protocol=proto, transport=_t)
+    client.enable_logger()
+
+    u_name = config.get(MQTT_USERNAME)
+    u_pwd = config.get(MQTT_PASSWORD)
+
+    if u_name is not None:
+        client.username_pw_set(u_name, u_pwd)
+
+    return client
+
+
+class PublishAck:
+    """Pending acknowledge of one published message."""
+
+    def __init__(self, mid: int = None) -> None:
+        """Create pending acknowledge
+
+        Args:
+            mid (int, optional): paho message id. Defaults to None.
+        """
+        self.__mid = mid
+        self.__done = threading.Event()
+        self.__published = False
+
+    @property
+    def mid(self) -> int:
+        """Message id of the published message."""
+        return self.__mid
+
+    @property
+    def is_published(self) -> bool:
+        """Broker has acknowledged the message."""
+        return self.__published
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait till the broker acknowledges the message
+
+        Args:
+            timeout (float, optional): max time of waiting in seconds.
+              Defaults to None, wait forever.
+
+        Returns:
+            bool: True when the message has been published
+        """
+        return self.__done.wait(timeout) and self.__published
+
+    def _resolve(self, published: bool) -> None:
+        """Finish the acknowledge with the result."""
+        self.__published = published
+        self.__done.set()
+
+
+class InelsMqtt:
+    """Wrapper for mqtt client."""
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        network_loop: NetworkLoop = None,
+    ) -> None:
+        """InelsMqtt instance initialization.
+
+        Args:
+            config dict[str, Any]: config for mqtt connection
+            host (str): mqtt broker host. Can be IP address
+            port (int): broker port on which listening
+            protocol (int): mqtt version of protocol whitch will be used
+            transport (str): transportation protocol. Can be used tcp or websockets, defaltut tcp
+            debug (bool): flag for debuging mqtt comunication. Default False
+            max_inflight (int): max amount of published messages waiting
+              for acknowledge. Default 20
+            discovery_min_quiet (float): shortest time without messages
+              ending the discovery. Default 0.5 s
+            discovery_max_quiet (float): longest time without messages
+              ending the discovery. Default timeout
+            discovery_sentinel (bool): end the discovery when own marker
+              message sent after the subscription comes back. Default False
+            dispatch_workers (int): amount of threads calling listeners,
+              messages of one topic keep their order. Default None,
+              listeners are called in the network thread
+            dispatch_queue_size (int): max amount of messages waiting
+              for listeners. Default 1000
+            dispatch_overflow (OverflowPolicy): what to do with a message
+              when the queue is full (block, drop_oldest, coalesce).
+              Default block
+            dispatch_coalesce (bool): listeners get only the newest
+              queued payload of every topic, it starts one dispatch
+              worker when dispatch_workers is not set. Default False
+            publish_rate (float): messages per second published to one
+              coordinator. Default None, publishes are not scheduled
+            publish_burst (int): messages published to one coordinator
+              at once before the rate applies. Default 5
+            publish_queue_timeout (float): max seconds a scheduled publish
+              waits in the queue of its coordinator, publish returns False
+              and the command is not sent after it. Default 30
+            suppress_redundant (bool): Device.set_ha_value does not
+              publish when the device already is in the requested state.
+              Default False
+            network_loop (NetworkLoop, optional): loop shared with other
+              clients used instead of own network thread. Defaults to None.
+        """
+        self.__client = create_client(config)
+
+        self.__client.on_connect = self.__on_connect
+        self.client.on_publish = self.__on_publish
+        self.client.on_subscribe = self.__on_subscribe
+        self.client.on_disconnect = self.__on_disconect
+
+        self.__host = config[MQTT_HOST]
+        self.__port = config[MQTT_PORT]
+        self.__network_loop = network_loop
+
+        _t = config.get(MQTT_TIMEOUT)
+        self.__timeout = _t if _t is not None else __DISCOVERY_TIMEOUT__
+
+        self.__listeners = TopicRouter()
+        self.__topic_listeners = TopicRouter()
+        self.__is_subscribed_list = dict[str, bool]()
+        # qos or options of subscribed topics, restored after reconnect
+        self.__subscriptions = dict[str, Any]()
+        self.__last_values = dict[str, str]()
+        self.__connected = threading.Event()
+        self.__message_readed = threading.Event()
+        self.__message_stored = threading.Condition()
+        self.__messages = dict[str, str]()
+        self.__received = 0
+        self.__published = 0
+        self.__last_received: float = None
+        self.__availability = AvailabilityTable()
+        self.__discovered = dict[str, str]()
+        self.__discover_activity = threading.Event()
+        self.__sentinel_topic: str = None
+        self.__sentinel_arrived = False
+        # discovery_all is collecting status messages
+        self.__discovering = False
+        self.__last_discovery: DiscoveryReport = None
+        self.__is_available = False
+        self.__pending_acks = dict[int, PublishAck]()
+        self.__early_acks = set[int]()
+        # amount of running publish calls
+        self.__publishing = 0
+        self.__ack_lock = threading.RLock()
+
+        _t = config.get(MQTT_MAX_INFLIGHT)
+        max_inflight = _t if _t is not None else MAX_INFLIGHT_MESSAGES
+        self.__inflight = threading.BoundedSemaphore(max_inflight)
+        self.__max_inflight = max_inflight
+        # taken slots of the window, read by the scheduler without waiting
+        self.__in_flight = 0
+        self.__in_flight_lock = threading.Lock()
+        self.__client.max_inflight_messages_set(max_inflight)
+
+        _t = config.get(MQTT_DISCOVERY_MIN_QUIET)
+        min_quiet = _t if _t is not None else DISCOVERY_MIN_QUIET_IN_SEC
+        _t = config.get(MQTT_DISCOVERY_MAX_QUIET)
+        max_quiet = _t if _t is not None else self.__timeout
+        self.__quiescence = QuiescenceDetector(min_quiet, max_quiet)
+        self.__discovery_sentinel = bool(config.get(MQTT_DISCOVERY_SENTINEL))
+
+        self.__dispatcher: Dispatcher = None
+        coalesce = bool(config.get(MQTT_DISPATCH_COALESCE))
+        if (workers := config.get(MQTT_DISPATCH_WORKERS)) or coalesce:
+            _t = config.get(MQTT_DISPATCH_QUEUE_SIZE)
+            self.__dispatcher = Dispatcher(
+                self.__notify_listeners,
+                workers or 1,
+                _t if _t is not None else DISPATCH_QUEUE_SIZE,
+                config.get(MQTT_DISPATCH_OVERFLOW) or OverflowPolicy.BLOCK,
+                coalesce,
+            )
+
+        self.__suppress_redundant = bool(config.get(MQTT_SUPPRESS_REDUNDANT))
+        self.__suppressed = 0
+
+        self.__scheduler: PublishScheduler = None
+        _t = config.get(MQTT_PUBLISH_QUEUE_TIMEOUT)
+        self.__queue_timeout = _t if _t is not None else PUBLISH_QUEUE_TIMEOUT
+        if rate := config.get(MQTT_PUBLISH_RATE):
+            _t = config.get(MQTT_PUBLISH_BURST)
+            self.__scheduler = PublishScheduler(
+                self.__publish_scheduled,
+                rate,
+                _t if _t is not None else PUBLISH_BURST,
+                lambda: self.__max_inflight - self.__in_flight,
+                self.__queue_timeout,
+            )
+
+    @property
+    def client(self) -> mqtt.Client:
+        """Paho mqtt client."""
+        return self.__client
+
+    @property
+    def is_available(self) -> bool:
+        """Is broker available
+
+        Returns:
+            bool: Get information of mqtt broker availability
+        """
+        return self.__is_available
+
+    @property
+    def host(self) -> str:
+        """Host of the broker."""
+        return self.__host
+
+    @property
+    def port(self) -> int:
+        """Port of the broker."""
+        return self.__port
+
+    @property
+    def messages_received(self) -> int:
+        """Amount of messages received from broker."""
+        return self.__received
+
+    @property
+    def messages_published(self) -> int:
+        """Amount of messages passed to broker."""
+        return self.__published
+
+    @property
+    def last_received(self) -> Optional[float]:
+        """Monotonic time of the last received message, None before
+        the first one."""
+        return self.__last_received
+
+    @property
+    def last_discovery(self) -> DiscoveryReport:
+        """Report of the last discovery, None before the first one."""
+        return self.__last_discovery
+
+    @property
+    def availability(self) -> AvailabilityTable:
+        """Availability of devices fed by subscribe_availability."""
+        return self.__availability
+
+    @property
+    def dispatch_stats(self) -> Optional[DispatchStats]:
+        """Queue depth and lag of listener dispatch, None when listeners
+        are called in the network thread."""
+        if self.__dispatcher is None:
+            return None
+
+        return self.__dispatcher.stats()
+
+    @property
+    def publish_stats(self) -> Optional[dict[str, CoordinatorStats]]:
+        """Publish queues by coordinator serial number, None when
+        publishes are not scheduled."""
+        if self.__scheduler is None:
+            return None
+
+        return self.__scheduler.stats()
+
+    @property
+    def suppress_redundant(self) -> bool:
+        """Are commands for devices already in the state not published."""
+        return self.__suppress_redundant
+
+    @property
+    def suppressed_publishes(self) -> int:
+        """Amount of commands not published because the device already
+        was in the requested state."""
+        return self.__suppressed
+
+    def publish_suppressed(self, topic: str) -> None:
+        """Record command to the set topic which was not published."""
+        self.__suppressed += 1
+        _LOGGER.debug("%s - device already in the state, not published", topic)
+
+    @property
+    def list_of_listeners(self) -> dict[str, list[Callable[[Any], Any]]]:
+        """List of listeners by their topic filter."""
+        return self.__listeners.filters
+
+    def is_subscribed(self, topic) -> bool:
+        """Get info if the topic is subscribed in device
+
+        Returns:
+            bool: state
+        """
+        is_subscribed = self.__is_subscribed_list.get(topic)
+        if is_subscribed is None and topic.startswith(MQTT_CONNECTED_PREFIX):
+            is_subscribed = self.__is_subscribed_list.get(MQTT_CONNECTED_TOPIC)
+
+        return False if is_subscribed is None else is_subscribed
+
+    def last_value(self, topic) -> str:
+        """Get last value of the selected topic
+
+        Args:
+            topic (str): topic name
+
+        Returns:
+            str: last value of the topic
+        """
+        return self.__last_values.get(topic)
+
+    def messages(self) -> dict[str, str]:
+        """List of all messages
+
+        Returns:
+            dist[str, str]: List of all messages (topics)
+            from broker subscribed.
+            It is key-value dictionary. Key is topic and value
+            is payload of topic
+        """
+        return self.__messages
+
+    def restore_messages(self, messages: dict[str, Any]) -> None:
+        """Fill messages with payloads known from previous run, e.g.
+        discovery snapshot. Payloads arriving from broker overwrite them.
+
+        Args:
+            messages (dict[str, Any]): topics with their payloads
+        """
+        for topic, payload in messages.items():
+            self.__messages.setdefault(topic, payload)
+            self.__last_values.setdefault(topic, payload)
+
+            if (
+                topic.startswith(MQTT_CONNECTED_PREFIX)
+                and topic not in self.__availability
+            ):
+                self.__availability.update(topic, payload)
+
+    def test_connection(self) -> bool:
+        """Test connection. It's used only for connection
+            testing. After that is disconnected
+        Returns:
+            bool: Is broker available or not
+        """
+        self.__connect()
+        self.disconnect()
+
+        return self.__is_available
+
+    def subscribe_listener(self, topic: str, fnc: Callable[[Any], Any]) -> None:
+        """Append new item into the datachange listener. Topic can contain
+        wildcards (+, #) and there can be many listeners for one topic."""
+        self.__listeners.add(topic, fnc)
+
+    def unsubscribe_listener(
+        self, topic: str, fnc: Callable[[Any], Any] = None
+    ) -> bool:
+        """Remove listener of the topic, all of them when fnc is None."""
+        return self.__listeners.remove(topic, fnc)
+
+    def subscribe_topic_listener(
+        self, topic: str, fnc: Callable[[str, Any], Any]
+    ) -> None:
+        """Append listener called with the topic and the payload, e.g. to
+        watch all status topics with inels/status/#."""
+        self.__topic_listeners.add(topic, fnc)
+
+    def unsubscribe_topic_listener(
+        self, topic: str, fnc: Callable[[str, Any], Any] = None
+    ) -> bool:
+        """Remove topic listener, all of them when fnc is None."""
+        return self.__topic_listeners.remove(topic, fnc)
+
+    def unsubscribe_listeners(self) -> None:
+        """Unsubscribe listeners."""
+        self.__listeners.clear()
+        self.__topic_listeners.clear()
+
+    def __connect(self) -> None:
+        """Create connection and register callback function to neccessary
+        purposes.
+        """
+        # workers were stopped by close() of the previous connection
+        if self.__dispatcher is not None:
+            self.__dispatcher.start()
+
+        if self.__client.is_connected() is False:
+            if self.__network_loop is None:
+                self.__client.connect(self.__host, self.__port)
+                self.__client.loop_start()
+            else:
+                self.__network_loop.attach(self.__client)
+                self.__client.connect(self.__host, self.__port)
+
+        # released by __on_connect as soon as the broker answers CONNACK
+        if self.__connected.wait(self.__timeout) is False:
+            self.__is_available = False
+
+    def __on_disconect(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        reason_code,
+    ) -> None:
+        """On disconnect callback function
+
+        Args:
+            client (mqtt.Client): instance of the mqtt client
+            userdata (Any): users data
+            reason_code (number): reason code
+        """
+        _LOGGER.info("%s - disconnecting reason [%s]", self.__host, reason_code)
+
+        # next __connect has to wait for a fresh CONNACK
+        self.__connected.clear()
+
+        for item in self.__is_subscribed_list.keys():
+            self.__is_subscribed_list[item] = False
+            _LOGGER.debug("Disconnected %s", item)
+
+        # acknowledges will never come for this connection
+        with self.__ack_lock:
+            pending = list(self.__pending_acks.values())
+            self.__pending_acks.clear()
+
+        for ack in pending:
+            self.__release_ack(ack, False)
+
+    def __on_connect(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        flag,  # pylint: disable=unused-argument
+        reason_code,
+        properties=None,  # pylint: disable=unused-argument
+    ) -> None:
+        """On connection callback function
+
+        Args:
+            client (MqttClient): instance of mqtt client
+            flag (dict): response flags sent by the broker
+            properties (_type_, optional): Props from mqtt sets. Defaults None
+        """
+        self.__is_available = reason_code == mqtt.CONNACK_ACCEPTED
+
+        # clean session of the reconnect lost subscriptions of the previous
+        # one, subscribe them again before anybody waits for the connection
+        if (
+            self.__is_available
+            and self.__subscriptions
+            and not flag.get("session present")
+        ):
+            self.client.subscribe(list(self.__subscriptions.items()))
+            for topic in self.__subscriptions:
+                self.__is_subscribed_list[topic] = True
+
+        self.__connected.set()
+        _LOGGER.info(
+            "Mqtt broker %s:%s %s",
+            self.__host,
+            self.__port,
+            "is connected" if self.__is_available else "is not connected",
+        )
+
+    def publish(
+        self,
+        topic,
+        payload,
+        qos=0,
+        retain=True,
+        properties=None,
+        priority=PublishPriority.NORMAL,
+    ) -> bool:
+        """Publish to mqtt broker. Will automatically connect
+        establish all neccessary callback functions. Made
+        publishing and wait till the broker acknowledges it. With
+        publish_rate the time in the queue of the coordinator is not
+        part of the timeout, it is limited by publish_queue_timeout.
+        False means the message was not delivered.
+
+        Args:
+            topic (str): topic string where to publish
+            payload (str): data content
+            qos (int, optional): quality of service
+              https://mosquitto.org/man/mqtt-7.html. Defaults to 0.
+            retain (bool, optional): Broke will keep message after sending it
+              to all subscribers. Defaults to True.
+            properties (_type_, optional): Props from mqtt sets.
+              Defaults to None.
+            priority (PublishPriority, optional): priority class used
+              when publishes are scheduled. Defaults to NORMAL.
+        """
+        ack = self.publish_nowait(topic, payload, qos, retain, properties, priority)
+        if isinstance(ack, ScheduledAck):
+            # throttled command is sent later, timeout starts once it
+            # leaves the queue of its coordinator
+            if not ack.wait_sent(self.__queue_timeout):
+                return False
+
+        return ack.wait(self.__timeout)
+
+    def publish_nowait(
+        self,
+        topic,
+        payload,
+        qos=0,
+        retain=True,
+        properties=None,
+        priority=PublishPriority.NORMAL,
+    ) -> Union[PublishAck, ScheduledAck]:
+        """Publish to mqtt broker without waiting for acknowledge. Many
+        messages can be in flight at once, up to the max_inflight window.
+        When the window is full it waits for free slot at most timeout.
+        With publish_rate the message is queued for its coordinator.
+
+        Args:
+            topic (str): topic string where to publish
+            payload (str): data content
+            qos (int, optional): quality of service. Defaults to 0.
+            retain (bool, optional): Broke will keep message after sending it
+              to all subscribers. Defaults to True.
+            properties (_type_, optional): Props from mqtt sets.
+              Defaults to None.
+            priority (PublishPriority, optional): priority class used
+              when publishes are scheduled. Defaults to NORMAL.
+
+        Returns:
+            Union[PublishAck, ScheduledAck]: acknowledge of this message,
+              caller can wait on it
+        """
+        # the scheduler thread does not connect, see __publish_scheduled
+        self.__connect()
+
+        if self.__scheduler is not None:
+            return self.__scheduler.submit(
+                topic, payload, qos, retain, properties, priority
+            )
+
+        return self.__publish_now(topic, payload, qos, retain, properties)
+
+    def __publish_scheduled(
+        self, topic, payload, qos=0, retain=True, properties=None
+    ) -> PublishAck:
+        """Publish of the scheduler thread. While the broker is down
+        commands fail at once instead of waiting for the connection
+        one by one, paho or the network loop connects again."""
+        if not self.client.is_connected():
+            ack = PublishAck()
+            ack._resolve(False)  # pylint: disable=protected-access
+            return ack
+
+        return self.__publish_now(topic, payload, qos, retain, properties)
+
+    def __publish_now(
+        self, topic, payload, qos=0, retain=True, properties=None
+    ) -> PublishAck:
+        """Publish to mqtt broker without waiting for acknowledge. When
+        the inflight window is full it waits for free slot at most timeout.
+
+        Args:
+            topic (str): topic string where to publish
+            payload (str): data content
+            qos (int, optional): quality of service. Defaults to 0.
+            retain (bool, optional): Broke will keep message after sending it
+              to all subscribers. Defaults to True.
+            properties (_type_, optional): Props from mqtt sets.
+              Defaults to None.
+
+        Returns:
+            PublishAck: acknowledge of this message, caller can wait on it
+        """
+        if self.__acquire_inflight() is False:
+            _LOGGER.warning("%s - too many messages in flight", self.__host)
+            ack = PublishAck()
+            ack._resolve(False)  # pylint: disable=protected-access
+            return ack
+
+        # paho calls on_publish holding its own lock, so the ack lock must
+        # not be held during publish. Acknowledge arriving before the mid
+        # is registered is kept aside while some publish call is running.
+        with self.__ack_lock:
+            self.__publishing += 1
+
+        try:
+            info = self.client.publish(topic, payload, qos, retain, properties)
+        except Exception:
+            with self.__ack_lock:
+                self.__publish_done()
+            self.__release_inflight()
+            raise
+
+        self.__published += 1
+        ack = PublishAck(info.mid)
+
+        with self.__ack_lock:
+            if info.mid in self.__early_acks:
+                self.__early_acks.discard(info.mid)
+                self.__release_ack(ack, True)
+            elif info.rc != mqtt.MQTT_ERR_SUCCESS and qos == 0:
+                # qos 0 message is not queued by paho when it is not sent
+                self.__release_ack(ack, False)
+            else:
+                self.__pending_acks[info.mid] = ack
+
+            self.__publish_done()
+
+        return ack
+
+    def __publish_done(self) -> None:
+        """Publish call finished, ack lock has to be held."""
+        self.__publishing -= 1
+        if self.__publishing == 0:
+            # acknowledges of messages not published by publish calls
+            self.__early_acks.clear()
+
+    def __release_ack(self, ack: PublishAck, published: bool) -> None:
+        """Resolve acknowledge and free its inflight slot."""
+        ack._resolve(published)  # pylint: disable=protected-access
+        self.__release_inflight()
+
+    def __acquire_inflight(self) -> bool:
+        """Take slot of the inflight window, wait at most timeout."""
+        if self.__inflight.acquire(timeout=self.__timeout) is False:
+            return False
+
+        with self.__in_flight_lock:
+            self.__in_flight += 1
+        return True
+
+    def __release_inflight(self) -> None:
+        """Free slot of the inflight window."""
+        with self.__in_flight_lock:
+            self.__in_flight -= 1
+        self.__inflight.release()
+
+        if self.__scheduler is not None:
+            self.__scheduler.wake()
+
+    def __on_publish(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        mid,
+    ) -> None:
+        """Callback function called after publish
+          has been created. Releases acknowledge of the message.
+
+        Args:
+            client (MqttClient): Instance of mqtt broker
+            userdata (object): Published data
+            mid (_type_): MID
+        """
+        with self.__ack_lock:
+            ack = self.__pending_acks.pop(mid, None)
+            if ack is None:
+                if self.__publishing:
+                    self.__early_acks.add(mid)
+                return
+
+        self.__release_ack(ack, True)
+
+    def subscribe(self, topic, qos=0, options=None, properties=None) -> Any:
+        """Subscribe to selected topic. Will connect, set all
+        callback function and subscribe to the topic. After that
+        will automatically disconnect from broker.
+
+        Args:
+            topic (str): Topic string representation
+            qos (_type_): Quality of service.
+            options (_type_): Options is not used, but callback must
+              have implemented
+            properties (_type_, optional): Props from mqtt set.
+              Defaults to None.
+        """
+        self.__message_readed.clear()
+        self.client.on_message = self.__on_message
+
+        self.__connect()
+        self.client.subscribe(topic, qos, options, properties)
+        self.__subscriptions[topic] = options if options is not None else qos
+
+        self.__message_readed.wait(self.__timeout)
+
+        return self.__messages.get(topic)
+
+    def subscribe_many(
+        self, topics: list[str], qos=0, options=None, properties=None, wait=True
+    ) -> dict[str, Any]:
+        """Subscribe to the list of topics at once. All topics are sent
+        in one SUBSCRIBE packet and there is only one wait for all of them,
+        so the time does not grow with the amount of topics.
+
+        Args:
+            topics (list[str]): Topics string representation
+            qos (_type_): Quality of service.
+            options (_type_): Subscribe options used instead of qos
+              with mqtt v5
+            properties (_type_, optional): Props from mqtt set.
+              Defaults to None.
+            wait (bool, optional): Wait till every topic has a payload
+              or timeout expires. Defaults to True.
+
+        Returns:
+            dict[str, Any]: payload for every topic, None when not arrived
+        """
+        topics = list(dict.fromkeys(topics))
+        if len(topics) == 0:
+            return {}
+
+        self.client.on_message = self.__on_message
+
+        self.__connect()
+        self.client.subscribe(
+            [(topic, options if options is not None else qos) for topic in topics],
+            properties=properties,
+        )
+
+        for topic in topics:
+            self.__is_subscribed_list[topic] = True
+            self.__subscriptions[topic] = options if options is not None else qos
+
+        if wait:
+            self.__wait_for_messages(topics)
+
+        return {topic: self.__messages.get(topic) for topic in topics}
+
+    def subscribe_availability(
+        self, topics: list[str] = None, wait=True
+    ) -> dict[str, Any]:
+        """Subscribe availability of all devices with one inels/connected/#
+        subscription, so the amount of subscriptions does not grow with
+        devices. Availability is kept in the availability table. Topic is
+        subscribed once, next calls only wait for the payloads.
+
+        Args:
+            topics (list[str], optional): connected topics of devices
+              to wait for. Defaults to None.
+            wait (bool, optional): Wait till every topic has a payload
+              or timeout expires. Defaults to True.
+
+        Returns:
+            dict[str, Any]: payload for every topic, None when not arrived
+        """
+        topics = list(dict.fromkeys(topics or []))
+
+        if not self.__is_subscribed_list.get(MQTT_CONNECTED_TOPIC):
+            self.client.on_message = self.__on_message
+
+            self.__connect()
+            self.client.subscribe(MQTT_CONNECTED_TOPIC, 0, None, None)
+            self.__is_subscribed_list[MQTT_CONNECTED_TOPIC] = True
+            self.__subscriptions[MQTT_CONNECTED_TOPIC] = 0
+
+        if wait and len(topics) > 0:
+            self.__wait_for_messages(topics)
+
+        return {topic: self.__messages.get(topic) for topic in topics}
+
+    def __wait_for_messages(self, topics: list[str]) -> None:
+        """Wait till every topic has a payload or timeout expires."""
+        with self.__message_stored:
+            self.__message_stored.wait_for(
+                lambda: all(topic in self.__messages for topic in topics),
+                self.__timeout,
+            )
+
+    def discovery_all(self) -> dict[str, str]:
+        """Subscribe to selected topic. This method is primary used for
+        subscribing with wild-card (#,+).
+        When wild-card is used, then all topic matching this will
+        be subscribed and collected therir payloads and topic representation.
+
+        e.g.: prefix/status/groundfloor/# - will match all groundfloor topics
+                    prefix/status/groundfloor/kitchen/temp - yes
+                    prefix/status/groundfloor/linvingroom/temp - yes
+                    prefix/status/firstfloor/bathroom/temp - no
+                    prefix/status/groundfloor/kitchen/fridge/temp - yes
+
+              prefix/status/groundfoor/+/temp - will get all groundfloor temp
+                    prefix/status/groundfloor/kitchen/temp - yes
+                    prefix/status/groundfloor/kitchen/lamp - no
+                    prefix/status/groundfloor/livingroom/temp - yes
+                    prefix/status/groundfloor/kitchen/fridge/temp - no
+
+        Discovery ends when no message arrived for the quiet window
+        derived from gaps between retained messages, or when the sentinel
+        message comes back. Result is available in last_discovery.
+        Messages keep going to listeners while discovery is running.
+
+        Returns:
+            dict[str, str]: Dictionary of all topics with their payloads
+        """
+        self.client.on_message = self.__on_message
+        self.__discovering = True
+        try:
+            self.__connect()
+            self.__quiescence.start()
+            self.client.subscribe(MQTT_DISCOVER_TOPIC, 0, None, None)
+            self.__subscriptions[MQTT_DISCOVER_TOPIC] = 0
+
+            if self.__discovery_sentinel:
+                # broker sends retained messages of the subscription before
+                # the message published after it
+                self.__sentinel_arrived = False
+                self.__sentinel_topic = (
+                    f"{MQTT_DISCOVERY_SENTINEL_TOPIC}/{uuid.uuid4().hex}"
+                )
+                self.client.subscribe(self.__sentinel_topic, 0, None, None)
+                self.client.publish(self.__sentinel_topic, None, 0)
+
+            # every discovered message re-arms the event, so discovery
+            # ends once no message arrived for the whole quiet window
+            reason = DiscoveryEnd.QUIET
+            while self.__discover_activity.wait(self.__quiescence.window):
+                self.__discover_activity.clear()
+
+                if self.__sentinel_arrived:
+                    reason = DiscoveryEnd.SENTINEL
+                    break
+            else:
+                if self.__quiescence.messages == 0:
+                    reason = DiscoveryEnd.TIMEOUT
+
+            if self.__sentinel_topic is not None:
+                self.client.unsubscribe(self.__sentinel_topic)
+                self.__sentinel_topic = None
+
+            self.__last_discovery = self.__quiescence.report(reason)
+            _LOGGER.info("Discovery finished %s", self.__last_discovery)
+
+            # keep payloads of other subscribed topics e.g. availability
+            self.__messages.update(self.__discovered)
+        finally:
+            self.__discovering = False
+
+        return self.__discovered
+
+    def __on_discover(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        msg,
+    ) -> None:
+        """Collect status messages while discovery_all is running, called
+        by on_message before the message is stored and passed to listeners.
+
+        Args:
+            client (MqttClient): Mqtt broker instance
+            msg (object): Topic with payload from broker
+        """
+        if msg.topic == self.__sentinel_topic:
+            self.__sentinel_arrived = True
+            self.__discover_activity.set()
+            return
+
+        # signal activity on every message, discovery_all will be waiting
+        # till messages will rising
+        self.__quiescence.arrived()
+        self.__discover_activity.set()
+
+        # pass only those who belongs to known device types
+        parsed = parse_topic(msg.topic)
+
+        if parsed.platform is not None and parsed.state == "status":
+            self.__discovered[msg.topic] = msg.payload
+
+    def __on_message(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        msg,
+    ) -> None:
+        """Callback function which is used for subscription
+
+        Args:
+            client (MqttClient): Instance of mqtt broker
+            userdata (_type_): Date about user
+            msg (object): Topic with payload from broker
+        """
+        self.__received += 1
+        self.__last_received = time.monotonic()
+
+        if self.__discovering:
+            self.__on_discover(client, userdata, msg)
+            if msg.topic == self.__sentinel_topic:
+                return
+
+        parsed = parse_topic(msg.topic)
+
+        if parsed.platform is not None:
+            # keep last value
+            self.__last_values[msg.topic] = (
+                copy.copy(self.__messages[msg.topic])
+                if msg.topic in self.__messages
+                else msg.payload
+            )
+            self.__messages[msg.topic] = msg.payload
+            # update info that the topic is subscribed
+            self.__is_subscribed_list[msg.topic] = True
+
+            if parsed.state == "connected":
+                self.__availability.update(msg.topic, msg.payload)
+
+        # wake up subscribe() and subscribe_many() once the payload is stored
+        self.__message_readed.set()
+        with self.__message_stored:
+            self.__message_stored.notify_all()
+
+        if self.__dispatcher is None:
+            self.__notify_listeners(msg.topic, msg.payload)
+        else:
+            self.__dispatcher.submit(msg.topic, msg.payload)
+
+    def __notify_listeners(self, topic: str, payload: Any) -> None:
+        """Call listeners of the topic with the payload."""
+        # This pass data change directely into the devices.
+        for listener in self.__listeners.match(topic):
+            listener(payload)
+
+        if self.__topic_listeners:
+            for listener in self.__topic_listeners.match(topic):
+                listener(topic, payload)
+
+    def __on_subscribe(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        mid,  # pylint: disable=unused-argument
+        granted_qos,  # pylint: disable=unused-argument
+        properties=None,  # pylint: disable=unused-argument
+    ):
+        """Callback for subscribe function. Is called after subscribe to
+        the topic. Will handle disconnection from mqtt broker loop
+
+        Args:
+            client (MqttClient): Instance of mqtt broker
+            userdata (_type_): Data about user
+            mid (_type_): MID
+            granted_qos (_type_): Quality of service is granted
+            properties (_type_, optional): Props from broker set.
+                Defaults to None.
+        """
+        _LOGGER.debug(mid)
+
+    def __disconnect(self) -> None:
+        """Disconnecting from broker and stopping broker's loop"""
+        self.close()
+        self.client.disconnect()
+
+        if self.__network_loop is not None:
+            self.__network_loop.detach(self.client)
+
+    def close(self) -> None:
+        """Close loop. Messages already queued for listeners are delivered,
+        queued publishes are dropped."""
+        if self.__scheduler is not None:
+            self.__scheduler.stop()
+
+        self.client.loop_stop()
+
+        if self.__dispatcher is not None:
+            self.__dispatcher.stop()
+
+    def disconnect(self) -> None:
+        """Disconnect mqtt client."""
+        return self.__disconnect()
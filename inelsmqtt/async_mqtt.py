@@ -0,0 +1,721 @@
+"""Asyncio front-end for inels-mqtt."""
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import uuid
+from typing import Any, Callable
+
+import paho.mqtt.client as mqtt
+
+from inelsmqtt import create_client
+from inelsmqtt.availability import AvailabilityTable
+from inelsmqtt.quiescence import DiscoveryReport, QuiescenceDetector
+from inelsmqtt.router import TopicRouter
+from inelsmqtt.util import parse_topic
+from inelsmqtt.const import (
+    MQTT_HOST,
+    MQTT_PORT,
+    MQTT_TIMEOUT,
+    MQTT_MAX_INFLIGHT,
+    MQTT_DISCOVERY_MIN_QUIET,
+    MQTT_DISCOVERY_MAX_QUIET,
+    MQTT_DISCOVERY_SENTINEL,
+    MQTT_SUPPRESS_REDUNDANT,
+    MAX_INFLIGHT_MESSAGES,
+    DISCOVERY_TIMEOUT_IN_SEC,
+    DISCOVERY_MIN_QUIET_IN_SEC,
+    MQTT_CONNECTED_PREFIX,
+    MQTT_CONNECTED_TOPIC,
+    MQTT_DISCOVER_TOPIC,
+    MQTT_DISCOVERY_SENTINEL_TOPIC,
+    DiscoveryEnd,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# interval of keepalive and reconnect handling
+MISC_LOOP_INTERVAL = 1
+
+
+class AsyncInelsMqtt:
+    """Asyncio wrapper for mqtt client.
+
+    Paho network traffic is driven directly by the running event loop
+    (socket reader/writer callbacks), so there is no network thread and
+    all paho callbacks are called in the loop. No blocking call and no
+    thread hop is needed to wait for broker answers.
+    """
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+    ) -> None:
+        """AsyncInelsMqtt instance initialization.
+
+        Args:
+            config dict[str, Any]: config for mqtt connection, the same
+              as for InelsMqtt
+        """
+        self.__client = create_client(config)
+
+        self.__client.on_connect = self.__on_connect
+        self.__client.on_publish = self.__on_publish
+        self.__client.on_subscribe = self.__on_subscribe
+        self.__client.on_disconnect = self.__on_disconnect
+        self.__client.on_message = self.__on_message
+        self.__client.on_socket_open = self.__on_socket_open
+        self.__client.on_socket_close = self.__on_socket_close
+        self.__client.on_socket_register_write = self.__on_socket_register_write
+        self.__client.on_socket_unregister_write = self.__on_socket_unregister_write
+
+        self.__host = config[MQTT_HOST]
+        self.__port = config[MQTT_PORT]
+
+        _t = config.get(MQTT_TIMEOUT)
+        self.__timeout = _t if _t is not None else DISCOVERY_TIMEOUT_IN_SEC
+
+        _t = config.get(MQTT_MAX_INFLIGHT)
+        self.__max_inflight = _t if _t is not None else MAX_INFLIGHT_MESSAGES
+        self.__client.max_inflight_messages_set(self.__max_inflight)
+
+        _t = config.get(MQTT_DISCOVERY_MIN_QUIET)
+        min_quiet = _t if _t is not None else DISCOVERY_MIN_QUIET_IN_SEC
+        _t = config.get(MQTT_DISCOVERY_MAX_QUIET)
+        max_quiet = _t if _t is not None else self.__timeout
+        self.__quiescence = QuiescenceDetector(min_quiet, max_quiet)
+        self.__discovery_sentinel = bool(config.get(MQTT_DISCOVERY_SENTINEL))
+        self.__suppress_redundant = bool(config.get(MQTT_SUPPRESS_REDUNDANT))
+        self.__suppressed = 0
+        self.__sentinel_topic: str | None = None
+        self.__sentinel_arrived = False
+        # discovery_all is collecting status messages
+        self.__discovering = False
+        self.__last_discovery: DiscoveryReport | None = None
+
+        self.__listeners = TopicRouter()
+        self.__topic_listeners = TopicRouter()
+        self.__is_subscribed_list = dict[str, bool]()
+        # qos or options of subscribed topics, restored after reconnect
+        self.__subscriptions = dict[str, Any]()
+        self.__last_values = dict[str, str]()
+        self.__messages = dict[str, str]()
+        self.__availability = AvailabilityTable()
+        self.__discovered = dict[str, str]()
+        self.__is_available = False
+        self.__closing = False
+
+        self.__pending_acks = dict[int, asyncio.Future]()
+        self.__early_acks = set[int]()
+        self.__publishing = False
+        self.__payload_waiters = dict[str, list[asyncio.Future]]()
+
+        # asyncio primitives are bound to the loop in connect
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__connected: asyncio.Future | None = None
+        self.__inflight: asyncio.Semaphore | None = None
+        self.__discover_activity: asyncio.Event | None = None
+        self.__misc_task: asyncio.Task | None = None
+
+    @property
+    def client(self) -> mqtt.Client:
+        """Paho mqtt client."""
+        return self.__client
+
+    @property
+    def is_available(self) -> bool:
+        """Is broker available
+
+        Returns:
+            bool: Get information of mqtt broker availability
+        """
+        return self.__is_available
+
+    @property
+    def last_discovery(self) -> DiscoveryReport | None:
+        """Report of the last discovery, None before the first one."""
+        return self.__last_discovery
+
+    @property
+    def availability(self) -> AvailabilityTable:
+        """Availability of devices fed by subscribe_availability."""
+        return self.__availability
+
+    @property
+    def suppress_redundant(self) -> bool:
+        """Are commands for devices already in the state not published."""
+        return self.__suppress_redundant
+
+    @property
+    def suppressed_publishes(self) -> int:
+        """Amount of commands not published because the device already
+        was in the requested state."""
+        return self.__suppressed
+
+    def publish_suppressed(self, topic: str) -> None:
+        """Record command to the set topic which was not published."""
+        self.__suppressed += 1
+        _LOGGER.debug("%s - device already in the state, not published", topic)
+
+    @property
+    def list_of_listeners(self) -> dict[str, list[Callable[[Any], Any]]]:
+        """List of listeners by their topic filter."""
+        return self.__listeners.filters
+
+    def is_subscribed(self, topic) -> bool:
+        """Get info if the topic is subscribed in device
+
+        Returns:
+            bool: state
+        """
+        is_subscribed = self.__is_subscribed_list.get(topic)
+        if is_subscribed is None and topic.startswith(MQTT_CONNECTED_PREFIX):
+            is_subscribed = self.__is_subscribed_list.get(MQTT_CONNECTED_TOPIC)
+
+        return False if is_subscribed is None else is_subscribed
+
+    def last_value(self, topic) -> str:
+        """Get last value of the selected topic
+
+        Args:
+            topic (str): topic name
+
+        Returns:
+            str: last value of the topic
+        """
+        return self.__last_values.get(topic)
+
+    def messages(self) -> dict[str, str]:
+        """List of all messages
+
+        Returns:
+            dist[str, str]: List of all messages (topics)
+            from broker subscribed.
+        """
+        return self.__messages
+
+    def subscribe_listener(self, topic: str, fnc: Callable[[Any], Any]) -> None:
+        """Append new item into the datachange listener. Topic can contain
+        wildcards (+, #) and there can be many listeners for one topic."""
+        self.__listeners.add(topic, fnc)
+
+    def unsubscribe_listener(
+        self, topic: str, fnc: Callable[[Any], Any] = None
+    ) -> bool:
+        """Remove listener of the topic, all of them when fnc is None."""
+        return self.__listeners.remove(topic, fnc)
+
+    def subscribe_topic_listener(
+        self, topic: str, fnc: Callable[[str, Any], Any]
+    ) -> None:
+        """Append listener called with the topic and the payload, e.g. to
+        watch all status topics with inels/status/#."""
+        self.__topic_listeners.add(topic, fnc)
+
+    def unsubscribe_topic_listener(
+        self, topic: str, fnc: Callable[[str, Any], Any] = None
+    ) -> bool:
+        """Remove topic listener, all of them when fnc is None."""
+        return self.__topic_listeners.remove(topic, fnc)
+
+    def unsubscribe_listeners(self) -> None:
+        """Unsubscribe listeners."""
+        self.__listeners.clear()
+        self.__topic_listeners.clear()
+
+    def restore_messages(self, messages: dict[str, Any]) -> None:
+        """Fill messages with payloads known from previous run, e.g.
+        discovery snapshot. Payloads arriving from broker overwrite them.
+
+        Args:
+            messages (dict[str, Any]): topics with their payloads
+        """
+        for topic, payload in messages.items():
+            self.__messages.setdefault(topic, payload)
+            self.__last_values.setdefault(topic, payload)
+
+            if (
+                topic.startswith(MQTT_CONNECTED_PREFIX)
+                and topic not in self.__availability
+            ):
+                self.__availability.update(topic, payload)
+
+    async def test_connection(self) -> bool:
+        """Test connection. After that is disconnected
+
+        Returns:
+            bool: Is broker available or not
+        """
+        await self.connect()
+        self.disconnect()
+
+        return self.__is_available
+
+    async def connect(self) -> bool:
+        """Connect to the broker and wait for its CONNACK. Does nothing
+        when the client is already connected.
+
+        Returns:
+            bool: Is broker available or not
+        """
+        if self.__loop is None:
+            self.__loop = asyncio.get_running_loop()
+            self.__inflight = asyncio.Semaphore(self.__max_inflight)
+            self.__discover_activity = asyncio.Event()
+
+        if self.__connected is None:
+            self.__closing = False
+            self.__connected = self.__loop.create_future()
+            try:
+                self.__client.connect(self.__host, self.__port)
+            except OSError as err:
+                # next call or the misc loop tries it again
+                self.__connected = None
+                self.__is_available = False
+                _LOGGER.warning("%s - connect failed %s", self.__host, err)
+            finally:
+                if self.__misc_task is None:
+                    self.__misc_task = self.__loop.create_task(self.__misc_loop())
+
+            if self.__connected is None:
+                return False
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self.__connected), self.__timeout)
+        except asyncio.TimeoutError:
+            self.__is_available = False
+
+        return self.__is_available
+
+    def disconnect(self) -> None:
+        """Disconnect mqtt client."""
+        self.__closing = True
+        self.__client.disconnect()
+
+        if self.__misc_task is not None:
+            self.__misc_task.cancel()
+            self.__misc_task = None
+
+    async def __misc_loop(self) -> None:
+        """Keepalive of the connection and reconnecting."""
+        while True:
+            await asyncio.sleep(MISC_LOOP_INTERVAL)
+
+            if self.__client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+                continue
+
+            if self.__closing is False and self.__connected is None:
+                try:
+                    self.__connected = self.__loop.create_future()
+                    self.__client.reconnect()
+                except OSError as err:
+                    self.__connected = None
+                    _LOGGER.debug("%s - reconnect failed %s", self.__host, err)
+
+    def __on_socket_open(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho socket is read by the event loop."""
+        self.__loop.add_reader(sock, client.loop_read)
+
+    def __on_socket_close(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho socket is closed."""
+        self.__loop.remove_reader(sock)
+
+    def __on_socket_register_write(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho has data to send."""
+        self.__loop.add_writer(sock, client.loop_write)
+
+    def __on_socket_unregister_write(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho has sent all data."""
+        self.__loop.remove_writer(sock)
+
+    def __on_connect(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        flag,
+        reason_code,
+        properties=None,  # pylint: disable=unused-argument
+    ) -> None:
+        """On connection callback function
+
+        Args:
+            client (MqttClient): instance of mqtt client
+            properties (_type_, optional): Props from mqtt sets. Defaults None
+        """
+        self.__is_available = reason_code == mqtt.CONNACK_ACCEPTED
+
+        # clean session of the reconnect lost subscriptions of the previous
+        # one, subscribe them again before anybody waits for the connection
+        if (
+            self.__is_available
+            and self.__subscriptions
+            and not flag.get("session present")
+        ):
+            self.__client.subscribe(list(self.__subscriptions.items()))
+            for topic in self.__subscriptions:
+                self.__is_subscribed_list[topic] = True
+
+        _LOGGER.info(
+            "Mqtt broker %s:%s %s",
+            self.__host,
+            self.__port,
+            "is connected" if self.__is_available else "is not connected",
+        )
+
+        if self.__connected is not None and not self.__connected.done():
+            self.__connected.set_result(self.__is_available)
+
+    def __on_disconnect(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        reason_code,
+        properties=None,  # pylint: disable=unused-argument
+    ) -> None:
+        """On disconnect callback function
+
+        Args:
+            client (mqtt.Client): instance of the mqtt client
+            userdata (Any): users data
+            reason_code (number): reason code
+        """
+        _LOGGER.info("%s - disconnecting reason [%s]", self.__host, reason_code)
+
+        self.__is_available = False
+        self.__connected = None
+
+        for item in self.__is_subscribed_list:
+            self.__is_subscribed_list[item] = False
+
+        # acknowledges will never come for this connection
+        for ack in self.__pending_acks.values():
+            if not ack.done():
+                ack.set_result(False)
+        self.__pending_acks.clear()
+
+    async def publish(
+        self, topic, payload, qos=0, retain=True, properties=None
+    ) -> bool:
+        """Publish to mqtt broker and wait for acknowledge. Many publish
+        calls can be awaited at once (e.g. asyncio.gather), up to the
+        max_inflight window.
+
+        Args:
+            topic (str): topic string where to publish
+            payload (str): data content
+            qos (int, optional): quality of service. Defaults to 0.
+            retain (bool, optional): Broke will keep message after sending it
+              to all subscribers. Defaults to True.
+            properties (_type_, optional): Props from mqtt sets.
+              Defaults to None.
+
+        Returns:
+            bool: True when the broker has acknowledged the message
+        """
+        await self.connect()
+
+        async with self.__inflight:
+            self.__early_acks.clear()
+            self.__publishing = True
+            try:
+                info = self.__client.publish(topic, payload, qos, retain, properties)
+            finally:
+                self.__publishing = False
+
+            # paho without network thread can acknowledge during publish call
+            if info.mid in self.__early_acks:
+                return True
+
+            if info.rc != mqtt.MQTT_ERR_SUCCESS and qos == 0:
+                return False
+
+            ack = self.__loop.create_future()
+            self.__pending_acks[info.mid] = ack
+
+            try:
+                return await asyncio.wait_for(ack, self.__timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.__pending_acks.pop(info.mid, None)
+
+    def __on_publish(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        mid,
+    ) -> None:
+        """Callback function called after publish has been created.
+
+        Args:
+            client (MqttClient): Instance of mqtt broker
+            userdata (object): Published data
+            mid (_type_): MID
+        """
+        ack = self.__pending_acks.pop(mid, None)
+
+        if ack is None:
+            if self.__publishing:
+                self.__early_acks.add(mid)
+        elif not ack.done():
+            ack.set_result(True)
+
+    async def subscribe(self, topic, qos=0, options=None, properties=None) -> Any:
+        """Subscribe to selected topic and wait for its payload.
+
+        Args:
+            topic (str): Topic string representation
+            qos (_type_): Quality of service.
+            options (_type_): Subscribe options used instead of qos
+              with mqtt v5
+            properties (_type_, optional): Props from mqtt set.
+              Defaults to None.
+
+        Returns:
+            Any: payload of the topic or None when not arrived in time
+        """
+        payloads = await self.subscribe_many([topic], qos, options, properties)
+        return payloads[topic]
+
+    async def subscribe_many(
+        self, topics: list[str], qos=0, options=None, properties=None, wait=True
+    ) -> dict[str, Any]:
+        """Subscribe to the list of topics in one SUBSCRIBE packet and
+        wait once for all of them.
+
+        Args:
+            topics (list[str]): Topics string representation
+            qos (_type_): Quality of service.
+            options (_type_): Subscribe options used instead of qos
+              with mqtt v5
+            properties (_type_, optional): Props from mqtt set.
+              Defaults to None.
+            wait (bool, optional): Wait till every topic has a payload
+              or timeout expires. Defaults to True.
+
+        Returns:
+            dict[str, Any]: payload for every topic, None when not arrived
+        """
+        topics = list(dict.fromkeys(topics))
+        if len(topics) == 0:
+            return {}
+
+        await self.connect()
+
+        self.__client.subscribe(
+            [(topic, options if options is not None else qos) for topic in topics],
+            properties=properties,
+        )
+
+        for topic in topics:
+            self.__is_subscribed_list[topic] = True
+            self.__subscriptions[topic] = options if options is not None else qos
+
+        if wait:
+            await self.__wait_for_messages(topics)
+
+        return {topic: self.__messages.get(topic) for topic in topics}
+
+    async def subscribe_availability(
+        self, topics: list[str] | None = None, wait=True
+    ) -> dict[str, Any]:
+        """Subscribe availability of all devices with one inels/connected/#
+        subscription, the same way as InelsMqtt.subscribe_availability.
+
+        Args:
+            topics (list[str], optional): connected topics of devices
+              to wait for. Defaults to None.
+            wait (bool, optional): Wait till every topic has a payload
+              or timeout expires. Defaults to True.
+
+        Returns:
+            dict[str, Any]: payload for every topic, None when not arrived
+        """
+        topics = list(dict.fromkeys(topics or []))
+
+        if not self.__is_subscribed_list.get(MQTT_CONNECTED_TOPIC):
+            await self.connect()
+
+            self.__client.subscribe(MQTT_CONNECTED_TOPIC, 0, None, None)
+            self.__is_subscribed_list[MQTT_CONNECTED_TOPIC] = True
+            self.__subscriptions[MQTT_CONNECTED_TOPIC] = 0
+
+        if wait:
+            await self.__wait_for_messages(topics)
+
+        return {topic: self.__messages.get(topic) for topic in topics}
+
+    async def __wait_for_messages(self, topics: list[str]) -> None:
+        """Wait till every topic has a payload or timeout expires. Payloads
+        are delivered by the loop, so none can arrive before the waiters
+        are registered."""
+        waiters = []
+        for topic in topics:
+            if topic not in self.__messages:
+                waiter = self.__loop.create_future()
+                self.__payload_waiters.setdefault(topic, []).append(waiter)
+                waiters.append((topic, waiter))
+
+        if len(waiters) == 0:
+            return
+
+        try:
+            await asyncio.wait(
+                [waiter for _, waiter in waiters], timeout=self.__timeout
+            )
+        finally:
+            # waiters which timed out or were cancelled are forgotten
+            for topic, waiter in waiters:
+                waiter.cancel()
+                pending = self.__payload_waiters.get(topic)
+                if pending is not None and waiter in pending:
+                    pending.remove(waiter)
+                    if len(pending) == 0:
+                        del self.__payload_waiters[topic]
+
+    async def discovery_all(self) -> dict[str, str]:
+        """Subscribe to all inels status topics and collect them till
+        the broker stops sending retained messages, the same way
+        as InelsMqtt.discovery_all.
+
+        Returns:
+            dict[str, str]: Dictionary of all topics with their payloads
+        """
+        await self.connect()
+
+        self.__discovering = True
+        try:
+            self.__quiescence.start()
+            self.__client.subscribe(MQTT_DISCOVER_TOPIC, 0, None, None)
+            self.__subscriptions[MQTT_DISCOVER_TOPIC] = 0
+
+            if self.__discovery_sentinel:
+                self.__sentinel_arrived = False
+                self.__sentinel_topic = (
+                    f"{MQTT_DISCOVERY_SENTINEL_TOPIC}/{uuid.uuid4().hex}"
+                )
+                self.__client.subscribe(self.__sentinel_topic, 0, None, None)
+                self.__client.publish(self.__sentinel_topic, None, 0)
+
+            # every discovered message re-arms the event
+            reason = DiscoveryEnd.QUIET
+            while True:
+                try:
+                    await asyncio.wait_for(
+                        self.__discover_activity.wait(), self.__quiescence.window
+                    )
+                except asyncio.TimeoutError:
+                    if self.__quiescence.messages == 0:
+                        reason = DiscoveryEnd.TIMEOUT
+                    break
+                self.__discover_activity.clear()
+
+                if self.__sentinel_arrived:
+                    reason = DiscoveryEnd.SENTINEL
+                    break
+
+            if self.__sentinel_topic is not None:
+                self.__client.unsubscribe(self.__sentinel_topic)
+                self.__sentinel_topic = None
+
+            self.__last_discovery = self.__quiescence.report(reason)
+            _LOGGER.info("Discovery finished %s", self.__last_discovery)
+        finally:
+            self.__discovering = False
+
+        # keep payloads of other subscribed topics e.g. availability
+        self.__messages.update(self.__discovered)
+
+        return self.__discovered
+
+    def __on_discover(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        msg,
+    ) -> None:
+        """Collect status messages while discovery_all is running, called
+        by on_message before the message is stored and passed to listeners.
+
+        Args:
+            client (MqttClient): Mqtt broker instance
+            msg (object): Topic with payload from broker
+        """
+        if msg.topic == self.__sentinel_topic:
+            self.__sentinel_arrived = True
+            self.__discover_activity.set()
+            return
+
+        self.__quiescence.arrived()
+        self.__discover_activity.set()
+
+        parsed = parse_topic(msg.topic)
+
+        if parsed.platform is not None and parsed.state == "status":
+            self.__discovered[msg.topic] = msg.payload
+
+    def __on_message(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        msg,
+    ) -> None:
+        """Callback function which is used for subscription
+
+        Args:
+            client (MqttClient): Instance of mqtt broker
+            userdata (_type_): Date about user
+            msg (object): Topic with payload from broker
+        """
+        if self.__discovering:
+            self.__on_discover(client, userdata, msg)
+            if msg.topic == self.__sentinel_topic:
+                return
+
+        parsed = parse_topic(msg.topic)
+
+        if parsed.platform is not None:
+            # keep last value
+            self.__last_values[msg.topic] = (
+                copy.copy(self.__messages[msg.topic])
+                if msg.topic in self.__messages
+                else msg.payload
+            )
+            self.__messages[msg.topic] = msg.payload
+            self.__is_subscribed_list[msg.topic] = True
+
+            if parsed.state == "connected":
+                self.__availability.update(msg.topic, msg.payload)
+
+        for waiter in self.__payload_waiters.pop(msg.topic, []):
+            if not waiter.done():
+                waiter.set_result(msg.payload)
+
+        # This pass data change directely into the devices.
+        for listener in self.__listeners.match(msg.topic):
+            listener(msg.payload)
+
+        if self.__topic_listeners:
+            for listener in self.__topic_listeners.match(msg.topic):
+                listener(msg.topic, msg.payload)
+
+    def __on_subscribe(
+        self,
+        client: mqtt.Client,  # pylint: disable=unused-argument
+        userdata,  # pylint: disable=unused-argument
+        mid,
+        granted_qos,  # pylint: disable=unused-argument
+        properties=None,  # pylint: disable=unused-argument
+    ) -> None:
+        """Callback for subscribe function.
+
+        Args:
+            client (MqttClient): Instance of mqtt broker
+            userdata (_type_): Data about user
+            mid (_type_): MID
+            granted_qos (_type_): Quality of service is granted
+            properties (_type_, optional): Props from broker set.
+                Defaults to None.
+        """
+        _LOGGER.debug(mid)
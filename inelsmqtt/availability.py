@@ -0,0 +1,69 @@
+"""Availability of devices fed by their connected topics."""
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from .const import DEVICE_CONNCTED
+
+
+class AvailabilityTable:
+    """Availability of every device by its connected topic.
+
+    Payload is decoded once when it arrives, reading the availability
+    is a plain dict lookup. Listeners are called only when the
+    availability of the device flips, unknown device counts as
+    unavailable.
+    """
+
+    def __init__(self) -> None:
+        """Create empty table."""
+        self.__available: dict[str, bool] = {}
+        self.__listeners: list[Callable[[str, bool], Any]] = []
+
+    def __len__(self) -> int:
+        """Amount of devices with known availability."""
+        return len(self.__available)
+
+    def __contains__(self, topic: str) -> bool:
+        """Is availability of the connected topic known."""
+        return topic in self.__available
+
+    def get(self, topic: str) -> Optional[bool]:
+        """Availability of the connected topic, None when unknown."""
+        return self.__available.get(topic)
+
+    def subscribe_listener(self, fnc: Callable[[str, bool], Any]) -> None:
+        """Register listener called with the connected topic and the new
+        availability when it flips."""
+        if fnc not in self.__listeners:
+            self.__listeners.append(fnc)
+
+    def unsubscribe_listener(self, fnc: Callable[[str, bool], Any]) -> None:
+        """Unregister availability listener."""
+        if fnc in self.__listeners:
+            self.__listeners.remove(fnc)
+
+    def update(self, topic: str, payload: Any) -> bool:
+        """Store availability from the payload of the connected topic
+
+        Args:
+            topic (str): connected topic of the device
+            payload (Any): on/off payload as received from broker
+
+        Returns:
+            bool: True when the availability flipped
+        """
+        if isinstance(payload, (bytes, bytearray)):
+            payload = payload.decode(errors="replace")
+
+        available = DEVICE_CONNCTED.get(payload) is True
+        previous = self.__available.get(topic, False)
+        self.__available[topic] = available
+
+        if available is previous:
+            return False
+
+        for listener in list(self.__listeners):
+            listener(topic, available)
+
+        return True
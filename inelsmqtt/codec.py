@@ -0,0 +1,230 @@
+"""Registry of conversions between inels payloads and HA values."""
+from __future__ import annotations
+
+import binascii
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import attr
+
+from .const import VALUE_CACHE_SIZE
+
+# decode(inels status payload, last value) -> (HA value, inels set value)
+DecodeType = Callable[[bytes, Any], tuple[Any, Any]]
+# encode(HA value, last value) -> (inels status value, inels set value, HA value)
+EncodeType = Callable[[Any, Any], tuple[Any, Any, Any]]
+
+
+@attr.s(slots=True, frozen=True)
+class CacheInfo:
+    """Statistics of the ValueCache."""
+
+    hits: int = attr.ib()
+    misses: int = attr.ib()
+    evictions: int = attr.ib()
+    size: int = attr.ib()
+    maxsize: int = attr.ib()
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+
+class ValueCache:
+    """Bounded LRU cache of decoded values. Cached values are shared,
+    so they must not be modified.
+
+    Single OrderedDict operations are atomic, so the cache can be used
+    from the network thread and readers at once without a lock. Only
+    the statistics may miss a concurrent update.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        """Create empty cache
+
+        Args:
+            maxsize (int): max amount of kept values, least recently
+              used value is evicted
+        """
+        self.__maxsize = maxsize
+        self.__values: OrderedDict[Hashable, Any] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key: Hashable, create: Callable[..., Any], *args: Any) -> Any:
+        """Get value of the key, create and keep it when missing
+
+        Args:
+            key (Hashable): e.g. element with payload
+            create (Callable[..., Any]): creates the value on miss
+            args (Any): arguments of create
+
+        Returns:
+            Any: shared value
+        """
+        values = self.__values
+        try:
+            value = values[key]
+        except KeyError:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+            try:
+                values.move_to_end(key)
+            except KeyError:
+                # evicted meanwhile by other thread
+                pass
+            return value
+
+        value = values[key] = create(*args)
+        if len(values) > self.__maxsize:
+            try:
+                values.popitem(last=False)
+                self.__evictions += 1
+            except KeyError:
+                pass
+
+        return value
+
+    def clear(self) -> None:
+        """Drop all values and statistics."""
+        self.__values.clear()
+        self.__hits = self.__misses = self.__evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Hits, misses, evictions and size of the cache."""
+        return CacheInfo(
+            hits=self.__hits,
+            misses=self.__misses,
+            evictions=self.__evictions,
+            size=len(self.__values),
+            maxsize=self.__maxsize,
+        )
+
+
+@attr.s(slots=True, frozen=True)
+class Codec:
+    """Conversion of one element between inels and HA values."""
+
+    decode: DecodeType = attr.ib()
+    encode: Optional[EncodeType] = attr.ib(default=None)
+    # decoded values depend only on the payload and the element has only
+    # a few distinct payloads, so they can be shared from ValueCache
+    cacheable: bool = attr.ib(default=False)
+    cache: Optional[ValueCache] = attr.ib(
+        init=False,
+        eq=False,
+        repr=False,
+        default=attr.Factory(
+            lambda self: ValueCache(VALUE_CACHE_SIZE) if self.cacheable else None,
+            takes_self=True,
+        ),
+    )
+
+
+_CODECS: dict[Any, Codec] = {}
+
+
+def register_codec(element: Any, codec: Codec) -> None:
+    """Register conversion of the element. Registered codec of
+    the same element is replaced.
+
+    Args:
+        element (Any): Element or any other hashable identification
+          of the device used as inels_type of DeviceValue
+        codec (Codec): decode and encode callables
+    """
+    _CODECS[element] = codec
+
+
+def get_codec(element: Any) -> Optional[Codec]:
+    """Codec of the element, None when the element is not registered."""
+    return _CODECS.get(element)
+
+
+def unhexlify(payload: bytes) -> bytes:
+    """Bytes of the inels payload e.g. b"07\\n01\\n" -> b"\\x07\\x01". Hex digit
+    pairs are read straight from the payload, without any str."""
+    return binascii.unhexlify(payload.replace(b"\n", b""))
+
+
+def cache_info() -> CacheInfo:
+    """Statistics of value caches of all registered codecs together."""
+    infos = [codec.cache.info() for codec in _CODECS.values() if codec.cache]
+
+    return CacheInfo(
+        hits=sum(info.hits for info in infos),
+        misses=sum(info.misses for info in infos),
+        evictions=sum(info.evictions for info in infos),
+        size=sum(info.size for info in infos),
+        maxsize=sum(info.maxsize for info in infos),
+    )
+
+
+def compile_field(indices: list[int]) -> Callable[[bytes], int]:
+    """Compile reader of the number stored in the payload bytes
+
+    Args:
+        indices (list[int]): positions of bytes, most significant first
+
+    Returns:
+        Callable[[bytes], int]: reader of the number
+    """
+    if len(indices) == 1:
+        (index,) = indices
+        return lambda data: data[index]
+
+    if len(indices) == 2:
+        high, low = indices
+        return lambda data: (data[high] << 8) | data[low]
+
+    indices = tuple(indices)
+
+    def read(data: bytes) -> int:
+        value = 0
+        for index in indices:
+            value = (value << 8) | data[index]
+        return value
+
+    return read
+
+
+def compile_layout(layout: dict[str, list[int]]) -> Callable[[bytes], dict[str, int]]:
+    """Compile reader of all fields of the layout e.g. DEVICE_TYPE_10_DATA
+
+    Args:
+        layout (dict[str, list[int]]): field names with positions of bytes
+
+    Returns:
+        Callable[[bytes], dict[str, int]]: reader of all fields
+    """
+    readers = tuple((name, compile_field(indices)) for name, indices in layout.items())
+
+    def read(data: bytes) -> dict[str, int]:
+        return {name: reader(data) for name, reader in readers}
+
+    return read
+
+
+def layout_decoder(
+    layout: dict[str, list[int]], build: Callable[[dict[str, int]], tuple[Any, Any]]
+) -> DecodeType:
+    """Create decoder of the payload with fixed layout
+
+    Args:
+        layout (dict[str, list[int]]): field names with positions of bytes
+        build (Callable[[dict[str, int]], tuple[Any, Any]]): creates HA value
+          and inels set value from the field numbers
+
+    Returns:
+        DecodeType: decode callable for the Codec
+    """
+    read = compile_layout(layout)
+
+    def decode(payload: bytes, last_value: Any) -> tuple[Any, Any]:
+        return build(read(unhexlify(payload)))
+
+    return decode
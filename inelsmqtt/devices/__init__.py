@@ -1,341 +1,467 @@
-"""Class handle base info about device."""
-import logging
-import json
-
-from typing import Any, Callable
-
-from inelsmqtt.util import DeviceValue
-from inelsmqtt import InelsMqtt
-from inelsmqtt.const import Platform, Element
-from inelsmqtt.const import (
-    DEVICE_TYPE_DICT,
-    FRAGMENT_DOMAIN,
-    INELS_DEVICE_TYPE_DICT,
-    MANUFACTURER,
-    TOPIC_FRAGMENTS,
-    FRAGMENT_DEVICE_TYPE,
-    FRAGMENT_SERIAL_NUMBER,
-    FRAGMENT_UNIQUE_ID,
-    DEVICE_CONNCTED,
-    VERSION,
-)
-
-_LOGGER = logging.getLogger(__name__)
-
-
-class Device(object):
-    """Carry basic device stuff
-
-    Args:
-        object (_type_): default object it is new style of python class coding
-    """
-
-    def __init__(
-        self,
-        mqtt: InelsMqtt,
-        state_topic: str,
-        title: str = None,
-    ) -> None:
-        """Initialize instance of device
-
-        Args:
-            mqtt (InelsMqtt): instance of mqtt broker
-            status_topic (str): String format of status topic
-            set_topic (str): Sring format of set topic
-            title (str, optional): Formal name of the device. When None
-            then will be same as unique_id. Defaults to None.
-        """
-        fragments = state_topic.split("/")
-
-        self.__mqtt = mqtt
-        self.__device_type: Platform = DEVICE_TYPE_DICT[
-            fragments[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]
-        ]
-        self.__inels_type: Element = INELS_DEVICE_TYPE_DICT[
-            fragments[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]
-        ]
-        self.__unique_id = fragments[TOPIC_FRAGMENTS[FRAGMENT_UNIQUE_ID]]
-        self.__parent_id = fragments[TOPIC_FRAGMENTS[FRAGMENT_SERIAL_NUMBER]]
-        self.__state_topic = state_topic
-        self.__set_topic = None
-
-        if (
-            self.__device_type is not Platform.SENSOR
-            and self.__device_type is not Platform.BUTTON
-        ):
-            self.__set_topic = f"{fragments[TOPIC_FRAGMENTS[FRAGMENT_DOMAIN]]}/set/{fragments[TOPIC_FRAGMENTS[FRAGMENT_SERIAL_NUMBER]]}/{fragments[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]}/{fragments[TOPIC_FRAGMENTS[FRAGMENT_UNIQUE_ID]]}"  # noqa: E501
-
-        self.__connected_topic = f"{fragments[TOPIC_FRAGMENTS[FRAGMENT_DOMAIN]]}/connected/{fragments[TOPIC_FRAGMENTS[FRAGMENT_SERIAL_NUMBER]]}/{fragments[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]}/{fragments[TOPIC_FRAGMENTS[FRAGMENT_UNIQUE_ID]]}"  # noqa: E501
-        self.__title = title if title is not None else self.__unique_id
-        self.__domain = fragments[TOPIC_FRAGMENTS[FRAGMENT_DOMAIN]]
-        self.__state: Any = None
-        self.__values: DeviceValue = None
-        self.__features: dict[str] = None
-        self.__listeners = dict[str, Callable[[Any], Any]]()
-
-        # subscribe availability
-        self.__mqtt.subscribe(self.__connected_topic, 0, None, None)
-        self.__mqtt.subscribe_listener(state_topic, self._callback)
-
-    @property
-    def unique_id(self) -> str:
-        """Get unique_id of the device
-
-        Returns:
-            str: Unique ID
-        """
-        return self.__unique_id
-
-    @property
-    def is_subscribed(self) -> bool:
-        """Is device subscribed to mqtt
-
-        Returns:
-            bool: True/False
-        """
-        return self.__mqtt.is_subscribed(self.__state_topic)
-
-    @property
-    def listeners(self) -> dict[str, Callable[[Any], Any]]:
-        """List of registered listeners on device"""
-        return self.__listeners
-
-    @property
-    def inels_type(self) -> Element:
-        """Get inels type of the device
-
-        Returns:
-            str: Type
-        """
-        return self.__inels_type
-
-    @property
-    def device_type(self) -> Platform:
-        """Get type of the device
-
-        Returns:
-            Platform: Type
-        """
-        return self.__device_type
-
-    @property
-    def parent_id(self) -> str:
-        """Get Id of the controller (PLC, Bridge)
-
-        Returns:
-            str: Parent ID
-        """
-        return self.__parent_id
-
-    @property
-    def title(self) -> str:
-        """Get name of the device
-
-        Returns:
-            str: Name
-        """
-        return self.__title
-
-    @property
-    def is_available(self) -> bool:
-        """Get info about availability of device
-
-        Returns:
-            bool: True/False
-        """
-        val = self.__mqtt.messages().get(self._Device__connected_topic)
-        if val is None:
-            val = "off\n"
-        elif isinstance(val, (bytes, bytearray)):
-            val = val.decode()
-
-        return DEVICE_CONNCTED.get(val)
-
-    @property
-    def set_topic(self) -> str:
-        """Set topic
-
-        Returns:
-            str: string of the set topic
-        """
-        return self.__set_topic
-
-    @property
-    def state_topic(self) -> str:
-        """State topic
-
-        Returns:
-            str: string of the status topic
-        """
-        return self.__state_topic
-
-    @property
-    def connected_topic(self) -> str:
-        """Connected topic
-
-        Returns:
-            str: string of the connected topic
-        """
-        return self.__connected_topic
-
-    @property
-    def domain(self) -> str:
-        """Domain name of the topic
-           it should represent the manufacturer
-
-        Returns:
-            str: Name of the domain
-        """
-        return self.__domain
-
-    @property
-    def state(self) -> Any:
-        """State of the device."""
-        if self.__state is None:
-            self.get_value()
-
-        return self.__state
-
-    @property
-    def values(self) -> DeviceValue:
-        """Get values of inels and ha type."""
-        return self.__values
-
-    @property
-    def last_values(self) -> DeviceValue:
-        """Get last value of the device
-
-        Returns:
-            DeviceValue: latest values in many formats
-        """
-        return self.__get_value(self.__mqtt.last_value(self.__state_topic))
-
-    @property
-    def mqtt(self) -> InelsMqtt:
-        """Instnace of broker."""
-        return self.__mqtt
-
-    @property
-    def features(self) -> dict[str]:
-        """List of features of device."""
-        return self.__features
-
-    def subscribe_listerner(self, topic: str, fnc: Callable[[Any], Any]) -> None:
-        """Append new item into the datachage listener."""
-        self.__listeners[topic] = fnc
-
-    def update_value(self, new_value: Any) -> DeviceValue:
-        """Update value after broker change it."""
-        return self.__get_value(new_value)
-
-    def __get_value(self, val: Any) -> DeviceValue:
-        """Get value and transform into the DeviceValue."""
-        dev_value = DeviceValue(
-            self.__device_type,
-            self.__inels_type,
-            inels_value=(val.decode() if val is not None else None),
-        )
-
-        self.__state = dev_value.ha_value
-        self.__values = dev_value
-
-        return dev_value
-
-    def _set_features(self, features: dict[str]) -> dict[str]:
-        """Set features to the device."""
-        self.__features = features
-
-    def _callback(self, new_value: Any) -> None:
-        """Get value from mqtt when arrived."""
-        self.update_value(new_value)
-
-        for listener in self.__listeners:
-            self.__listeners[listener](new_value)
-
-    def get_value(self) -> DeviceValue:
-        """Get value from inels
-
-        Returns:
-            Any: DeviceValue
-        """
-        val = self.__mqtt.messages().get(self.state_topic)
-        return self.__get_value(val)
-
-    def set_ha_value(self, value: Any) -> bool:
-        """Set HA value. Will automaticaly convert HA value
-        into the inels value format.
-
-        Args:
-            value (Any): Object value belonging to HA device
-        Returns:
-            true/false if publishing is successfull or not
-        """
-        dev = DeviceValue(
-            self.__device_type,
-            self.__inels_type,
-            ha_value=value,
-            last_value=self.__state,
-        )
-
-        self.__state = dev.ha_value
-        self.__values = dev
-
-        ret = False
-        if self.__set_topic is not None:
-            ret = self.__mqtt.publish(self.__set_topic, dev.inels_set_value)
-
-        return ret
-
-    def info(self):
-        """Device info."""
-        return DeviceInfo(self)
-
-    def info_serialized(self) -> str:
-        """Device info in json format string
-
-        Returns:
-            str: JSON string format
-        """
-        info = {
-            "name": self.__title,
-            "device_type": self.__device_type.value,
-            "id": self.__unique_id,
-            "via_device": self.__parent_id,
-        }
-
-        json_serialized = json.dumps(info)
-        _LOGGER.info("Device: %s", json_serialized)
-
-        return json_serialized
-
-
-class DeviceInfo(object):
-    """Device info class."""
-
-    def __init__(self, device: Device) -> None:
-        """Create object of the class
-
-        Args:
-            device (Device): device object
-        """
-        self.__device = device
-
-    @property
-    def manufacturer(self) -> str:
-        """Manufacturer property."""
-        return MANUFACTURER
-
-    @property
-    def sw_version(self) -> str:
-        """Version of software."""
-        return VERSION
-
-    @property
-    def model_number(self) -> str:
-        """Modle of the device."""
-        return self.__device.inels_type
-
-    @property
-    def serial_number(self) -> str:
-        """Serial number of the device."""
-        return self.__device.unique_id
+"""Class handle base info about device."""
+from __future__ import annotations
+
+import logging
+import json
+
+from typing import Any, Callable
+
+from inelsmqtt.util import DeviceValue, ParsedTopic, create_value, parse_topic
+from inelsmqtt import InelsMqtt
+from inelsmqtt.async_mqtt import AsyncInelsMqtt
+from inelsmqtt.const import Platform, Element, PublishPriority
+from inelsmqtt.const import (
+    MANUFACTURER,
+    DEVICE_CONNCTED,
+    VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Device(object):
+    """Carry basic device stuff
+
+    Args:
+        object (_type_): default object it is new style of python class coding
+    """
+
+    # large installations have tens of thousands of devices, ids and
+    # topics are kept once in the shared ParsedTopic
+    __slots__ = (
+        "__mqtt",
+        "__topic",
+        "__title",
+        "__values",
+        "__status",
+        "__previous",
+        "__features",
+        "__listeners",
+        "__info",
+    )
+
+    def __init__(
+        self,
+        mqtt: InelsMqtt,
+        state_topic: str,
+        title: str = None,
+    ) -> None:
+        """Initialize instance of device
+
+        Args:
+            mqtt (InelsMqtt): instance of mqtt broker
+            status_topic (str): String format of status topic
+            set_topic (str): Sring format of set topic
+            title (str, optional): Formal name of the device. When None
+            then will be same as unique_id. Defaults to None.
+        """
+        self.__mqtt = mqtt
+        self.__topic: ParsedTopic = parse_topic(state_topic)
+        # None means the title is the unique_id
+        self.__title = title
+        # current values, the command ones after set_ha_value
+        self.__values: DeviceValue = None
+        # decoded values of the current and the previous message
+        self.__status: DeviceValue = None
+        self.__previous: DeviceValue = None
+        self.__features: dict[str] = None
+        # created with the first listener, most devices have none
+        self.__listeners: dict[str, Callable[[Any], Any]] = None
+        self.__info: DeviceInfo = None
+
+        connected_topic = self.__topic.connected_topic
+        # availability of all devices shares one wildcard subscription
+        if not self.__mqtt.is_subscribed(connected_topic):
+            if isinstance(self.__mqtt, AsyncInelsMqtt):
+                raise TypeError(
+                    f"{type(self).__name__} with AsyncInelsMqtt has to be "
+                    "created with async_create"
+                )
+            self.__mqtt.subscribe_availability([connected_topic])
+        self.__mqtt.subscribe_listener(state_topic, self._callback)
+
+    @classmethod
+    async def async_create(
+        cls, mqtt: AsyncInelsMqtt, state_topic: str, title: str = None
+    ) -> Device:
+        """Create device driven by AsyncInelsMqtt. Availability topic is
+        subscribed without blocking the event loop.
+
+        Args:
+            mqtt (AsyncInelsMqtt): instance of asyncio mqtt broker
+            state_topic (str): String format of status topic
+            title (str, optional): Formal name of the device. Defaults to None.
+
+        Returns:
+            Device: instance of the called class
+        """
+        await mqtt.subscribe_availability([parse_topic(state_topic).connected_topic])
+
+        return cls(mqtt=mqtt, state_topic=state_topic, title=title)
+
+    @property
+    def unique_id(self) -> str:
+        """Get unique_id of the device
+
+        Returns:
+            str: Unique ID
+        """
+        return self.__topic.uid
+
+    @property
+    def is_subscribed(self) -> bool:
+        """Is device subscribed to mqtt
+
+        Returns:
+            bool: True/False
+        """
+        return self.__mqtt.is_subscribed(self.__topic.topic)
+
+    @property
+    def listeners(self) -> dict[str, Callable[[Any], Any]]:
+        """List of registered listeners on device"""
+        if self.__listeners is None:
+            self.__listeners = {}
+
+        return self.__listeners
+
+    @property
+    def inels_type(self) -> Element:
+        """Get inels type of the device
+
+        Returns:
+            str: Type
+        """
+        return self.__topic.element
+
+    @property
+    def device_type(self) -> Platform:
+        """Get type of the device
+
+        Returns:
+            Platform: Type
+        """
+        return self.__topic.platform
+
+    @property
+    def parent_id(self) -> str:
+        """Get Id of the controller (PLC, Bridge)
+
+        Returns:
+            str: Parent ID
+        """
+        return self.__topic.serial
+
+    @property
+    def title(self) -> str:
+        """Get name of the device
+
+        Returns:
+            str: Name
+        """
+        return self.__title if self.__title is not None else self.__topic.uid
+
+    @property
+    def is_available(self) -> bool:
+        """Get info about availability of device
+
+        Returns:
+            bool: True/False
+        """
+        connected_topic = self.__topic.connected_topic
+        available = self.__mqtt.availability.get(connected_topic)
+        if available is not None:
+            return available
+
+        # payload not seen by the availability table e.g. restored one
+        val = self.__mqtt.messages().get(connected_topic)
+        if val is None:
+            val = "off\n"
+        elif isinstance(val, (bytes, bytearray)):
+            val = val.decode()
+
+        return DEVICE_CONNCTED.get(val)
+
+    @property
+    def set_topic(self) -> str:
+        """Set topic
+
+        Returns:
+            str: string of the set topic
+        """
+        platform = self.__topic.platform
+        if platform is Platform.SENSOR or platform is Platform.BUTTON:
+            return None
+
+        return self.__topic.set_topic
+
+    @property
+    def state_topic(self) -> str:
+        """State topic
+
+        Returns:
+            str: string of the status topic
+        """
+        return self.__topic.topic
+
+    @property
+    def connected_topic(self) -> str:
+        """Connected topic
+
+        Returns:
+            str: string of the connected topic
+        """
+        return self.__topic.connected_topic
+
+    @property
+    def domain(self) -> str:
+        """Domain name of the topic
+           it should represent the manufacturer
+
+        Returns:
+            str: Name of the domain
+        """
+        return self.__topic.domain
+
+    @property
+    def state(self) -> Any:
+        """State of the device. Status payload is decoded when the state
+        is read first time after the message arrived."""
+        values = self.__values
+        if values is None:
+            values = self.get_value()
+
+        return values.ha_value
+
+    @property
+    def values(self) -> DeviceValue:
+        """Get values of inels and ha type."""
+        return self.__values
+
+    @property
+    def last_values(self) -> DeviceValue:
+        """Get last value of the device
+
+        Returns:
+            DeviceValue: values of the message before the current one
+        """
+        if self.__previous is None:
+            self.__previous = create_value(
+                self.__topic.platform,
+                self.__topic.element,
+                self.__mqtt.last_value(self.__topic.topic),
+            )
+
+        return self.__previous
+
+    @property
+    def mqtt(self) -> InelsMqtt:
+        """Instnace of broker."""
+        return self.__mqtt
+
+    @property
+    def features(self) -> dict[str]:
+        """List of features of device."""
+        return self.__features
+
+    def subscribe_listerner(self, topic: str, fnc: Callable[[Any], Any]) -> None:
+        """Append new item into the datachage listener."""
+        self.listeners[topic] = fnc
+
+    def update_value(self, new_value: Any) -> DeviceValue:
+        """Update value after broker change it. Value of the current
+        message becomes the previous one, commands are not kept."""
+        dev_value = self.__get_value(new_value)
+        self.__previous = self.__status
+        self.__status = dev_value
+        self.__values = dev_value
+
+        return dev_value
+
+    def __get_value(self, val: Any) -> DeviceValue:
+        """Get value and transform into the DeviceValue."""
+        topic = self.__topic
+        return create_value(topic.platform, topic.element, val)
+
+    def _set_features(self, features: dict[str]) -> dict[str]:
+        """Set features to the device."""
+        self.__features = features
+
+    def _callback(self, new_value: Any) -> None:
+        """Get value from mqtt when arrived."""
+        self.update_value(new_value)
+
+        if self.__listeners:
+            for listener in self.__listeners:
+                self.__listeners[listener](new_value)
+
+    def get_value(self) -> DeviceValue:
+        """Get value from inels
+
+        Returns:
+            Any: DeviceValue
+        """
+        val = self.__mqtt.messages().get(self.__topic.topic)
+        self.__values = self.__status = self.__get_value(val)
+
+        return self.__values
+
+    def set_ha_value(self, value: Any, force: bool = False) -> bool:
+        """Set HA value. Will automaticaly convert HA value
+        into the inels value format. Published with user priority
+        when publishes are scheduled.
+
+        Args:
+            value (Any): Object value belonging to HA device
+            force (bool, optional): publish even when the device already
+              is in the state and redundant commands are suppressed.
+              Defaults to False.
+        Returns:
+            true/false if publishing is successfull or not
+        """
+        if isinstance(self.__mqtt, AsyncInelsMqtt):
+            raise TypeError("Use async_set_ha_value with AsyncInelsMqtt")
+
+        previous = self.__values
+        dev = self.__set_value(value)
+
+        ret = False
+        set_topic = self.set_topic
+        if set_topic is not None:
+            if not force and self.__is_redundant(previous, dev):
+                self.__mqtt.publish_suppressed(set_topic)
+                return True
+
+            ret = self.__mqtt.publish(
+                set_topic, dev.inels_set_value, priority=PublishPriority.USER
+            )
+
+        return ret
+
+    async def async_set_ha_value(self, value: Any, force: bool = False) -> bool:
+        """Set HA value with AsyncInelsMqtt. Waits for the broker
+        acknowledge without blocking the event loop.
+
+        Args:
+            value (Any): Object value belonging to HA device
+            force (bool, optional): publish even when the device already
+              is in the state and redundant commands are suppressed.
+              Defaults to False.
+        Returns:
+            true/false if publishing is successfull or not
+        """
+        if not isinstance(self.__mqtt, AsyncInelsMqtt):
+            raise TypeError("Use set_ha_value with InelsMqtt")
+
+        previous = self.__values
+        dev = self.__set_value(value)
+
+        ret = False
+        set_topic = self.set_topic
+        if set_topic is not None:
+            if not force and self.__is_redundant(previous, dev):
+                self.__mqtt.publish_suppressed(set_topic)
+                return True
+
+            ret = await self.__mqtt.publish(set_topic, dev.inels_set_value)
+
+        return ret
+
+    def __is_redundant(self, previous: DeviceValue, dev: DeviceValue) -> bool:
+        """Is the command redundant. It is when the broker suppresses
+        redundant commands, the last status of the device encodes to the
+        same set value and no other command of this device waits for
+        its status.
+
+        Args:
+            previous (DeviceValue): values of the device before the command
+            dev (DeviceValue): values of the command
+        """
+        if not self.__mqtt.suppress_redundant:
+            return False
+
+        payload = self.__mqtt.messages().get(self.__topic.topic)
+        if payload is None:
+            return False
+
+        topic = self.__topic
+        confirmed = create_value(topic.platform, topic.element, payload)
+        set_value = confirmed.inels_set_value
+
+        return (
+            set_value is not None
+            and dev.inels_set_value == set_value
+            and (previous is None or previous.inels_set_value == set_value)
+        )
+
+    def __set_value(self, value: Any) -> DeviceValue:
+        """Convert HA value into the DeviceValue and keep it as state."""
+        dev = DeviceValue(
+            self.__topic.platform,
+            self.__topic.element,
+            ha_value=value,
+            last_value=self.__values.ha_value if self.__values is not None else None,
+        )
+
+        self.__values = dev
+
+        return dev
+
+    def info(self) -> DeviceInfo:
+        """Device info, created once and shared."""
+        if self.__info is None:
+            self.__info = DeviceInfo(self)
+
+        return self.__info
+
+    def info_serialized(self) -> str:
+        """Device info in json format string
+
+        Returns:
+            str: JSON string format
+        """
+        info = {
+            "name": self.title,
+            "device_type": self.__topic.platform.value,
+            "id": self.__topic.uid,
+            "via_device": self.__topic.serial,
+        }
+
+        json_serialized = json.dumps(info)
+        _LOGGER.info("Device: %s", json_serialized)
+
+        return json_serialized
+
+
+class DeviceInfo(object):
+    """Device info class."""
+
+    __slots__ = ("__device",)
+
+    def __init__(self, device: Device) -> None:
+        """Create object of the class
+
+        Args:
+            device (Device): device object
+        """
+        self.__device = device
+
+    @property
+    def manufacturer(self) -> str:
+        """Manufacturer property."""
+        return MANUFACTURER
+
+    @property
+    def sw_version(self) -> str:
+        """Version of software."""
+        return VERSION
+
+    @property
+    def model_number(self) -> str:
+        """Modle of the device."""
+        return self.__device.inels_type
+
+    @property
+    def serial_number(self) -> str:
+        """Serial number of the device."""
+        return self.__device.unique_id
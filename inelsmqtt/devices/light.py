@@ -13,6 +13,8 @@ class Light(Device):
         Device (_type_): it base class for all platforms
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         mqtt: InelsMqtt,
@@ -23,7 +25,7 @@ class Light(Device):
         super().__init__(mqtt=mqtt, state_topic=state_topic, title=title)
         self._set_features(LIST_OF_FEATURES.get(self.inels_type.value))
 
-    def set_ha_value(self, value: bool) -> bool:
+    def set_ha_value(self, value: bool, force: bool = False) -> bool:
         """Convert set value to the proper light object."""
         # new object passing into the device set func Device value object
-        return super().set_ha_value(value)
+        return super().set_ha_value(value, force)
@@ -16,6 +16,8 @@ class Sensor(Device):
         Device (_type_): it base class for all platforms
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         mqtt: InelsMqtt,
@@ -1,13 +1,19 @@
 """Class handle specific platform switch."""
+from typing import Any
+
 from inelsmqtt.devices import Device
 from inelsmqtt import InelsMqtt
-from inelsmqtt.util import new_object
+from inelsmqtt.util import SwitchTempValue, SwitchValue
 from inelsmqtt.const import Element, TEMPERATURE
 
 LIST_OF_FEATURES = {
     Element.RFSTI_11B.value: [TEMPERATURE],
 }
 
+VALUE_TYPES = {
+    Element.RFSTI_11B.value: SwitchTempValue,
+}
+
 
 class Switch(Device):
     """Carry switch stuff
@@ -16,6 +22,8 @@ class Switch(Device):
         Device (_type_): it base class for all platforms
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         mqtt: InelsMqtt,
@@ -26,15 +34,23 @@ class Switch(Device):
         super().__init__(mqtt=mqtt, state_topic=state_topic, title=title)
         self._set_features(LIST_OF_FEATURES.get(self.inels_type.value))
 
-    def set_ha_value(self, value: bool) -> bool:
+    def set_ha_value(self, value: bool, force: bool = False) -> bool:
         """Convert set value to the proper switch object."""
+        # new object passing into the device set func Device value object
+        return super().set_ha_value(self.__switch_value(value), force)
+
+    async def async_set_ha_value(self, value: bool, force: bool = False) -> bool:
+        """Convert set value to the proper switch object."""
+        return await super().async_set_ha_value(self.__switch_value(value), force)
+
+    def __switch_value(self, value: bool) -> Any:
+        """Create switch object from the on value."""
         # basic property is on
         kwargs = {"on": value}
 
         # other properties will be created from features
         if self.features is not None:
             for feature in self.features:
-                kwargs[feature] = self.state.__dict__.get(feature)
+                kwargs[feature] = getattr(self.state, feature, None)
 
-        # new object passing into the device set func Device value object
-        return super().set_ha_value(new_object(**kwargs))
+        return VALUE_TYPES.get(self.inels_type.value, SwitchValue)(**kwargs)
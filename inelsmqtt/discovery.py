@@ -1,30 +1,66 @@
 """Discovery class handle find all device in broker and create devices."""
+import asyncio
+import json
 import logging
-from typing import Any
+import os
+import threading
+from typing import Any, Callable, Union
+
+import attr
 
 from inelsmqtt import InelsMqtt
+from inelsmqtt.async_mqtt import AsyncInelsMqtt
 from inelsmqtt.devices import Device
 from inelsmqtt.devices import sensor, light, switch
 from inelsmqtt.const import (
+    DEVICE_CONNCTED,
+    MQTT_CONNECTED_TOPIC,
+    MQTT_DISCOVER_TOPIC,
+    SNAPSHOT_VERSION,
+    DiscoveryEventType,
     Platform,
-    DEVICE_TYPE_DICT,
-    TOPIC_FRAGMENTS,
-    FRAGMENT_DEVICE_TYPE,
 )
+from inelsmqtt.registry import DeviceRegistry
+from inelsmqtt.util import parse_topic
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
+@attr.s(slots=True, frozen=True)
+class DiscoveryEvent:
+    """Change of the discovered devices."""
+
+    type: DiscoveryEventType = attr.ib()
+    device: Device = attr.ib()
+    payload: Any = attr.ib()
+
+
 class InelsDiscovery(object):
-    """Handling discovery mqtt topics from broker."""
+    """Handling discovery mqtt topics from broker.
 
-    def __init__(self, mqtt: InelsMqtt) -> None:
-        """Initilize inels mqtt discovery"""
+    After the first discovery or reconcile the status topics stay
+    watched. Devices appearing later are created as their first status
+    arrives, devices are removed when their status is cleared (empty
+    retained payload) or their availability goes off. Listeners get
+    ADDED and REMOVED events of these devices.
+    """
+
+    def __init__(self, mqtt: Union[InelsMqtt, AsyncInelsMqtt]) -> None:
+        """Initilize inels mqtt discovery
+
+        Args:
+            mqtt (InelsMqtt | AsyncInelsMqtt): mqtt broker, use async_discovery
+              with AsyncInelsMqtt
+        """
         self.__mqtt = mqtt
-        self.__devices: list[Any] = []
-        self.__coordinators: list[str] = []
-        self.__coordinators_with_devices: dict[str, list[Any]] = {}
+        self.__registry = DeviceRegistry()
+        self.__payloads: dict[str, Any] = {}
+        self.__listeners: list[Callable[[DiscoveryEvent], Any]] = []
+        self.__lock = threading.RLock()
+        self.__live = False
+        self.__live_async = False
+        self.__live_tasks: set[asyncio.Future] = set()
 
     @property
     def coordinators(self) -> list[str]:
@@ -33,7 +69,7 @@ class InelsDiscovery(object):
         Returns:
             _type_: list of coordinator serial numbers
         """
-        return self.__coordinators
+        return self.__registry.coordinators
 
     @property
     def devices(self) -> list[Any]:
@@ -42,7 +78,43 @@ class InelsDiscovery(object):
         Returns:
             list[Device]: all devices handled with discovery object
         """
-        return self.__devices
+        return self.__registry.devices
+
+    @property
+    def registry(self) -> DeviceRegistry:
+        """Devices indexed by unique id, state topic, coordinator,
+        platform and element
+
+        Returns:
+            DeviceRegistry: registry kept up to date with discovery
+        """
+        return self.__registry
+
+    @property
+    def is_live(self) -> bool:
+        """Are status topics watched for added and removed devices."""
+        return self.__live
+
+    def stop_live(self) -> None:
+        """Stop watching status topics. Devices are not added or removed
+        till the next discovery or reconcile."""
+        for topic in (MQTT_DISCOVER_TOPIC, MQTT_CONNECTED_TOPIC):
+            self.__mqtt.unsubscribe_topic_listener(topic, self.__on_live_message)
+        self.__live = False
+
+    def subscribe_listener(self, fnc: Callable[[DiscoveryEvent], Any]) -> None:
+        """Register listener of added, removed and changed devices
+
+        Args:
+            fnc (Callable[[DiscoveryEvent], Any]): called with every event
+        """
+        if fnc not in self.__listeners:
+            self.__listeners.append(fnc)
+
+    def unsubscribe_listener(self, fnc: Callable[[DiscoveryEvent], Any]) -> None:
+        """Unregister listener of discovery events."""
+        if fnc in self.__listeners:
+            self.__listeners.remove(fnc)
 
     def discovery(self) -> dict[str, list[Any]]:
         """Discover and create device list
@@ -52,13 +124,286 @@ class InelsDiscovery(object):
         """
         devs = self.__mqtt.discovery_all()
 
+        # availability of all devices is subscribed at once, devices
+        # created below do not need to wait for it one by one
+        self.__mqtt.subscribe_availability(self.__connected_topics(devs))
+
+        with self.__lock:
+            self.__create_devices(devs)
+
+        self.__start_live(asynchronous=False)
+        return self.__registry.devices
+
+    async def async_discovery(self) -> list[Any]:
+        """Discover and create device list with AsyncInelsMqtt
+
+        Returns:
+            list[Device]: List of Device object
+        """
+        devs = await self.__mqtt.discovery_all()
+
+        await self.__mqtt.subscribe_availability(self.__connected_topics(devs))
+
+        self.__create_devices(devs)
+
+        self.__start_live(asynchronous=True)
+        return self.__registry.devices
+
+    def save_snapshot(self, path: str) -> None:
+        """Save discovered devices with their last payloads, so the next
+        start can create them without waiting for discovery
+
+        Args:
+            path (str): snapshot file
+        """
+        messages = self.__mqtt.messages()
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "messages": {
+                topic: _encode_payload(messages[topic])
+                for dev in self.__registry
+                for topic in (dev.state_topic, dev.connected_topic)
+                if messages.get(topic) is not None
+            },
+        }
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(snapshot, file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: str) -> list[Any]:
+        """Create devices from the snapshot without waiting for the broker.
+        State of devices is served from the snapshot payloads till
+        reconcile brings the live ones.
+
+        Args:
+            path (str): snapshot file written by save_snapshot
+
+        Returns:
+            list[Device]: List of Device object, empty when the snapshot
+              does not exist or can not be read
+        """
+        devs = self.__restore_snapshot(path)
+
+        # availability is subscribed without waiting for retained payloads,
+        # snapshot already provides them
+        self.__mqtt.subscribe_availability(self.__connected_topics(devs), wait=False)
+
+        self.__create_devices(devs)
+        return self.__registry.devices
+
+    async def async_load_snapshot(self, path: str) -> list[Any]:
+        """Create devices from the snapshot with AsyncInelsMqtt
+
+        Args:
+            path (str): snapshot file written by save_snapshot
+
+        Returns:
+            list[Device]: List of Device object
+        """
+        devs = self.__restore_snapshot(path)
+
+        await self.__mqtt.subscribe_availability(
+            self.__connected_topics(devs), wait=False
+        )
+
+        self.__create_devices(devs)
+        return self.__registry.devices
+
+    def reconcile(self) -> list[DiscoveryEvent]:
+        """Discover devices again and apply the differences against
+        the known ones. Listeners are called with every event. Live
+        messages keep reaching devices while the status topics are
+        collected.
+
+        Returns:
+            list[DiscoveryEvent]: added, removed and changed devices
+        """
+        # live messages update payloads while the topics are collected
+        known = dict(self.__payloads)
+        devs = self.__mqtt.discovery_all()
+
+        self.__mqtt.subscribe_availability(self.__connected_topics(devs))
+
+        events = self.__reconcile(devs, known)
+
+        self.__start_live(asynchronous=False)
+        return events
+
+    def reconcile_in_background(self) -> threading.Thread:
+        """Run reconcile in the daemon thread
+
+        Returns:
+            threading.Thread: started thread
+        """
+        thread = threading.Thread(
+            target=self.reconcile, name="inels-discovery-reconcile", daemon=True
+        )
+        thread.start()
+
+        return thread
+
+    async def async_reconcile(self) -> list[DiscoveryEvent]:
+        """Reconcile with AsyncInelsMqtt, run it as a task to keep
+        it in the background
+
+        Returns:
+            list[DiscoveryEvent]: added, removed and changed devices
+        """
+        # live messages update payloads while the topics are collected
+        known = dict(self.__payloads)
+        devs = await self.__mqtt.discovery_all()
+
+        await self.__mqtt.subscribe_availability(self.__connected_topics(devs))
+
+        events = self.__reconcile(devs, known)
+
+        self.__start_live(asynchronous=True)
+        return events
+
+    def __restore_snapshot(self, path: str) -> dict[str, Any]:
+        """Read snapshot and fill mqtt messages with its payloads."""
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Discovery snapshot %s can not be read %s", path, err)
+            return {}
+
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            _LOGGER.warning("Discovery snapshot %s has unknown version", path)
+            return {}
+
+        messages = {
+            topic: _decode_payload(payload)
+            for topic, payload in snapshot["messages"].items()
+        }
+        self.__mqtt.restore_messages(messages)
+
+        return {
+            topic: payload
+            for topic, payload in messages.items()
+            if parse_topic(topic).platform is not None
+            and parse_topic(topic).state == "status"
+        }
+
+    def __reconcile(
+        self, devs: dict[str, Any], known: dict[str, Any]
+    ) -> list[DiscoveryEvent]:
+        """Compare discovered topics with known devices and payloads seen
+        before the discovery, notify listeners."""
+        events: list[DiscoveryEvent] = []
+
+        with self.__lock:
+            for dev in self.__registry:
+                if dev.state_topic not in devs:
+                    self.__remove_device(dev)
+                    events.append(DiscoveryEvent(DiscoveryEventType.REMOVED, dev, None))
+                elif devs[dev.state_topic] != known.get(dev.state_topic):
+                    # device got the payload already as the live message
+                    self.__payloads[dev.state_topic] = devs[dev.state_topic]
+                    events.append(
+                        DiscoveryEvent(
+                            DiscoveryEventType.CHANGED, dev, devs[dev.state_topic]
+                        )
+                    )
+
+            for dev in self.__create_devices(devs):
+                events.append(
+                    DiscoveryEvent(DiscoveryEventType.ADDED, dev, devs[dev.state_topic])
+                )
+
+        self.__notify(events)
+        return events
+
+    def __notify(self, events: list[DiscoveryEvent]) -> None:
+        """Pass events to all listeners."""
+        for event in events:
+            for listener in list(self.__listeners):
+                listener(event)
+
+    def __start_live(self, asynchronous: bool) -> None:
+        """Keep watching status and availability topics after discovery."""
+        self.__live_async = asynchronous
+        if self.__live:
+            return
+
+        for topic in (MQTT_DISCOVER_TOPIC, MQTT_CONNECTED_TOPIC):
+            self.__mqtt.subscribe_topic_listener(topic, self.__on_live_message)
+        self.__live = True
+
+    def __on_live_message(self, topic: str, payload: Any) -> None:
+        """Add or remove device by the message arrived after discovery."""
+        parsed = parse_topic(topic)
+        if parsed.platform is None:
+            return
+
+        if parsed.state == "connected":
+            if _is_offline(payload):
+                self.__live_remove(parsed.state_topic)
+        elif parsed.state == "status":
+            if payload is None or len(payload) == 0:
+                self.__live_remove(topic)
+            elif topic in self.__registry:
+                self.__payloads[topic] = payload
+            elif self.__live_async:
+                task = asyncio.ensure_future(self.__async_live_add(topic, payload))
+                # keep the task referenced till it is done
+                self.__live_tasks.add(task)
+                task.add_done_callback(self.__live_tasks.discard)
+            else:
+                self.__live_add(topic, payload)
+
+    def __live_add(self, topic: str, payload: Any) -> None:
+        """Create device of the status topic seen for the first time."""
+        # called from the network thread, it must not wait for the payload
+        self.__mqtt.subscribe_availability(self.__connected_topics([topic]), wait=False)
+
+        with self.__lock:
+            created = self.__create_devices({topic: payload})
+
+        self.__notify(
+            [DiscoveryEvent(DiscoveryEventType.ADDED, dev, payload) for dev in created]
+        )
+
+    async def __async_live_add(self, topic: str, payload: Any) -> None:
+        """Create device of the new status topic with AsyncInelsMqtt."""
+        await self.__mqtt.subscribe_availability(
+            self.__connected_topics([topic]), wait=False
+        )
+
+        created = self.__create_devices({topic: payload})
+
+        self.__notify(
+            [DiscoveryEvent(DiscoveryEventType.ADDED, dev, payload) for dev in created]
+        )
+
+    def __live_remove(self, state_topic: str) -> None:
+        """Remove device which status was cleared or which went offline."""
+        with self.__lock:
+            dev = self.__registry.by_state_topic(state_topic)
+            if dev is None:
+                return
+
+            self.__remove_device(dev)
+
+        self.__notify([DiscoveryEvent(DiscoveryEventType.REMOVED, dev, None)])
+
+    def __create_devices(self, devs: dict[str, str]) -> list[Any]:
+        """Create devices from discovered status topics, which are not
+        known yet.
+
+        Returns:
+            list[Device]: newly created devices
+        """
+        created = []
+
         for item in devs:
-            fragments = item.split("/")
+            if item in self.__registry:
+                continue
 
-            # defragmentace
-            dev_type: Platform = DEVICE_TYPE_DICT[
-                fragments[TOPIC_FRAGMENTS[FRAGMENT_DEVICE_TYPE]]
-            ]
+            dev_type: Platform = parse_topic(item).platform
 
             dev = None
 
@@ -71,15 +416,42 @@ class InelsDiscovery(object):
             else:
                 dev = Device(self.__mqtt, item)
 
-            self.__devices.append(dev)
+            self.__payloads[item] = devs[item]
+            self.__registry.add(dev)
+            created.append(dev)
+
+        _LOGGER.info("Discovered %s devices", len(self.__registry))
+
+        return created
+
+    def __remove_device(self, dev: Device) -> None:
+        """Forget device which disappeared from the broker."""
+        self.__mqtt.unsubscribe_listener(
+            dev.state_topic, dev._callback  # pylint: disable=protected-access
+        )
+        self.__payloads.pop(dev.state_topic, None)
+        self.__registry.remove(dev)
+
+    def __connected_topics(self, devs: dict[str, str]) -> list[str]:
+        """Connected topics belonging to the discovered status topics."""
+        return [parse_topic(item).connected_topic for item in devs]
+
+
+def _is_offline(payload: Any) -> bool:
+    """Is the availability payload off."""
+    if isinstance(payload, (bytes, bytearray)):
+        payload = payload.decode(errors="replace")
+
+    return DEVICE_CONNCTED.get(payload) is False
 
-        for item in self.__devices:
-            if item.parent_id not in self.__coordinators:
-                self.__coordinators.append(item.parent_id)
-                self.__coordinators_with_devices[item.parent_id] = []
 
-            self.__coordinators_with_devices[item.parent_id].append(item)
+def _encode_payload(payload: Any) -> str:
+    """Payload as json string."""
+    if isinstance(payload, (bytes, bytearray)):
+        return payload.decode("latin-1")
+    return str(payload)
 
-        _LOGGER.info("Discovered %s devices", len(self.__devices))
 
-        return self.__devices
+def _decode_payload(payload: str) -> bytes:
+    """Payload as received from broker."""
+    return payload.encode("latin-1")
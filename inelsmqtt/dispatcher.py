@@ -0,0 +1,308 @@
+"""Dispatch of received messages to listeners outside of the network thread."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+import attr
+
+from .const import DISPATCH_QUEUE_SIZE, OverflowPolicy
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(slots=True, frozen=True)
+class DispatchStats:
+    """Metrics of the dispatcher over all workers."""
+
+    workers: int = attr.ib()
+    depth: int = attr.ib()
+    max_depth: int = attr.ib()
+    dispatched: int = attr.ib()
+    dropped: int = attr.ib()
+    coalesced: int = attr.ib()
+    errors: int = attr.ib()
+    lag: float = attr.ib()
+    max_lag: float = attr.ib()
+
+
+class _Message:
+    """Message waiting in the queue, payload can be replaced meanwhile."""
+
+    __slots__ = ("topic", "payload", "queued")
+
+    def __init__(self, topic: str, payload: Any, queued: float) -> None:
+        """Create queued message."""
+        self.topic = topic
+        self.payload = payload
+        self.queued = queued
+
+
+class _Shard:
+    """Queue of one worker with its counters."""
+
+    __slots__ = (
+        "capacity",
+        "queue",
+        "pending",
+        "lock",
+        "not_empty",
+        "not_full",
+        "thread",
+        "max_depth",
+        "dispatched",
+        "dropped",
+        "coalesced",
+        "errors",
+        "max_lag",
+    )
+
+    def __init__(self, capacity: int) -> None:
+        """Create empty queue."""
+        self.capacity = capacity
+        self.queue: deque[_Message] = deque()
+        # queued message of every topic, used for coalescing
+        self.pending: dict[str, _Message] = {}
+        self.lock = threading.Lock()
+        self.not_empty = threading.Condition(self.lock)
+        self.not_full = threading.Condition(self.lock)
+        self.thread: threading.Thread = None
+        self.max_depth = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.max_lag = 0.0
+
+    def pop(self) -> _Message:
+        """Take the oldest message, lock has to be held."""
+        message = self.queue.popleft()
+        if self.pending.get(message.topic) is message:
+            del self.pending[message.topic]
+        self.not_full.notify()
+
+        return message
+
+
+class Dispatcher:
+    """Bounded queue feeding a pool of worker threads calling the handler.
+
+    Topic is hashed to one worker, so messages of one topic are handled
+    in the order they arrived, while slow handling of one topic does not
+    hold back topics of other workers. Queue size is split between the
+    workers. When the queue of the worker is full the overflow policy
+    decides:
+
+    - BLOCK: caller waits for free place.
+    - DROP_OLDEST: the oldest queued message of the worker is dropped.
+    - COALESCE: payload of the queued message with the same topic is
+      replaced, when there is none the caller waits like with BLOCK.
+
+    With coalesce the payload of the queued message with the same topic
+    is replaced always, not only when the queue is full. Only the newest
+    payload of the topic is handled, so the handler work grows with the
+    amount of distinct topics, not with the amount of messages.
+
+    Waiting caller is the network thread, so with BLOCK and COALESCE
+    the handler must not wait for anything the network thread delivers.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, Any], Any],
+        workers: int = 1,
+        queue_size: int = DISPATCH_QUEUE_SIZE,
+        policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        coalesce: bool = False,
+        name: str = "inels-dispatch",
+    ) -> None:
+        """Create dispatcher, workers are started with the first message
+
+        Args:
+            handler (Callable[[str, Any], Any]): called with the topic
+              and the payload in the worker thread
+            workers (int, optional): amount of worker threads. Defaults to 1.
+            queue_size (int, optional): max amount of queued messages.
+              Defaults to DISPATCH_QUEUE_SIZE.
+            policy (OverflowPolicy, optional): what to do when the queue
+              is full, can be given by its value. Defaults to BLOCK.
+            coalesce (bool, optional): handle only the newest queued
+              payload of every topic. Defaults to False.
+            name (str, optional): name prefix of worker threads.
+        """
+        if workers < 1:
+            raise ValueError(f"At least one worker is needed, got {workers}")
+
+        self.__handler = handler
+        self.__policy = OverflowPolicy(policy)
+        self.__coalesce = coalesce
+        self.__name = name
+        capacity = max(1, -(-queue_size // workers))
+        self.__shards = [_Shard(capacity) for _ in range(workers)]
+        self.__running = False
+        self.__stopped = False
+        self.__lock = threading.Lock()
+
+    @property
+    def policy(self) -> OverflowPolicy:
+        """Overflow policy of the queue."""
+        return self.__policy
+
+    @property
+    def coalesce(self) -> bool:
+        """Is the queued payload of the topic replaced by the newer one."""
+        return self.__coalesce
+
+    @property
+    def is_running(self) -> bool:
+        """Are the workers running."""
+        return self.__running
+
+    def start(self) -> None:
+        """Start worker threads."""
+        with self.__lock:
+            if self.__running:
+                return
+
+            self.__running = True
+            self.__stopped = False
+            for index, shard in enumerate(self.__shards):
+                shard.thread = threading.Thread(
+                    target=self.__work,
+                    args=(shard,),
+                    name=f"{self.__name}-{index}",
+                    daemon=True,
+                )
+                shard.thread.start()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop workers after they handle already queued messages, later
+        messages are dropped till start is called
+
+        Args:
+            timeout (float, optional): max time of waiting for every worker.
+              Defaults to None, wait till the queue is empty.
+        """
+        with self.__lock:
+            if not self.__running:
+                return
+
+            self.__running = False
+            self.__stopped = True
+            for shard in self.__shards:
+                with shard.lock:
+                    shard.not_empty.notify_all()
+                    shard.not_full.notify_all()
+
+        for shard in self.__shards:
+            if shard.thread is not threading.current_thread():
+                shard.thread.join(timeout)
+
+    def submit(self, topic: str, payload: Any) -> None:
+        """Queue message for the worker of its topic
+
+        Args:
+            topic (str): topic of the message
+            payload (Any): payload passed to the handler
+        """
+        shard = self.__shards[hash(topic) % len(self.__shards)]
+
+        if not self.__running:
+            # stopped dispatcher of closed client does not start workers
+            if self.__stopped:
+                with shard.lock:
+                    shard.dropped += 1
+                return
+
+            self.start()
+
+        with shard.lock:
+            queue = shard.queue
+            full = len(queue) >= shard.capacity
+            if self.__coalesce or (full and self.__policy is OverflowPolicy.COALESCE):
+                message = shard.pending.get(topic)
+                if message is not None:
+                    message.payload = payload
+                    shard.coalesced += 1
+                    return
+
+            if full:
+                if self.__policy is OverflowPolicy.DROP_OLDEST:
+                    shard.pop()
+                    shard.dropped += 1
+                else:
+                    while len(queue) >= shard.capacity and self.__running:
+                        shard.not_full.wait()
+
+                    # workers exited while the submitter waited for room
+                    if not self.__running:
+                        shard.dropped += 1
+                        return
+
+            message = _Message(topic, payload, time.monotonic())
+            queue.append(message)
+            shard.pending[topic] = message
+            if len(queue) > shard.max_depth:
+                shard.max_depth = len(queue)
+            shard.not_empty.notify()
+
+    def stats(self) -> DispatchStats:
+        """Current metrics of the dispatcher
+
+        Returns:
+            DispatchStats: max_depth is the longest queue of a worker,
+              lag is the age of the oldest queued message,
+              max_lag the longest time a message waited for its worker,
+              coalesced the amount of payloads replaced by newer ones
+        """
+        now = time.monotonic()
+        depth = max_depth = dispatched = dropped = coalesced = errors = 0
+        lag = max_lag = 0.0
+        for shard in self.__shards:
+            with shard.lock:
+                depth += len(shard.queue)
+                max_depth = max(max_depth, shard.max_depth)
+                dispatched += shard.dispatched
+                dropped += shard.dropped
+                coalesced += shard.coalesced
+                errors += shard.errors
+                max_lag = max(max_lag, shard.max_lag)
+                if shard.queue:
+                    lag = max(lag, now - shard.queue[0].queued)
+
+        return DispatchStats(
+            workers=len(self.__shards),
+            depth=depth,
+            max_depth=max_depth,
+            dispatched=dispatched,
+            dropped=dropped,
+            coalesced=coalesced,
+            errors=errors,
+            lag=lag,
+            max_lag=max_lag,
+        )
+
+    def __work(self, shard: _Shard) -> None:
+        """Loop of the worker thread, ends when stopped and queue is empty."""
+        while True:
+            with shard.lock:
+                while not shard.queue and self.__running:
+                    shard.not_empty.wait()
+                if not shard.queue:
+                    return
+
+                message = shard.pop()
+                waited = time.monotonic() - message.queued
+                if waited > shard.max_lag:
+                    shard.max_lag = waited
+
+            try:
+                self.__handler(message.topic, message.payload)
+            except Exception:  # pylint: disable=broad-except
+                shard.errors += 1
+                _LOGGER.exception("Listener of %s failed", message.topic)
+
+            shard.dispatched += 1
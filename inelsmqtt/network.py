@@ -0,0 +1,361 @@
+"""Network loop shared by many paho clients."""
+from __future__ import annotations
+
+import logging
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+import paho.mqtt.client as mqtt
+
+_LOGGER = logging.getLogger(__name__)
+
+# interval of keepalive and reconnect handling
+MISC_LOOP_INTERVAL = 1
+# delay of reconnect, doubled after every failed attempt
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+# threads connecting lost clients, connect blocks till broker answers
+RECONNECT_WORKERS = 4
+
+
+class Connection:
+    """Socket events of one client in the network loop."""
+
+    __slots__ = (
+        "sock",
+        "closing",
+        "opened",
+        "closed",
+        "reconnects",
+        "retry_at",
+        "delay",
+        "reconnecting",
+    )
+
+    def __init__(self) -> None:
+        """Create connection without socket."""
+        self.sock: socket.socket = None
+        # client was detached, it is removed when its socket closes
+        self.closing = False
+        self.opened = 0
+        self.closed = 0
+        self.reconnects = 0
+        self.retry_at = 0.0
+        self.delay = RECONNECT_MIN_DELAY
+        self.reconnecting: Future = None
+
+
+class NetworkLoop:
+    """One thread reading and writing sockets of many paho clients.
+
+    Replaces loop_start of every client, so the amount of threads does not
+    grow with the amount of brokers. Clients use paho external loop
+    callbacks, every socket is watched by one selector. Keepalive of all
+    clients is handled once per second and lost connections are connected
+    again with growing delay.
+
+    All paho callbacks (on_message, on_publish, ...) of attached clients are
+    called in this thread, a slow listener delays all brokers. Listeners
+    should not wait for broker answers there, dispatch_workers of InelsMqtt
+    moves them to worker threads.
+
+    Reconnect starts a clean session, InelsMqtt subscribes its topics
+    again when the broker has not kept them. Other clients have to do it
+    in their on_connect.
+    """
+
+    def __init__(self, name: str = "inels-network") -> None:
+        """Create loop, its thread is started with the first client
+
+        Args:
+            name (str, optional): name of the thread.
+        """
+        self.__name = name
+        self.__selector = selectors.DefaultSelector()
+        self.__wake_r, self.__wake_w = socket.socketpair()
+        self.__wake_r.setblocking(False)
+        self.__wake_w.setblocking(False)
+        self.__selector.register(self.__wake_r, selectors.EVENT_READ, None)
+
+        self.__connections: dict[mqtt.Client, Connection] = {}
+        self.__changes: deque[Callable[[], None]] = deque()
+        self.__lock = threading.Lock()
+        self.__thread: threading.Thread = None
+        self.__running = False
+        self.__closed = False
+        self.__reconnector: ThreadPoolExecutor = None
+
+    def __len__(self) -> int:
+        """Amount of attached clients."""
+        return len(self.__connections)
+
+    @property
+    def is_running(self) -> bool:
+        """Is the loop thread running."""
+        return self.__running
+
+    def connection(self, client: mqtt.Client) -> Connection:
+        """Socket events of the client, None when it is not attached."""
+        return self.__connections.get(client)
+
+    def attach(self, client: mqtt.Client) -> None:
+        """Drive the client by this loop, call it before client.connect
+
+        Args:
+            client (mqtt.Client): client without loop_start
+        """
+        with self.__lock:
+            if self.__closed:
+                raise RuntimeError(f"Network loop {self.__name} is stopped")
+
+            connection = self.__connections.get(client)
+            if connection is None:
+                self.__connections[client] = Connection()
+            else:
+                connection.closing = False
+
+            client.on_socket_open = self.__on_socket_open
+            client.on_socket_close = self.__on_socket_close
+            client.on_socket_register_write = self.__on_socket_register_write
+            client.on_socket_unregister_write = self.__on_socket_unregister_write
+
+            if not self.__running:
+                self.__start()
+
+    def detach(self, client: mqtt.Client) -> None:
+        """Stop driving the client. Call it after client.disconnect, the
+        socket is watched till the disconnect packet is sent.
+
+        Args:
+            client (mqtt.Client): attached client
+        """
+        with self.__lock:
+            connection = self.__connections.get(client)
+            if connection is None:
+                return
+
+            connection.closing = True
+            if connection.sock is None:
+                del self.__connections[client]
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop the loop thread and release its sockets, clients are not
+        disconnected. Stopped loop can not be started again.
+
+        Args:
+            timeout (float, optional): max time of waiting for the thread.
+              Defaults to None.
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+
+            self.__closed = True
+            running, self.__running = self.__running, False
+
+        if not running:
+            self.__close()
+            return
+
+        # thread releases sockets itself once it has sent what is queued
+        self.__wake()
+        if self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+
+    def __start(self) -> None:
+        """Start loop thread, lock has to be held."""
+        self.__running = True
+        self.__reconnector = ThreadPoolExecutor(
+            RECONNECT_WORKERS, thread_name_prefix=f"{self.__name}-reconnect"
+        )
+        self.__thread = threading.Thread(
+            target=self.__run, name=self.__name, daemon=True
+        )
+        self.__thread.start()
+
+    def __wake(self) -> None:
+        """Interrupt waiting of the selector."""
+        try:
+            self.__wake_w.send(b"\0")
+        except BlockingIOError:
+            # loop is already woken up
+            pass
+        except OSError:
+            # loop is destroyed before its clients
+            pass
+
+    def __change(self, change: Callable[[], None]) -> None:
+        """Apply change of the selector in the loop thread."""
+        if threading.current_thread() is self.__thread:
+            change()
+            return
+
+        self.__changes.append(change)
+        self.__wake()
+
+    def __run(self) -> None:
+        """Loop of the network thread."""
+        next_misc = time.monotonic() + MISC_LOOP_INTERVAL
+
+        while self.__running:
+            while self.__changes:
+                self.__changes.popleft()()
+
+            timeout = max(0.0, next_misc - time.monotonic())
+            for key, events in self.__selector.select(timeout):
+                client = key.data
+                if client is None:
+                    self.__drain()
+                    continue
+
+                # failing callback of one client must not stop the others
+                try:
+                    if events & selectors.EVENT_READ:
+                        client.loop_read()
+                    if events & selectors.EVENT_WRITE:
+                        client.loop_write()
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Network loop of %s failed", client)
+
+            now = time.monotonic()
+            if now >= next_misc:
+                self.__misc(now)
+                next_misc = now + MISC_LOOP_INTERVAL
+
+        try:
+            self.__flush()
+        finally:
+            self.__close()
+
+    def __close(self) -> None:
+        """Release reconnect threads, selector and wake up sockets."""
+        if self.__reconnector is not None:
+            self.__reconnector.shutdown(wait=False)
+
+        self.__selector.close()
+        self.__wake_r.close()
+        self.__wake_w.close()
+
+    def __flush(self) -> None:
+        """Send what clients have queued, e.g. disconnect packets."""
+        while self.__changes:
+            self.__changes.popleft()()
+
+        for client, connection in list(self.__connections.items()):
+            if connection.sock is None:
+                continue
+
+            try:
+                client.loop_write()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Network loop of %s failed", client)
+
+    def __drain(self) -> None:
+        """Read all wake up bytes."""
+        try:
+            while self.__wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def __misc(self, now: float) -> None:
+        """Keepalive of all clients and reconnect of lost ones."""
+        for client, connection in list(self.__connections.items()):
+            if not self.__running:
+                return
+
+            # client is not touched while it is connecting in other thread
+            if connection.reconnecting is not None:
+                continue
+
+            if client.loop_misc() == mqtt.MQTT_ERR_SUCCESS:
+                continue
+
+            if (
+                connection.closing
+                or connection.opened == 0
+                or now < connection.retry_at
+            ):
+                continue
+
+            connection.reconnects += 1
+            connection.reconnecting = self.__reconnector.submit(client.reconnect)
+            connection.reconnecting.add_done_callback(
+                lambda future, connection=connection: self.__reconnected(
+                    connection, future
+                )
+            )
+
+    def __reconnected(self, connection: Connection, future: Future) -> None:
+        """Plan next attempt when reconnect failed."""
+        connection.reconnecting = None
+        error = future.exception() if not future.cancelled() else None
+        if error is None:
+            connection.delay = RECONNECT_MIN_DELAY
+            return
+
+        _LOGGER.debug("Reconnect failed %s", error)
+        connection.retry_at = time.monotonic() + connection.delay
+        connection.delay = min(connection.delay * 2, RECONNECT_MAX_DELAY)
+
+    def __on_socket_open(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho socket is read by the loop."""
+
+        def change() -> None:
+            connection = self.__connections.get(client)
+            if connection is None:
+                return
+
+            connection.sock = sock
+            connection.opened += 1
+            self.__selector.register(sock, selectors.EVENT_READ, client)
+
+        self.__change(change)
+
+    def __on_socket_close(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho socket is closed."""
+
+        def change() -> None:
+            connection = self.__connections.get(client)
+            if connection is None or connection.sock is not sock:
+                return
+
+            self.__unregister(sock)
+            connection.sock = None
+            connection.closed += 1
+            if connection.closing:
+                with self.__lock:
+                    del self.__connections[client]
+
+        self.__change(change)
+
+    def __on_socket_register_write(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho has data to send."""
+        self.__change(lambda: self.__watch(client, sock, True))
+
+    def __on_socket_unregister_write(self, client: mqtt.Client, userdata, sock) -> None:
+        """Paho has sent all data."""
+        self.__change(lambda: self.__watch(client, sock, False))
+
+    def __watch(self, client: mqtt.Client, sock, write: bool) -> None:
+        """Watch the socket for writing or only for reading."""
+        connection = self.__connections.get(client)
+        if connection is None or connection.sock is not sock:
+            return
+
+        events = selectors.EVENT_READ
+        if write:
+            events |= selectors.EVENT_WRITE
+        self.__selector.modify(sock, events, client)
+
+    def __unregister(self, sock) -> None:
+        """Stop watching the socket, it can be closed already."""
+        try:
+            self.__selector.unregister(sock)
+        except (KeyError, ValueError):
+            pass
@@ -0,0 +1,229 @@
+"""Connections to brokers of many installations in one process."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional
+
+import attr
+
+from . import InelsMqtt
+from .const import PublishPriority
+from .network import NetworkLoop
+
+
+@attr.s(slots=True, frozen=True)
+class ConnectionStats:
+    """Health and throughput of the connection to one site."""
+
+    site: str = attr.ib()
+    host: str = attr.ib()
+    port: int = attr.ib()
+    connected: bool = attr.ib()
+    connects: int = attr.ib()
+    disconnects: int = attr.ib()
+    reconnects: int = attr.ib()
+    received: int = attr.ib()
+    published: int = attr.ib()
+    received_rate: float = attr.ib()
+    published_rate: float = attr.ib()
+    idle: Optional[float] = attr.ib()
+
+
+class _Site:
+    """Client of one site and its counters from the previous stats."""
+
+    __slots__ = ("mqtt", "loop", "received", "published", "measured")
+
+    def __init__(self, mqtt: InelsMqtt, loop: NetworkLoop, now: float) -> None:
+        """Create site."""
+        self.mqtt = mqtt
+        self.loop = loop
+        self.received = 0
+        self.published = 0
+        self.measured = now
+
+
+class BrokerPool:
+    """InelsMqtt clients of many sites behind one object.
+
+    Every site (installation, coordinator group) has its own broker
+    connection, calls are routed by the site name. Clients do not start
+    their own network thread, all of them share few network loops, each
+    site is placed into the loop with the least clients. Site clients
+    can be used directly, e.g. for devices, with pool[site].
+    """
+
+    def __init__(
+        self,
+        loops: int = 1,
+        factory: Callable[..., InelsMqtt] = InelsMqtt,
+    ) -> None:
+        """Create empty pool
+
+        Args:
+            loops (int, optional): amount of network threads shared by all
+              sites. Defaults to 1.
+            factory (Callable[..., InelsMqtt], optional): creates client
+              from config and network_loop. Defaults to InelsMqtt.
+        """
+        if loops < 1:
+            raise ValueError(f"At least one network loop is needed, got {loops}")
+
+        self.__loops = [NetworkLoop(f"inels-network-{index}") for index in range(loops)]
+        self.__factory = factory
+        self.__sites: dict[str, _Site] = {}
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Amount of sites."""
+        return len(self.__sites)
+
+    def __contains__(self, site: str) -> bool:
+        """Is the site in the pool."""
+        return site in self.__sites
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over a copy of site names."""
+        return iter(self.sites)
+
+    def __getitem__(self, site: str) -> InelsMqtt:
+        """Client of the site, KeyError when unknown."""
+        return self.__sites[site].mqtt
+
+    @property
+    def sites(self) -> list[str]:
+        """Names of all sites."""
+        return list(self.__sites)
+
+    def get(self, site: str) -> Optional[InelsMqtt]:
+        """Client of the site, None when unknown."""
+        item = self.__sites.get(site)
+        return item.mqtt if item is not None else None
+
+    def add(self, site: str, config: dict[str, Any]) -> InelsMqtt:
+        """Create client of the site, it connects with the first
+        subscribe or publish
+
+        Args:
+            site (str): name of the site
+            config (dict[str, Any]): config of InelsMqtt
+
+        Returns:
+            InelsMqtt: client of the site
+        """
+        with self.__lock:
+            if site in self.__sites:
+                raise ValueError(f"Site {site} is already in the pool")
+
+            # clients attach on first connect, count placed sites instead
+            placed = [item.loop for item in self.__sites.values()]
+            loop = min(self.__loops, key=placed.count)
+            mqtt = self.__factory(config, network_loop=loop)
+            self.__sites[site] = _Site(mqtt, loop, time.monotonic())
+
+        return mqtt
+
+    def remove(self, site: str) -> bool:
+        """Disconnect client of the site and forget it
+
+        Args:
+            site (str): name of the site
+
+        Returns:
+            bool: False when the site is unknown
+        """
+        with self.__lock:
+            item = self.__sites.pop(site, None)
+
+        if item is None:
+            return False
+
+        item.mqtt.disconnect()
+        return True
+
+    def close(self) -> None:
+        """Disconnect all sites and stop network loops."""
+        for site in self.sites:
+            self.remove(site)
+
+        for loop in self.__loops:
+            loop.stop()
+
+    def publish(
+        self,
+        site: str,
+        topic: str,
+        payload: Any,
+        qos: int = 0,
+        retain: bool = True,
+        priority: PublishPriority = PublishPriority.NORMAL,
+    ) -> bool:
+        """Publish to the broker of the site and wait for acknowledge
+
+        Args:
+            site (str): name of the site
+            topic (str): topic string where to publish
+            payload (Any): data content
+            qos (int, optional): quality of service. Defaults to 0.
+            retain (bool, optional): retain flag. Defaults to True.
+            priority (PublishPriority, optional): priority class used
+              when publishes are scheduled. Defaults to NORMAL.
+        """
+        return self[site].publish(topic, payload, qos, retain, priority=priority)
+
+    def subscribe(self, site: str, topic: str, qos: int = 0) -> Any:
+        """Subscribe the topic at the broker of the site
+
+        Returns:
+            Any: payload of the topic, None when not arrived in time
+        """
+        return self[site].subscribe(topic, qos)
+
+    def subscribe_listener(
+        self, site: str, topic: str, fnc: Callable[[Any], Any]
+    ) -> None:
+        """Register listener of the topic of the site."""
+        self[site].subscribe_listener(topic, fnc)
+
+    def unsubscribe_listener(
+        self, site: str, topic: str, fnc: Callable[[Any], Any] = None
+    ) -> bool:
+        """Remove listener of the topic of the site."""
+        return self[site].unsubscribe_listener(topic, fnc)
+
+    def stats(self) -> dict[str, ConnectionStats]:
+        """Health and throughput of all sites
+
+        Returns:
+            dict[str, ConnectionStats]: stats by site, rates are messages
+              per second since the previous call
+        """
+        now = time.monotonic()
+        result = {}
+
+        for site, item in list(self.__sites.items()):
+            mqtt = item.mqtt
+            connection = item.loop.connection(mqtt.client)
+            received, published = mqtt.messages_received, mqtt.messages_published
+            elapsed = max(now - item.measured, 1e-9)
+            last = mqtt.last_received
+
+            result[site] = ConnectionStats(
+                site=site,
+                host=mqtt.host,
+                port=mqtt.port,
+                connected=mqtt.client.is_connected(),
+                connects=connection.opened if connection else 0,
+                disconnects=connection.closed if connection else 0,
+                reconnects=connection.reconnects if connection else 0,
+                received=received,
+                published=published,
+                received_rate=(received - item.received) / elapsed,
+                published_rate=(published - item.published) / elapsed,
+                idle=now - last if last is not None else None,
+            )
+
+            item.received, item.published, item.measured = received, published, now
+
+        return result
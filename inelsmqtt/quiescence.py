@@ -0,0 +1,101 @@
+"""Detection of the end of the retained messages burst."""
+from __future__ import annotations
+
+import time
+
+import attr
+
+from .const import DiscoveryEnd, DISCOVERY_GAP_FACTOR
+
+
+@attr.s(slots=True, frozen=True)
+class DiscoveryReport:
+    """Summary of the finished discovery."""
+
+    reason: DiscoveryEnd = attr.ib()
+    messages: int = attr.ib()
+    burst: float = attr.ib()
+    elapsed: float = attr.ib()
+    quiet: float = attr.ib()
+
+
+class QuiescenceDetector:
+    """Estimate how long to wait for the next retained message.
+
+    Broker sends retained messages in one burst, gaps inside the burst
+    are short. The quiet window is derived from the longest gap seen so
+    far, so a tiny installation ends its discovery in a fraction of second,
+    while a slow link with big gaps still waits long enough.
+    """
+
+    def __init__(
+        self,
+        min_quiet: float,
+        max_quiet: float,
+        factor: float = DISCOVERY_GAP_FACTOR,
+    ) -> None:
+        """Create detector
+
+        Args:
+            min_quiet (float): shortest quiet window in seconds
+            max_quiet (float): longest quiet window in seconds, it is used
+              also while waiting for the first message
+            factor (float, optional): quiet window as multiple of the
+              longest observed gap. Defaults to DISCOVERY_GAP_FACTOR.
+        """
+        self.__min_quiet = min(min_quiet, max_quiet)
+        self.__max_quiet = max_quiet
+        self.__factor = factor
+        self.start()
+
+    @property
+    def messages(self) -> int:
+        """Amount of messages arrived since start."""
+        return self.__messages
+
+    @property
+    def window(self) -> float:
+        """How long to wait for the next message before the burst is over."""
+        if self.__messages == 0:
+            return self.__max_quiet
+
+        return min(
+            max(self.__factor * self.__max_gap, self.__min_quiet), self.__max_quiet
+        )
+
+    def start(self) -> None:
+        """Forget previous burst and start measuring the new one."""
+        self.__started = time.monotonic()
+        self.__first = self.__last = self.__started
+        self.__max_gap = 0.0
+        self.__messages = 0
+
+    def arrived(self) -> None:
+        """Note message arrival."""
+        now = time.monotonic()
+
+        if self.__messages == 0:
+            self.__first = now
+        else:
+            self.__max_gap = max(self.__max_gap, now - self.__last)
+
+        self.__last = now
+        self.__messages += 1
+
+    def report(self, reason: DiscoveryEnd) -> DiscoveryReport:
+        """Summary of the measured burst
+
+        Args:
+            reason (DiscoveryEnd): why the discovery ended
+
+        Returns:
+            DiscoveryReport: reason, amount of messages, burst duration,
+              total elapsed time and last quiet window
+        """
+        return DiscoveryReport(
+            reason=reason,
+            messages=self.__messages,
+            burst=self.__last - self.__first,
+            elapsed=time.monotonic() - self.__started,
+            quiet=self.window,
+        )
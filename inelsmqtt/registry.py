@@ -0,0 +1,143 @@
+"""Indexed registry of discovered devices."""
+from __future__ import annotations
+
+from typing import Any, Hashable, Iterator, Optional
+
+from inelsmqtt.const import Element, Platform
+from inelsmqtt.devices import Device
+
+
+class DeviceRegistry:
+    """Devices indexed by unique id, state topic, coordinator serial,
+    platform and element.
+
+    Every index maps its key to devices keyed by their state topic, so
+    adding and removing a device is O(1) and devices are listed in order
+    of discovery. Unique id of the device is expected to be unique in the
+    whole installation, when it is not, the last added device wins.
+    """
+
+    def __init__(self) -> None:
+        """Create empty registry."""
+        self.__by_topic: dict[str, Device] = {}
+        self.__by_unique_id: dict[str, Device] = {}
+        self.__by_coordinator: dict[str, dict[str, Device]] = {}
+        self.__by_platform: dict[Platform, dict[str, Device]] = {}
+        self.__by_element: dict[Element, dict[str, Device]] = {}
+
+    def __len__(self) -> int:
+        """Amount of registered devices."""
+        return len(self.__by_topic)
+
+    def __contains__(self, state_topic: str) -> bool:
+        """Is there a device with the state topic."""
+        return state_topic in self.__by_topic
+
+    def __iter__(self) -> Iterator[Device]:
+        """Iterate over a copy of devices, the registry can change meanwhile."""
+        return iter(self.devices)
+
+    @property
+    def devices(self) -> list[Device]:
+        """All devices in order of discovery."""
+        return list(self.__by_topic.values())
+
+    @property
+    def coordinators(self) -> list[str]:
+        """Serial numbers of coordinators having at least one device."""
+        return list(self.__by_coordinator)
+
+    def add(self, device: Device) -> bool:
+        """Register device
+
+        Args:
+            device (Device): device to index
+
+        Returns:
+            bool: False when a device with the same state topic is known
+        """
+        topic = device.state_topic
+        if topic in self.__by_topic:
+            return False
+
+        self.__by_topic[topic] = device
+        self.__by_unique_id[device.unique_id] = device
+        _index(self.__by_coordinator, device.parent_id, topic, device)
+        _index(self.__by_platform, device.device_type, topic, device)
+        _index(self.__by_element, device.inels_type, topic, device)
+
+        return True
+
+    def remove(self, device: Device) -> bool:
+        """Unregister device
+
+        Args:
+            device (Device): registered device
+
+        Returns:
+            bool: False when the device is not registered
+        """
+        topic = device.state_topic
+        if self.__by_topic.get(topic) is not device:
+            return False
+
+        del self.__by_topic[topic]
+        if self.__by_unique_id.get(device.unique_id) is device:
+            del self.__by_unique_id[device.unique_id]
+        _unindex(self.__by_coordinator, device.parent_id, topic)
+        _unindex(self.__by_platform, device.device_type, topic)
+        _unindex(self.__by_element, device.inels_type, topic)
+
+        return True
+
+    def clear(self) -> None:
+        """Forget all devices."""
+        for index in (
+            self.__by_topic,
+            self.__by_unique_id,
+            self.__by_coordinator,
+            self.__by_platform,
+            self.__by_element,
+        ):
+            index.clear()
+
+    def get(self, unique_id: str) -> Optional[Device]:
+        """Device with the unique id, None when unknown."""
+        return self.__by_unique_id.get(unique_id)
+
+    def by_state_topic(self, state_topic: str) -> Optional[Device]:
+        """Device with the state topic, None when unknown."""
+        return self.__by_topic.get(state_topic)
+
+    def by_coordinator(self, serial: str) -> list[Device]:
+        """Devices connected to the coordinator."""
+        return list(self.__by_coordinator.get(serial, {}).values())
+
+    def by_platform(self, platform: Platform) -> list[Device]:
+        """Devices of the HA platform."""
+        return list(self.__by_platform.get(platform, {}).values())
+
+    def by_element(self, element: Element) -> list[Device]:
+        """Devices of the inels element type."""
+        return list(self.__by_element.get(element, {}).values())
+
+
+def _index(
+    index: dict[Hashable, dict[str, Any]], key: Hashable, topic: str, device: Any
+) -> None:
+    """Add device into the group of the key."""
+    group = index.get(key)
+    if group is None:
+        group = index[key] = {}
+    group[topic] = device
+
+
+def _unindex(index: dict[Hashable, dict[str, Any]], key: Hashable, topic: str) -> None:
+    """Remove device from the group of the key, empty group is dropped."""
+    group = index.get(key)
+    if group is None:
+        return
+
+    group.pop(topic, None)
+    if not group:
+        del index[key]
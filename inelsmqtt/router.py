@@ -0,0 +1,146 @@
+"""Routing of mqtt topics to listeners."""
+from __future__ import annotations
+
+from typing import Any, Callable
+
+SINGLE_LEVEL_WILDCARD = "+"
+MULTI_LEVEL_WILDCARD = "#"
+
+
+class _Node:
+    """One level of the topic trie."""
+
+    __slots__ = ("children", "listeners")
+
+    def __init__(self) -> None:
+        """Create empty level."""
+        self.children: dict[str, _Node] = {}
+        self.listeners: list[Callable[[Any], Any]] = []
+
+
+class TopicRouter:
+    """Topic trie mapping topic filters to listeners.
+
+    Filters may contain mqtt wildcards (+ single level, # rest of levels)
+    and every filter can hold many listeners. Cost of the match depends
+    on the depth of the topic, not on the amount of registered listeners.
+    """
+
+    def __init__(self) -> None:
+        """Create empty router."""
+        self.__root = _Node()
+        self.__filters = dict[str, list[Callable[[Any], Any]]]()
+
+    def __len__(self) -> int:
+        """Amount of registered topic filters."""
+        return len(self.__filters)
+
+    def __contains__(self, topic_filter: str) -> bool:
+        """Is there any listener for the topic filter."""
+        return topic_filter in self.__filters
+
+    @property
+    def filters(self) -> dict[str, list[Callable[[Any], Any]]]:
+        """Registered topic filters with their listeners."""
+        return self.__filters
+
+    def add(self, topic_filter: str, fnc: Callable[[Any], Any]) -> None:
+        """Register listener for the topic filter
+
+        Args:
+            topic_filter (str): topic, can contain + and # wildcards
+            fnc (Callable[[Any], Any]): listener called with the payload
+        """
+        node = self.__root
+        for level in topic_filter.split("/"):
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _Node()
+            node = child
+
+        if fnc not in node.listeners:
+            node.listeners.append(fnc)
+            self.__filters[topic_filter] = node.listeners
+
+    def remove(self, topic_filter: str, fnc: Callable[[Any], Any] = None) -> bool:
+        """Unregister listener of the topic filter
+
+        Args:
+            topic_filter (str): topic filter used with add
+            fnc (Callable[[Any], Any], optional): listener to remove.
+              Defaults to None, all listeners of the filter are removed.
+
+        Returns:
+            bool: True when anything was removed
+        """
+        path = [self.__root]
+        levels = topic_filter.split("/")
+        for level in levels:
+            child = path[-1].children.get(level)
+            if child is None:
+                return False
+            path.append(child)
+
+        node = path[-1]
+        if fnc is None:
+            removed = len(node.listeners) > 0
+            node.listeners.clear()
+        elif fnc in node.listeners:
+            removed = True
+            node.listeners.remove(fnc)
+        else:
+            return False
+
+        if len(node.listeners) == 0:
+            self.__filters.pop(topic_filter, None)
+
+        # prune levels which lead nowhere
+        for level, parent, child in zip(
+            reversed(levels), reversed(path[:-1]), reversed(path[1:])
+        ):
+            if child.children or child.listeners:
+                break
+            del parent.children[level]
+
+        return removed
+
+    def clear(self) -> None:
+        """Unregister all listeners."""
+        self.__root = _Node()
+        self.__filters.clear()
+
+    def match(self, topic: str) -> list[Callable[[Any], Any]]:
+        """Find listeners of all filters matching the topic
+
+        Args:
+            topic (str): topic of the received message, without wildcards
+
+        Returns:
+            list[Callable[[Any], Any]]: matching listeners
+        """
+        result: list[Callable[[Any], Any]] = []
+        levels = topic.split("/")
+        last = len(levels)
+
+        # topics starting with $ are not matched by wildcards on first level
+        stack = [(self.__root, 0)]
+        while stack:
+            node, depth = stack.pop()
+
+            multi = node.children.get(MULTI_LEVEL_WILDCARD)
+            if multi is not None and (depth > 0 or topic[:1] != "$"):
+                result.extend(multi.listeners)
+
+            if depth == last:
+                result.extend(node.listeners)
+                continue
+
+            exact = node.children.get(levels[depth])
+            if exact is not None:
+                stack.append((exact, depth + 1))
+
+            single = node.children.get(SINGLE_LEVEL_WILDCARD)
+            if single is not None and (depth > 0 or topic[:1] != "$"):
+                stack.append((single, depth + 1))
+
+        return result
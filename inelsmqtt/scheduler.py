@@ -0,0 +1,430 @@
+"""Rate limited publishing of commands to RF coordinators."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+import attr
+
+from .const import PUBLISH_BURST, PublishPriority
+from .util import parse_topic
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@attr.s(slots=True, frozen=True)
+class CoordinatorStats:
+    """Publish queue of one coordinator."""
+
+    queued: int = attr.ib()
+    sent: int = attr.ib()
+    collapsed: int = attr.ib()
+    expired: int = attr.ib()
+    wait: float = attr.ib()
+    max_wait: float = attr.ib()
+
+
+class ScheduledAck:
+    """Acknowledge of the publish waiting in the scheduler. Once the
+    message is sent it follows the acknowledge of the message."""
+
+    def __init__(self) -> None:
+        """Create acknowledge of not sent message."""
+        self.__sent = threading.Event()
+        self.__ack = None
+
+    @property
+    def mid(self) -> Optional[int]:
+        """Message id, None till the message is sent."""
+        return self.__ack.mid if self.__ack is not None else None
+
+    @property
+    def is_published(self) -> bool:
+        """Broker has acknowledged the message."""
+        return self.__ack is not None and self.__ack.is_published
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait till the message is sent and the broker acknowledges it
+
+        Args:
+            timeout (float, optional): max time of waiting in seconds.
+              Defaults to None, wait forever.
+
+        Returns:
+            bool: True when the message has been published
+        """
+        start = time.monotonic()
+        if not self.__sent.wait(timeout) or self.__ack is None:
+            return False
+
+        if timeout is not None:
+            timeout = max(0.0, timeout - (time.monotonic() - start))
+
+        return self.__ack.wait(timeout)
+
+    def wait_sent(self, timeout: float = None) -> bool:
+        """Wait till the message leaves the queue of its coordinator
+
+        Args:
+            timeout (float, optional): max time of waiting in seconds.
+              Defaults to None, wait forever.
+
+        Returns:
+            bool: True when the message has been handed to the broker,
+              False when it is still queued or it was dropped
+        """
+        return self.__sent.wait(timeout) and self.__ack is not None
+
+    def _sent(self, ack: Any) -> None:
+        """Follow acknowledge of the sent message, None when not sent."""
+        self.__ack = ack
+        self.__sent.set()
+
+
+class _Command:
+    """Publish waiting for its coordinator."""
+
+    __slots__ = (
+        "topic",
+        "payload",
+        "qos",
+        "retain",
+        "properties",
+        "priority",
+        "queued",
+        "deadline",
+        "ack",
+    )
+
+    def __init__(
+        self,
+        topic: str,
+        payload: Any,
+        qos: int,
+        retain: bool,
+        properties: Any,
+        priority: PublishPriority,
+        queued: float,
+        deadline: Optional[float],
+    ) -> None:
+        """Create queued command."""
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+        self.properties = properties
+        self.priority = priority
+        self.queued = queued
+        # not sent after it, None when the command never expires
+        self.deadline = deadline
+        self.ack = ScheduledAck()
+
+
+class _Coordinator:
+    """Token bucket and queues of one coordinator."""
+
+    __slots__ = (
+        "tokens",
+        "updated",
+        "queues",
+        "by_topic",
+        "sent",
+        "collapsed",
+        "expired",
+        "total_wait",
+        "max_wait",
+    )
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        """Create coordinator with full bucket."""
+        self.tokens = tokens
+        self.updated = updated
+        self.queues = tuple(deque() for _ in PublishPriority)
+        # every topic has at most one queued command
+        self.by_topic: dict[str, _Command] = {}
+        self.sent = 0
+        self.collapsed = 0
+        self.expired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def pop(self) -> _Command:
+        """Take the oldest command of the highest priority."""
+        for queue in self.queues:
+            if queue:
+                command = queue.popleft()
+                del self.by_topic[command.topic]
+                return command
+
+        return None
+
+
+class PublishScheduler:
+    """Publishes queued per coordinator and sent by one thread.
+
+    Every coordinator (serial number in the topic) has its own token
+    bucket, it can get burst messages at once and then rate messages per
+    second, so a scene switching many devices does not flood its radio.
+    Commands of higher priority are sent first. A command for the topic
+    which already has a queued command replaces it, the stale payload is
+    never sent and both callers get the acknowledge of the newer one.
+
+    Capacity limits the amount of messages sent at once, e.g. by the free
+    slots of the inflight window, so the thread never waits inside
+    publish. When it is exhausted queued commands wait for wake. Command
+    waiting longer than queue timeout since its last submit is not sent.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[..., Any],
+        rate: float,
+        burst: int = PUBLISH_BURST,
+        capacity: Callable[[], int] = None,
+        queue_timeout: float = None,
+        name: str = "inels-publish",
+    ) -> None:
+        """Create scheduler, its thread is started with the first command
+
+        Args:
+            publish (Callable[..., Any]): called with topic, payload, qos,
+              retain and properties, returns acknowledge with wait method
+            rate (float): messages per second of one coordinator
+            burst (int, optional): messages sent at once before the rate
+              applies. Defaults to PUBLISH_BURST.
+            capacity (Callable[[], int], optional): amount of messages
+              which can be sent now. Defaults to None, not limited.
+            queue_timeout (float, optional): max seconds a command waits
+              in the queue, expired commands are dropped. Defaults to None,
+              commands never expire.
+            name (str, optional): name of the thread.
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate has to be positive, got {rate}")
+
+        self.__publish = publish
+        self.__rate = rate
+        self.__burst = max(1, burst)
+        self.__capacity = capacity
+        self.__queue_timeout = queue_timeout
+        self.__name = name
+        self.__coordinators: dict[str, _Coordinator] = {}
+        # coordinators with queued commands
+        self.__ready: dict[str, _Coordinator] = {}
+        self.__condition = threading.Condition()
+        self.__thread: threading.Thread = None
+        self.__running = False
+
+    @property
+    def is_running(self) -> bool:
+        """Is the sending thread running."""
+        return self.__running
+
+    def submit(
+        self,
+        topic: str,
+        payload: Any,
+        qos: int = 0,
+        retain: bool = True,
+        properties: Any = None,
+        priority: PublishPriority = PublishPriority.NORMAL,
+    ) -> ScheduledAck:
+        """Queue publish for the coordinator of the topic
+
+        Args:
+            topic (str): set topic of the device
+            payload (Any): data content
+            qos (int, optional): quality of service. Defaults to 0.
+            retain (bool, optional): retain flag. Defaults to True.
+            properties (Any, optional): mqtt v5 properties. Defaults to None.
+            priority (PublishPriority, optional): priority class.
+              Defaults to NORMAL.
+
+        Returns:
+            ScheduledAck: acknowledge of the message, caller can wait on it
+        """
+        serial = parse_topic(topic).serial or ""
+        now = time.monotonic()
+        deadline = None
+        if self.__queue_timeout is not None:
+            deadline = now + self.__queue_timeout
+
+        with self.__condition:
+            if not self.__running:
+                self.__start()
+
+            coordinator = self.__coordinators.get(serial)
+            if coordinator is None:
+                coordinator = _Coordinator(self.__burst, now)
+                self.__coordinators[serial] = coordinator
+
+            command = coordinator.by_topic.get(topic)
+            if command is not None:
+                command.payload = payload
+                command.qos = qos
+                command.retain = retain
+                command.properties = properties
+                command.deadline = deadline
+                if priority < command.priority:
+                    coordinator.queues[command.priority].remove(command)
+                    coordinator.queues[priority].append(command)
+                    command.priority = priority
+                coordinator.collapsed += 1
+
+                return command.ack
+
+            command = _Command(
+                topic, payload, qos, retain, properties, priority, now, deadline
+            )
+            coordinator.queues[priority].append(command)
+            coordinator.by_topic[topic] = command
+            self.__ready[serial] = coordinator
+            self.__condition.notify()
+
+        return command.ack
+
+    def wake(self) -> None:
+        """Capacity grew, send commands waiting for it."""
+        with self.__condition:
+            self.__condition.notify()
+
+    def stop(self, timeout: float = None) -> None:
+        """Stop sending, queued commands are not published
+
+        Args:
+            timeout (float, optional): max time of waiting for the thread.
+              Defaults to None.
+        """
+        with self.__condition:
+            if not self.__running:
+                return
+
+            self.__running = False
+            dropped = []
+            for coordinator in self.__ready.values():
+                dropped.extend(coordinator.by_topic.values())
+                coordinator.by_topic.clear()
+                for queue in coordinator.queues:
+                    queue.clear()
+            self.__ready.clear()
+            self.__condition.notify_all()
+
+        for command in dropped:
+            command.ack._sent(None)  # pylint: disable=protected-access
+
+        if self.__thread is not threading.current_thread():
+            self.__thread.join(timeout)
+
+    def stats(self) -> dict[str, CoordinatorStats]:
+        """Publish queues by the serial number of coordinator
+
+        Returns:
+            dict[str, CoordinatorStats]: wait is the average time sent
+              commands spent in the queue
+        """
+        with self.__condition:
+            return {
+                serial: CoordinatorStats(
+                    queued=len(coordinator.by_topic),
+                    sent=coordinator.sent,
+                    collapsed=coordinator.collapsed,
+                    expired=coordinator.expired,
+                    wait=coordinator.total_wait / coordinator.sent
+                    if coordinator.sent
+                    else 0.0,
+                    max_wait=coordinator.max_wait,
+                )
+                for serial, coordinator in self.__coordinators.items()
+            }
+
+    def __start(self) -> None:
+        """Start sending thread, condition has to be held."""
+        self.__running = True
+        self.__thread = threading.Thread(
+            target=self.__run, name=self.__name, daemon=True
+        )
+        self.__thread.start()
+
+    def __run(self) -> None:
+        """Loop of the sending thread."""
+        while True:
+            batch: list[_Command] = []
+            with self.__condition:
+                while True:
+                    if not self.__running:
+                        return
+
+                    delay = self.__take(batch, time.monotonic())
+                    if batch:
+                        break
+                    self.__condition.wait(delay)
+
+            for command in batch:
+                self.__send(command)
+
+    def __take(self, batch: list[_Command], now: float) -> Optional[float]:
+        """Move commands allowed by token buckets into the batch
+
+        Returns:
+            Optional[float]: time till the next token of a coordinator with
+              queued commands, None when nothing is queued or the queued
+              ones wait for capacity
+        """
+        delay = None
+        room = self.__capacity() if self.__capacity is not None else None
+        for serial, coordinator in list(self.__ready.items()):
+            coordinator.tokens = min(
+                self.__burst,
+                coordinator.tokens + (now - coordinator.updated) * self.__rate,
+            )
+            coordinator.updated = now
+
+            while (
+                coordinator.tokens >= 1
+                and coordinator.by_topic
+                and (room is None or len(batch) < room)
+            ):
+                command = coordinator.pop()
+                if command.deadline is not None and now >= command.deadline:
+                    # its callers gave up waiting, the command is stale
+                    coordinator.expired += 1
+                    command.ack._sent(None)  # pylint: disable=protected-access
+                    continue
+
+                coordinator.tokens -= 1
+                waited = now - command.queued
+                coordinator.sent += 1
+                coordinator.total_wait += waited
+                if waited > coordinator.max_wait:
+                    coordinator.max_wait = waited
+                batch.append(command)
+
+            if not coordinator.by_topic:
+                del self.__ready[serial]
+                continue
+
+            # coordinator with tokens waits for capacity, not for time
+            if coordinator.tokens < 1:
+                wait = (1 - coordinator.tokens) / self.__rate
+                delay = wait if delay is None else min(delay, wait)
+
+        return delay
+
+    def __send(self, command: _Command) -> None:
+        """Publish the command and pass its acknowledge to callers."""
+        try:
+            ack = self.__publish(
+                command.topic,
+                command.payload,
+                command.qos,
+                command.retain,
+                command.properties,
+            )
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Publish to %s failed", command.topic)
+            ack = None
+
+        command.ack._sent(ack)  # pylint: disable=protected-access
@@ -1,9 +1,21 @@
 """Utility classes."""
 import logging
+import sys
 
-from operator import itemgetter
-from typing import Any, Dict
+from functools import lru_cache
+from typing import Any, Dict, Optional
 
+import attr
+
+from inelsmqtt.codec import (
+    CacheInfo,
+    Codec,
+    cache_info,
+    get_codec,
+    layout_decoder,
+    register_codec,
+    unhexlify,
+)
 from inelsmqtt.mqtt_client import GetMessageType
 
 from .const import Platform, Element
@@ -20,6 +32,15 @@ from .const import (
     DEVICE_TYPE_07_DATA,
     DEVICE_TYPE_10_DATA,
     DEVICE_TYPE_12_DATA,
+    DEVICE_TYPE_DICT,
+    INELS_DEVICE_TYPE_DICT,
+    FRAGMENT_DOMAIN,
+    FRAGMENT_STATE,
+    FRAGMENT_SERIAL_NUMBER,
+    FRAGMENT_DEVICE_TYPE,
+    FRAGMENT_UNIQUE_ID,
+    TOPIC_FRAGMENTS,
+    TOPIC_CACHE_SIZE,
     REQUIRED_TEMP,
     SENSOR_RFTC_10_G_LOW_BATTERY,
     SHUTTER_SET,
@@ -40,228 +61,432 @@ ConfigType = Dict[str, str]
 _LOGGER = logging.getLogger(__name__)
 
 
+@attr.s(slots=True, frozen=True)
+class ParsedTopic:
+    """Inels topic split into its fragments. Fragments are interned, so
+    devices of one coordinator share them. Set and connected topics are
+    read on every command and availability check, they are created once
+    with the parsed topic, other related topics when asked for."""
+
+    topic: str = attr.ib()
+    domain: Optional[str] = attr.ib()
+    state: Optional[str] = attr.ib()
+    serial: Optional[str] = attr.ib()
+    type: Optional[str] = attr.ib()
+    uid: Optional[str] = attr.ib()
+    platform: Optional[Platform] = attr.ib()
+    element: Optional[Element] = attr.ib()
+    # set topic of the device, None when the topic has no unique id
+    set_topic: Optional[str] = attr.ib()
+    # availability topic of the device, None when the topic has no unique id
+    connected_topic: Optional[str] = attr.ib()
+
+    def related(self, state: str) -> Optional[str]:
+        """Topic of the same device with another state fragment
+
+        Args:
+            state (str): e.g. status, set or connected
+
+        Returns:
+            Optional[str]: topic, None when the topic has no unique id
+        """
+        if self.uid is None:
+            return None
+
+        return f"{self.domain}/{state}/{self.serial}/{self.type}/{self.uid}"
+
+    @property
+    def state_topic(self) -> Optional[str]:
+        """Status topic of the device."""
+        return self.related("status")
+
+
+@lru_cache(maxsize=TOPIC_CACHE_SIZE)
+def parse_topic(topic: str) -> ParsedTopic:
+    """Parse inels topic. Results are cached, the same topic
+    returns the same immutable object
+
+    Args:
+        topic (str): topic e.g. inels/status/<serial>/<type>/<uid>
+
+    Returns:
+        ParsedTopic: fragments of the topic, None when missing. Platform
+          and element are None for unknown device types
+    """
+    fragments = [sys.intern(fragment) for fragment in topic.split("/")]
+
+    def fragment(name: str) -> Optional[str]:
+        index = TOPIC_FRAGMENTS[name]
+        return fragments[index] if index < len(fragments) else None
+
+    domain = fragment(FRAGMENT_DOMAIN)
+    serial = fragment(FRAGMENT_SERIAL_NUMBER)
+    dev_type = fragment(FRAGMENT_DEVICE_TYPE)
+    uid = fragment(FRAGMENT_UNIQUE_ID)
+
+    def related(state: str) -> Optional[str]:
+        if uid is None:
+            return None
+        return sys.intern(f"{domain}/{state}/{serial}/{dev_type}/{uid}")
+
+    return ParsedTopic(
+        topic=sys.intern(topic),
+        domain=domain,
+        state=fragment(FRAGMENT_STATE),
+        serial=serial,
+        type=dev_type,
+        uid=uid,
+        platform=DEVICE_TYPE_DICT.get(dev_type),
+        element=INELS_DEVICE_TYPE_DICT.get(dev_type),
+        set_topic=related("set"),
+        connected_topic=related("connected"),
+    )
+
+
+def topic_cache_info():
+    """Hit and miss counters of the parsed topic cache."""
+    return parse_topic.cache_info()
+
+
 def new_object(**kwargs):
     """Create new anonymouse object."""
     return type("Object", (), kwargs)
 
 
+@attr.s(slots=True, frozen=True)
+class SwitchValue:
+    """State of the switch."""
+
+    on: bool = attr.ib()
+
+
+@attr.s(slots=True)
+class SwitchTempValue:
+    """State of the switch with temperature sensor (RFSTI-11B)."""
+
+    on: bool = attr.ib()
+    temperature: float = attr.ib(default=None)
+
+
+@attr.s(slots=True)
+class TemperatureSensorValue:
+    """State of the temperature sensor with two probes (RFTI-10B)."""
+
+    temp_in: float = attr.ib()
+    temp_out: float = attr.ib()
+    battery: int = attr.ib()
+
+
+@attr.s(slots=True)
+class ThermoSensorValue:
+    """State of the temperature sensor (RFTC-10/G)."""
+
+    temperature: float = attr.ib()
+    battery: int = attr.ib()
+
+
+@attr.s(slots=True)
+class ValveValue:
+    """State of the thermo valve (RFATV-2)."""
+
+    battery: int = attr.ib()
+    current: float = attr.ib()
+    required: float = attr.ib()
+    open_in_percentage: float = attr.ib()
+
+
+@attr.s(slots=True)
+class ButtonValue:
+    """State of the button (RFGB-40)."""
+
+    number: int = attr.ib()
+    battery: int = attr.ib()
+    pressing: bool = attr.ib()
+    changed: bool = attr.ib()
+    amount: int = attr.ib()
+
+
+def _reverse(array: dict) -> dict:
+    """Swap keys and values of the dict. When more keys share the value,
+    the first one is kept."""
+    reverse = {}
+    for key, value in array.items():
+        reverse.setdefault(value, key)
+
+    return reverse
+
+
+def _find_key_by_value(reverse: dict, value, last_value) -> Any:
+    """Return key from dict by value
+
+    Args:
+        reverse (dict): dictionary swapped by _reverse
+        value Any: by this value I'm goning to find key
+        last_value Any: used when the value is not in the dictionary
+    Returns:
+        Any: value of the dict key
+    """
+    key = reverse.get(value)
+    if key is None:
+        if last_value not in reverse:
+            raise ValueError(f"{value} nor {last_value} is in list of {list(reverse)}")
+        key = reverse[last_value]
+        _LOGGER.warning("Value %s is not in list of %s", value, list(reverse))
+
+    return key
+
+
+def _hex_field(payload: bytes, indices: list[int], jointer: str) -> str:
+    """Selected bytes of inels status as upper case hex string."""
+    data = unhexlify(payload)
+    selected = bytes([data[index] for index in indices])
+
+    return (selected.hex(jointer) if jointer else selected.hex()).upper()
+
+
+def _bytes_keys(array: dict[str, Any]) -> dict[bytes, Any]:
+    """Table keyed by the payload as received from broker."""
+    return {key.encode(): value for key, value in array.items()}
+
+
+__SWITCH_STATE = _bytes_keys(SWITCH_STATE)
+__SHUTTER_STATES = _bytes_keys(SHUTTER_STATES)
+__DIMMER_VALUES = _bytes_keys(DEVICE_TYPE_05_HEX_VALUES)
+__SHUTTER_PAYLOADS = _reverse(__SHUTTER_STATES)
+__DIMMER_PAYLOADS = _reverse(__DIMMER_VALUES)
+
+
+def _decode_switch(payload: bytes, last_value: Any) -> tuple[Any, Any]:
+    ha_value = SwitchValue(on=__SWITCH_STATE[payload])
+    return ha_value, SWITCH_SET[ha_value.on]
+
+
+def _encode_switch(ha_value: Any, last_value: Any) -> tuple[Any, Any, Any]:
+    return None, SWITCH_SET.get(ha_value.on), ha_value
+
+
+def _build_switch_temp(fields: dict[str, int]) -> tuple[Any, Any]:
+    ha_value = SwitchTempValue(
+        on=(fields[STATE] == 1), temperature=fields[TEMP_OUT] / 100
+    )
+    return ha_value, SWITCH_WITH_TEMP_SET[ha_value.on]
+
+
+def _encode_switch_temp(ha_value: Any, last_value: Any) -> tuple[Any, Any, Any]:
+    return None, SWITCH_WITH_TEMP_SET.get(ha_value.on), ha_value
+
+
+def _build_temperature_sensor(fields: dict[str, int]) -> tuple[Any, Any]:
+    ha_value = TemperatureSensorValue(
+        temp_in=fields[TEMP_IN] / 100,
+        temp_out=fields[TEMP_OUT] / 100,
+        battery=100 if fields[BATTERY] == 0 else 0,
+    )
+    return ha_value, None
+
+
+__RFTC_10_G_LOW_BATTERY = int(SENSOR_RFTC_10_G_LOW_BATTERY, 16)
+
+
+def _build_thermo_sensor(fields: dict[str, int]) -> tuple[Any, Any]:
+    ha_value = ThermoSensorValue(
+        temperature=fields[TEMPERATURE] * 0.5,
+        battery=0 if fields[BATTERY] == __RFTC_10_G_LOW_BATTERY else 100,
+    )
+    return ha_value, None
+
+
+def _dimmer_set_value(payload: bytes) -> str:
+    trimmed_data = _hex_field(
+        payload, DEVICE_TYPE_05_DATA[Element.RFDAC_71B.value], " "
+    )
+    return f"{ANALOG_REGULATOR_SET_BYTES[Element.RFDAC_71B.value]} {trimmed_data}"
+
+
+# (status, set, HA value) of every brightness step of the slider
+__DIMMER_ENCODED = {
+    brightness: (
+        __DIMMER_PAYLOADS[round(brightness, -1)],
+        _dimmer_set_value(__DIMMER_PAYLOADS[round(brightness, -1)]),
+        round(brightness, -1),
+    )
+    for brightness in range(101)
+}
+
+
+def _decode_dimmer(payload: bytes, last_value: Any) -> tuple[Any, Any]:
+    return __DIMMER_VALUES[payload], _dimmer_set_value(payload)
+
+
+def _encode_dimmer(ha_value: Any, last_value: Any) -> tuple[Any, Any, Any]:
+    encoded = __DIMMER_ENCODED.get(ha_value)
+    if encoded is None:
+        payload = _find_key_by_value(__DIMMER_PAYLOADS, round(ha_value, -1), last_value)
+        encoded = __DIMMER_ENCODED[__DIMMER_VALUES[payload]]
+
+    return encoded
+
+
+def _decode_shutter(payload: bytes, last_value: Any) -> tuple[Any, Any]:
+    ha_val = __SHUTTER_STATES.get(payload)
+    ha_value = ha_val if ha_val is not None else last_value
+    return ha_value, SHUTTER_SET[ha_value]
+
+
+def _encode_shutter(ha_value: Any, last_value: Any) -> tuple[Any, Any, Any]:
+    payload = _find_key_by_value(__SHUTTER_PAYLOADS, ha_value, last_value)
+    # speical behavior. We need to find right HA state for the cover
+    prev_val = __SHUTTER_STATES.get(payload)
+    ha_val = ha_value if ha_value in SHUTTER_STATE_LIST else prev_val
+    return payload, SHUTTER_SET.get(ha_value), ha_val
+
+
+def _build_valve(fields: dict[str, int]) -> tuple[Any, Any]:
+    ha_value = ValveValue(
+        battery=fields[BATTERY],
+        current=fields[CURRENT_TEMP] * 0.5,
+        required=fields[REQUIRED_TEMP] * 0.5,
+        open_in_percentage=fields[OPEN_IN_PERCENTAGE] * 0.5,
+    )
+    return ha_value, None
+
+
+def _encode_valve(ha_value: Any, last_value: Any) -> tuple[Any, Any, Any]:
+    required_temp = int(round(ha_value.required * 2, 0))
+    return None, f"00 {required_temp:x} 00".upper(), ha_value
+
+
+__BUTTON_NUMBER = {int(key, 16): number for key, number in BUTTON_NUMBER.items()}
+
+
+def _build_button(fields: dict[str, int]) -> tuple[Any, Any]:
+    state_bin_str = f"{fields[STATE]:0>8b}"
+    ha_value = ButtonValue(
+        number=__BUTTON_NUMBER.get(fields[IDENTITY]),
+        battery=100 if state_bin_str[4] == "0" else 0,
+        pressing=state_bin_str[3] == "1",
+        changed=state_bin_str[2] == "1",
+        amount=BUTTON_DEVICE_AMOUNT.get(Element.RFGB_40.value),
+    )
+    return ha_value, None
+
+
+register_codec(Element.RFSC_61, Codec(_decode_switch, _encode_switch, cacheable=True))
+register_codec(
+    Element.RFSTI_11B,
+    Codec(layout_decoder(DEVICE_TYPE_07_DATA, _build_switch_temp), _encode_switch_temp),
+)
+register_codec(
+    Element.RFTI_10B,
+    Codec(layout_decoder(DEVICE_TYPE_10_DATA, _build_temperature_sensor)),
+)
+register_codec(
+    Element.RFTC_10_G,
+    Codec(layout_decoder(DEVICE_TYPE_12_DATA, _build_thermo_sensor)),
+)
+register_codec(Element.RFDAC_71B, Codec(_decode_dimmer, _encode_dimmer, cacheable=True))
+register_codec(Element.RFJA_12, Codec(_decode_shutter, _encode_shutter, cacheable=True))
+register_codec(
+    Element.RFATV_2,
+    Codec(layout_decoder(CLIMATE_TYPE_09_DATA, _build_valve), _encode_valve),
+)
+register_codec(
+    Element.RFGB_40, Codec(layout_decoder(BUTTON_TYPE_19_DATA, _build_button))
+)
+
+
+def register_element(
+    device_type: str, platform: Platform, element: Any, codec: Codec
+) -> None:
+    """Register new kind of device, its topics are discovered and
+    payloads converted with the codec
+
+    Args:
+        device_type (str): device type fragment of the topic
+        platform (Platform): HA platform of the device
+        element (Any): identification of the device, used as inels_type
+        codec (Codec): decode and encode callables
+    """
+    DEVICE_TYPE_DICT[device_type] = platform
+    INELS_DEVICE_TYPE_DICT[device_type] = element
+    register_codec(element, codec)
+
+    # parsed topics keep resolved platform and element
+    parse_topic.cache_clear()
+
+
 class DeviceValue(object):
-    """Device value interpretation object."""
+    """Device value interpretation object.
+
+    Conversion is done by the codec registered for the inels type,
+    unknown types keep the inels value as HA value. Codecs read
+    the bytes payload from broker, text of the inels value is created
+    only when it is asked for. Status payload is decoded first time
+    the ha_value or inels_set_value is read, so messages nobody looks
+    at cost nothing.
+    """
 
     def __init__(
         self,
         device_type: Platform,
         inels_type: str,
-        inels_value: str = None,
+        inels_value: GetMessageType = None,
         ha_value: Any = None,
         last_value: Any = None,
     ) -> None:
-        """initializing device info."""
+        """initializing device info.
+
+        Args:
+            inels_value (str | bytes): payload of the status topic
+        """
         self.__inels_status_value = inels_value
         self.__inels_set_value: Any = None
         self.__ha_value = ha_value
         self.__device_type = device_type
         self.__inels_type = inels_type
         self.__last_value = last_value
+        # codec of the payload which is not decoded yet
+        self.__codec: Optional[Codec] = None
+
+        codec = get_codec(inels_type)
 
         if self.__ha_value is None:
-            self.__find_ha_value()
-
-        if self.__inels_status_value is None:
-            self.__find_inels_value()
-
-    def __find_ha_value(self) -> None:
-        """Find and crete device value object."""
-        if self.__device_type is Platform.SWITCH:
-            if self.__inels_type is Element.RFSTI_11B:
-                state = int(
-                    self.__trim_inels_status_values(DEVICE_TYPE_07_DATA, STATE, ""), 16
-                )
-
-                temp = (
-                    int(
-                        self.__trim_inels_status_values(
-                            DEVICE_TYPE_07_DATA, TEMP_OUT, ""
-                        ),
-                        16,
-                    )
-                    / 100
-                )
-
-                self.__ha_value = new_object(on=(state == 1), temperature=temp)
-                self.__inels_set_value = SWITCH_WITH_TEMP_SET[self.__ha_value.on]
-            else:
-                self.__ha_value = new_object(on=SWITCH_STATE[self.__inels_status_value])
-                self.__inels_set_value = SWITCH_SET[self.__ha_value.on]
-        elif self.__device_type is Platform.SENSOR:
-            if self.__inels_type is Element.RFTI_10B:
-                hex_temp_in = self.__trim_inels_status_values(
-                    DEVICE_TYPE_10_DATA, TEMP_IN, ""
-                )
-                hex_temp_out = self.__trim_inels_status_values(
-                    DEVICE_TYPE_10_DATA, TEMP_OUT, ""
-                )
-                hex_battery = self.__trim_inels_status_values(
-                    DEVICE_TYPE_10_DATA, BATTERY, ""
-                )
-
-                temp_in = int(hex_temp_in, 16) / 100
-                temp_out = int(hex_temp_out, 16) / 100
-                battery_level = 100 if int(hex_battery, 16) == 0 else 0
-
-                self.__ha_value = new_object(
-                    temp_in=temp_in,
-                    temp_out=temp_out,
-                    battery=battery_level,
-                )
-            elif self.__inels_type is Element.RFTC_10_G:
-                hex_temp = self.__trim_inels_status_values(
-                    DEVICE_TYPE_12_DATA, TEMPERATURE, ""
-                )
-                hex_battery = self.__trim_inels_status_values(
-                    DEVICE_TYPE_12_DATA, BATTERY, ""
-                )
-
-                temperature = int(hex_temp, 16) * 0.5
-                battery_level = (
-                    0 if hex_battery == SENSOR_RFTC_10_G_LOW_BATTERY else 100
-                )
-
-                self.__ha_value = new_object(
-                    temperature=temperature,
-                    battery=battery_level,
-                )
-            else:
-                self.__ha_value = self.__inels_status_value
-        elif self.__device_type is Platform.LIGHT:
-            if self.__inels_type is Element.RFDAC_71B:
-                self.__ha_value = DEVICE_TYPE_05_HEX_VALUES[self.__inels_status_value]
-
-                trimmed_data = self.__trim_inels_status_values(
-                    DEVICE_TYPE_05_DATA, Element.RFDAC_71B.value, " "
-                )
-                self.__inels_set_value = f"{ANALOG_REGULATOR_SET_BYTES[Element.RFDAC_71B.value]} {trimmed_data}"  # noqa: E501
+            if codec is None:
+                self.__ha_value = self.inels_status_value
+            elif inels_value is not None:
+                self.__codec = codec
+                return
             else:
-                self.__ha_value = self.__inels_status_value
-        elif self.__device_type is Platform.COVER:
-            ha_val = SHUTTER_STATES.get(self.__inels_status_value)
-
-            self.__ha_value = ha_val if ha_val is not None else self.__last_value
-            self.__inels_set_value = SHUTTER_SET[self.__ha_value]
-        elif self.__device_type is Platform.CLIMATE:
-            if self.__inels_type is Element.RFATV_2:
-                temp_current_hex = self.__trim_inels_status_values(
-                    CLIMATE_TYPE_09_DATA, CURRENT_TEMP, ""
-                )
-                temp_current = int(temp_current_hex, 16) * 0.5
-                temp_required_hex = self.__trim_inels_status_values(
-                    CLIMATE_TYPE_09_DATA, REQUIRED_TEMP, ""
-                )
-                temp_required = int(temp_required_hex, 16) * 0.5
-                battery_hex = self.__trim_inels_status_values(
-                    CLIMATE_TYPE_09_DATA, BATTERY, ""
-                )
-                open_to_hex = self.__trim_inels_status_values(
-                    CLIMATE_TYPE_09_DATA, OPEN_IN_PERCENTAGE, ""
-                )
-                open_to_percentage = int(open_to_hex, 16) * 0.5
-                batter = int(battery_hex, 16)
-                self.__ha_value = new_object(
-                    battery=batter,
-                    current=temp_current,
-                    required=temp_required,
-                    open_in_percentage=open_to_percentage,
-                )
-            else:
-                self.__ha_value = self.__inels_status_value
-        elif self.__device_type is Platform.BUTTON:
-            if self.__inels_type is Element.RFGB_40:
-                state = self.__trim_inels_status_values(BUTTON_TYPE_19_DATA, STATE, "")
-                state_hex_str = f"0x{state}"
-                state_bin_str = f"{int(state_hex_str, 16):0>8b}"
-
-                identity = self.__trim_inels_status_values(
-                    BUTTON_TYPE_19_DATA, IDENTITY, ""
-                )
-
-                self.__ha_value = new_object(
-                    number=BUTTON_NUMBER.get(identity),
-                    battery=100 if state_bin_str[4] == "0" else 0,
-                    pressing=state_bin_str[3] == "1",
-                    changed=state_bin_str[2] == "1",
-                    amount=BUTTON_DEVICE_AMOUNT.get(self.__inels_type),
-                )
-
-    def __trim_inels_status_values(
-        self, selector: dict[str, Any], fragment: str, jointer: str
-    ) -> str:
-        """Trim inels status from broker into the pure string."""
-        data = self.__inels_status_value.split("\n")[:-1]
-
-        selected = itemgetter(*selector[fragment])(data)
-        return jointer.join(selected)
-
-    def __find_inels_value(self) -> None:
-        """Find inels mqtt value for specific device."""
-        if self.__device_type is Platform.SWITCH:
-            if self.__inels_type == Element.RFSTI_11B:
-                self.__inels_set_value = SWITCH_WITH_TEMP_SET.get(self.__ha_value.on)
-            else:
-                self.__inels_set_value = SWITCH_SET.get(self.__ha_value.on)
-        elif self.__device_type is Platform.LIGHT:
-            if self.__inels_type is Element.RFDAC_71B:
-                self.__inels_status_value = self.__find_keys_by_value(
-                    DEVICE_TYPE_05_HEX_VALUES,
-                    round(self.__ha_value, -1),
-                    self.__last_value,
-                )
-                trimmed_data = self.__trim_inels_status_values(
-                    DEVICE_TYPE_05_DATA, Element.RFDAC_71B.value, " "
-                )
-                self.__inels_set_value = f"{ANALOG_REGULATOR_SET_BYTES[Element.RFDAC_71B.value]} {trimmed_data}"  # noqa: E501
-                self.__ha_value = DEVICE_TYPE_05_HEX_VALUES[self.__inels_status_value]
-        elif self.__device_type is Platform.COVER:
-            if self.__inels_type is Element.RFJA_12:
-                self.__inels_status_value = self.__find_keys_by_value(
-                    SHUTTER_STATES, self.__ha_value, self.__last_value
-                )
-                self.__inels_set_value = SHUTTER_SET.get(self.__ha_value)
-                # speical behavior. We need to find right HA state for the cover
-                prev_val = SHUTTER_STATES.get(self.__inels_status_value)
-                ha_val = (
-                    self.__ha_value
-                    if self.__ha_value in SHUTTER_STATE_LIST
-                    else prev_val
-                )
-                self.__ha_value = ha_val
-        elif self.__device_type is Platform.CLIMATE:
-            if self.__inels_type is Element.RFATV_2:
-                required_temp = int(round(self.__ha_value.required * 2, 0))
-                self.__inels_set_value = f"00 {required_temp:x} 00".upper()
-        elif self.__device_type is Platform.BUTTON:
-            self.__ha_value = ha_val
-
-    def __find_keys_by_value(self, array: dict, value, last_value) -> Any:
-        """Return key from dict by value
-
-        Args:
-            array (dict): dictionary where should I have to search
-            value Any: by this value I'm goning to find key
-        Returns:
-            Any: value of the dict key
-        """
-        keys = list(array.keys())
-        vals = list(array.values())
-        try:
-            index = vals.index(value)
-            return keys[index]
-        except ValueError as err:
-            index = vals.index(last_value)
-            _LOGGER.warning(
-                "Value %s is not in list of %s. Stack %s", value, array, err
-            )
-
-        return keys[index]
+                self.__codec = codec
+                self.__decode()
+
+        if (
+            self.__inels_status_value is None
+            and codec is not None
+            and codec.encode is not None
+        ):
+            (
+                self.__inels_status_value,
+                self.__inels_set_value,
+                self.__ha_value,
+            ) = codec.encode(self.__ha_value, last_value)
+
+    def __decode(self) -> None:
+        """Decode status payload into ha_value and inels_set_value."""
+        codec = self.__codec
+        if codec is None:
+            # decoded meanwhile by other thread
+            return
+
+        payload = self.__inels_status_value
+
+        self.__ha_value, self.__inels_set_value = codec.decode(
+            payload.encode() if isinstance(payload, str) else payload,
+            self.__last_value,
+        )
+        # cached values are shared between threads, mark the payload
+        # as decoded only after both values are set
+        self.__codec = None
 
     @property
     def ha_value(self) -> Any:
@@ -271,6 +496,9 @@ class DeviceValue(object):
         Returns:
             Any: object to corespond to HA device
         """
+        if self.__codec is not None:
+            self.__decode()
+
         return self.__ha_value
 
     @property
@@ -280,6 +508,9 @@ class DeviceValue(object):
         Returns:
             str: quated string from mqtt broker
         """
+        if isinstance(self.__inels_status_value, (bytes, bytearray)):
+            self.__inels_status_value = self.__inels_status_value.decode()
+
         return self.__inels_status_value
 
     @property
@@ -289,13 +520,45 @@ class DeviceValue(object):
         Returns:
             str: this is string format value for mqtt broker
         """
+        if self.__codec is not None:
+            self.__decode()
+
         return self.__inels_set_value
 
 
+def create_value(
+    device_type: Platform, inels_type: Any, inels_value: GetMessageType
+) -> DeviceValue:
+    """Decode status payload. Values of cacheable elements are shared
+    between all messages with the same payload, they must not be modified.
+
+    Args:
+        device_type (Platform): platform of the device
+        inels_type (Any): element of the device
+        inels_value (str | bytes): payload of the status topic
+
+    Returns:
+        DeviceValue: decoded value
+    """
+    codec = get_codec(inels_type)
+
+    if codec is None or codec.cache is None or not isinstance(inels_value, bytes):
+        return DeviceValue(device_type, inels_type, inels_value=inels_value)
+
+    return codec.cache.get(
+        inels_value, DeviceValue, device_type, inels_type, inels_value
+    )
+
+
+def value_cache_info() -> CacheInfo:
+    """Hits, misses and evictions of the decoded value cache."""
+    return cache_info()
+
+
 def get_value(status: GetMessageType, platform: str) -> Any:
     """Get value from pyload message."""
     if platform == Platform.SWITCH:
-        return SWITCH_STATE[status]
+        return SWITCH_STATE[status.decode() if isinstance(status, bytes) else status]
 
     return None
 
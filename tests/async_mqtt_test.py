@@ -0,0 +1,237 @@
+"""Unit tests for AsyncInelsMqtt class
+    handling mqtt broker communication in asyncio.
+"""
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from paho.mqtt.client import MQTTMessageInfo, MQTT_ERR_SUCCESS
+
+from inelsmqtt.async_mqtt import AsyncInelsMqtt
+from inelsmqtt.const import MQTT_CONNECTED_TOPIC, MQTT_TIMEOUT, SWITCH_ON_SET
+from inelsmqtt.devices.switch import Switch
+
+from tests.const import (
+    TEST_INELS_MQTT_NAMESPACE,
+    TEST_AVAILABILITY_ON,
+    TEST_SWITCH_TOPIC_STATE,
+    TEST_SWITCH_TOPIC_SET,
+    TEST_SWITICH_TOPIC_CONNECTED,
+    TEST_SENSOR_TOPIC_CONNECTED,
+)
+from tests.devices.setup_test import DeviceSetup
+
+
+class AsyncInelsMqttTest(IsolatedAsyncioTestCase):
+    """Testing class for AsyncInelsMqtt."""
+
+    def setUp(self) -> None:
+        """Setup paho client mock and instance for testing."""
+        self.patch = patch(f"{TEST_INELS_MQTT_NAMESPACE}.mqtt.Client")
+        self.patch.start()
+
+        self.mqtt = AsyncInelsMqtt({**DeviceSetup.config, MQTT_TIMEOUT: 0.2})
+        self.mqtt.client.connect.side_effect = self.connack
+
+    def tearDown(self) -> None:
+        """Stop patches."""
+        self.patch.stop()
+
+    def connack(self, *args) -> None:
+        """Broker accepts connection."""
+        asyncio.get_running_loop().call_soon(
+            self.mqtt._AsyncInelsMqtt__on_connect,  # pylint: disable=protected-access
+            Mock(),
+            Mock(),
+            Mock(),
+            0,
+        )
+
+    def message(self, topic: str, payload: bytes) -> None:
+        """Broker sends message."""
+        msg = type("msg", (object,), {"topic": topic, "payload": payload})
+        asyncio.get_running_loop().call_soon(
+            self.mqtt._AsyncInelsMqtt__on_message,  # pylint: disable=protected-access
+            Mock(),
+            Mock(),
+            msg,
+        )
+
+    @staticmethod
+    def message_info(mid: int) -> MQTTMessageInfo:
+        """Paho result of the publish call."""
+        info = MQTTMessageInfo(mid)
+        info.rc = MQTT_ERR_SUCCESS
+        return info
+
+    async def test_connect(self) -> None:
+        """Test connect waits for CONNACK."""
+        self.assertTrue(await self.mqtt.connect())
+        self.assertTrue(self.mqtt.is_available)
+
+        # already connected
+        self.assertTrue(await self.mqtt.connect())
+        self.mqtt.client.connect.assert_called_once()
+
+    async def test_connect_refused(self) -> None:
+        """Test failed connect is tried again by the next call."""
+        self.mqtt.client.connect.side_effect = ConnectionRefusedError("refused")
+
+        self.assertFalse(await self.mqtt.connect())
+        self.assertIsNotNone(
+            self.mqtt._AsyncInelsMqtt__misc_task  # pylint: disable=protected-access
+        )
+
+        self.mqtt.client.connect.side_effect = self.connack
+        self.assertTrue(await self.mqtt.connect())
+        self.assertEqual(self.mqtt.client.connect.call_count, 2)
+        self.mqtt.disconnect()
+
+    async def test_subscriptions_restored_after_reconnect(self) -> None:
+        """Test topics are subscribed again when the broker lost the session."""
+        on_connect = (
+            self.mqtt._AsyncInelsMqtt__on_connect
+        )  # pylint: disable=protected-access
+        topics = [TEST_SWITICH_TOPIC_CONNECTED, TEST_SENSOR_TOPIC_CONNECTED]
+
+        await self.mqtt.subscribe_many(topics, wait=False)
+        await self.mqtt.subscribe_availability(wait=False)
+        self.mqtt.client.subscribe.reset_mock()
+
+        on_connect(Mock(), None, {"session present": 1}, 0)
+        self.mqtt.client.subscribe.assert_not_called()
+
+        on_connect(Mock(), None, {"session present": 0}, 0)
+        self.mqtt.client.subscribe.assert_called_once_with(
+            [(topic, 0) for topic in topics] + [(MQTT_CONNECTED_TOPIC, 0)]
+        )
+        self.assertTrue(self.mqtt.is_subscribed(TEST_SWITICH_TOPIC_CONNECTED))
+        self.mqtt.disconnect()
+
+    async def test_publish_pipelined(self) -> None:
+        """Test publishes in flight at once are acknowledged by message id."""
+        loop = asyncio.get_running_loop()
+        mqtt = self.mqtt
+        on_publish = (
+            mqtt._AsyncInelsMqtt__on_publish
+        )  # pylint: disable=protected-access
+        infos = iter([self.message_info(1), self.message_info(2)])
+
+        def publish(*args) -> MQTTMessageInfo:
+            """Broker acknowledges second message before the first one."""
+            info = next(infos)
+            loop.call_later(
+                0.03 - info.mid * 0.01, on_publish, Mock(), Mock(), info.mid
+            )
+            return info
+
+        self.mqtt.client.publish.side_effect = publish
+
+        results = await asyncio.gather(
+            self.mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"),
+            self.mqtt.publish(TEST_SWITCH_TOPIC_SET, "02\n00\n00\n"),
+        )
+
+        self.assertEqual(results, [True, True])
+
+    async def test_publish_without_acknowledge(self) -> None:
+        """Test publish returns False when no acknowledge comes in time."""
+        self.mqtt.client.publish.return_value = self.message_info(1)
+
+        self.assertFalse(await self.mqtt.publish(TEST_SWITCH_TOPIC_SET, "01"))
+
+    async def test_subscribe_many(self) -> None:
+        """Test topics are subscribed at once and their payloads returned."""
+        topics = [TEST_SWITICH_TOPIC_CONNECTED, TEST_SENSOR_TOPIC_CONNECTED]
+
+        def retained(*args, **kwargs) -> None:
+            """Broker sends retained messages."""
+            for topic in topics:
+                self.message(topic, TEST_AVAILABILITY_ON)
+
+        self.mqtt.client.subscribe.side_effect = retained
+
+        payloads = await self.mqtt.subscribe_many(topics)
+
+        self.mqtt.client.subscribe.assert_called_once()
+        self.assertDictEqual(
+            payloads, {topic: TEST_AVAILABILITY_ON for topic in topics}
+        )
+        self.assertTrue(self.mqtt.is_subscribed(TEST_SENSOR_TOPIC_CONNECTED))
+
+    async def test_subscribe_forgets_waiters(self) -> None:
+        """Test waiters which timed out or were cancelled are removed."""
+        waiters = (
+            self.mqtt._AsyncInelsMqtt__payload_waiters
+        )  # pylint: disable=protected-access
+
+        payloads = await self.mqtt.subscribe_many([TEST_SWITICH_TOPIC_CONNECTED])
+        self.assertDictEqual(payloads, {TEST_SWITICH_TOPIC_CONNECTED: None})
+        self.assertDictEqual(waiters, {})
+
+        task = asyncio.ensure_future(
+            self.mqtt.subscribe_many([TEST_SENSOR_TOPIC_CONNECTED])
+        )
+        await asyncio.sleep(0.05)
+        self.assertIn(TEST_SENSOR_TOPIC_CONNECTED, waiters)
+
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertDictEqual(waiters, {})
+
+    async def test_discovery_all(self) -> None:
+        """Test discovery collects inels status topics."""
+
+        def retained(*args, **kwargs) -> None:
+            """Broker sends retained messages."""
+            on_discover = (
+                self.mqtt._AsyncInelsMqtt__on_discover  # pylint: disable=protected-access
+            )
+            for topic in [TEST_SWITCH_TOPIC_STATE, TEST_SWITICH_TOPIC_CONNECTED]:
+                msg = type("msg", (object,), {"topic": topic, "payload": b"02\n01\n"})
+                asyncio.get_running_loop().call_soon(on_discover, Mock(), Mock(), msg)
+
+        self.mqtt.client.subscribe.side_effect = retained
+
+        devices = await self.mqtt.discovery_all()
+
+        self.assertEqual(list(devices), [TEST_SWITCH_TOPIC_STATE])
+        self.assertEqual(self.mqtt.messages()[TEST_SWITCH_TOPIC_STATE], b"02\n01\n")
+
+    async def test_device_async_set_ha_value(self) -> None:
+        """Test device created and driven with asyncio client."""
+        with patch.object(
+            self.mqtt, "subscribe_availability", AsyncMock(return_value={})
+        ) as mock_subscribe_availability, patch.object(
+            self.mqtt, "publish", AsyncMock(return_value=True)
+        ) as mock_publish, patch.object(
+            self.mqtt, "is_subscribed", return_value=True
+        ):
+            switch = await Switch.async_create(self.mqtt, TEST_SWITCH_TOPIC_STATE)
+
+            self.assertIsInstance(switch, Switch)
+            mock_subscribe_availability.assert_awaited_once_with(
+                [TEST_SWITICH_TOPIC_CONNECTED]
+            )
+
+            self.assertTrue(await switch.async_set_ha_value(True))
+            mock_publish.assert_awaited_once_with(TEST_SWITCH_TOPIC_SET, SWITCH_ON_SET)
+            self.assertTrue(switch.state.on)
+
+    async def test_device_sync_paths_rejected(self) -> None:
+        """Test sync device calls fail instead of leaving coroutines
+        never awaited."""
+        with self.assertRaises(TypeError):
+            Switch(self.mqtt, TEST_SWITCH_TOPIC_STATE)
+
+        with patch.object(
+            self.mqtt, "publish", AsyncMock(return_value=True)
+        ) as mock_publish, patch.object(self.mqtt, "is_subscribed", return_value=True):
+            switch = Switch(self.mqtt, TEST_SWITCH_TOPIC_STATE)
+
+            with self.assertRaises(TypeError):
+                switch.set_ha_value(True)
+
+        mock_publish.assert_not_called()
+        self.assertIsNone(switch.values)
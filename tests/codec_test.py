@@ -0,0 +1,100 @@
+"""Unit tests for registry of payload conversions."""
+from typing import Any
+from unittest import TestCase
+
+from inelsmqtt.codec import (
+    Codec,
+    ValueCache,
+    compile_field,
+    get_codec,
+    layout_decoder,
+)
+from inelsmqtt.const import (
+    DEVICE_TYPE_DICT,
+    INELS_DEVICE_TYPE_DICT,
+    TEMPERATURE,
+    Element,
+    Platform,
+)
+from inelsmqtt.util import DeviceValue, parse_topic, register_element
+
+from tests.const import FRAGMENT_TOPIC_CU_ID
+
+CUSTOM_DEVICE_TYPE = "F0"
+CUSTOM_ELEMENT = "RFTC-CUSTOM"
+
+
+def build_custom(fields: dict[str, int]) -> tuple[Any, Any]:
+    """Custom sensor value with temperature only."""
+    return fields[TEMPERATURE] / 10, None
+
+
+class CodecTest(TestCase):
+    """Testing codec registry."""
+
+    def tearDown(self) -> None:
+        """Forget custom element."""
+        DEVICE_TYPE_DICT.pop(CUSTOM_DEVICE_TYPE, None)
+        INELS_DEVICE_TYPE_DICT.pop(CUSTOM_DEVICE_TYPE, None)
+        parse_topic.cache_clear()
+
+    def test_compile_field(self) -> None:
+        """Test numbers are read from bytes most significant first."""
+        data = bytes.fromhex("07\n01\n92\n09\n")
+
+        self.assertEqual(compile_field([1])(data), 0x01)
+        self.assertEqual(compile_field([3, 2])(data), 0x0992)
+        self.assertEqual(compile_field([0, 1, 2])(data), 0x070192)
+
+    def test_builtin_elements_registered(self) -> None:
+        """Test every known element has its codec."""
+        for element in INELS_DEVICE_TYPE_DICT.values():
+            self.assertIsNotNone(get_codec(element), element)
+
+        self.assertIsNotNone(get_codec(Element.RFATV_2).encode)
+
+    def test_register_element(self) -> None:
+        """Test third party element is discovered and decoded."""
+        topic = f"inels/status/{FRAGMENT_TOPIC_CU_ID}/{CUSTOM_DEVICE_TYPE}/0001"
+        self.assertIsNone(parse_topic(topic).platform)
+
+        register_element(
+            CUSTOM_DEVICE_TYPE,
+            Platform.SENSOR,
+            CUSTOM_ELEMENT,
+            Codec(layout_decoder({TEMPERATURE: [1, 0]}, build_custom)),
+        )
+
+        parsed = parse_topic(topic)
+        self.assertEqual(parsed.platform, Platform.SENSOR)
+        self.assertEqual(parsed.element, CUSTOM_ELEMENT)
+
+        value = DeviceValue(parsed.platform, parsed.element, inels_value="FA\n00\n")
+        self.assertEqual(value.ha_value, 25.0)
+
+
+class ValueCacheTest(TestCase):
+    """Testing cache of decoded values."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test the oldest value is dropped and statistics are counted."""
+        cache = ValueCache(2)
+
+        first = cache.get(b"01", bytes, b"01")
+        cache.get(b"02", bytes, b"02")
+        self.assertIs(cache.get(b"01", bytes, b"x"), first)
+        cache.get(b"03", bytes, b"03")
+
+        info = cache.info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 3)
+        self.assertEqual(info.evictions, 1)
+        self.assertEqual(info.size, 2)
+        self.assertEqual(info.hit_rate, 0.25)
+        # b"02" was least recently used
+        self.assertEqual(cache.get(b"02", bytes, b"new"), b"new")
+
+    def test_cache_of_cacheable_codec_only(self) -> None:
+        """Test only cacheable codecs own the cache."""
+        self.assertIsNotNone(get_codec(Element.RFSC_61).cache)
+        self.assertIsNone(get_codec(Element.RFATV_2).cache)
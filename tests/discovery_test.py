@@ -1,15 +1,32 @@
 """Unit test for Discovery class
     handling device discovering
 """
-from unittest.mock import patch
+import os
+import tempfile
+import time
+from unittest.mock import Mock, patch
 from unittest import TestCase
 
+from inelsmqtt.const import (
+    MQTT_DISCOVER_TOPIC,
+    MQTT_DISCOVERY_MIN_QUIET,
+    MQTT_TIMEOUT,
+    DiscoveryEventType,
+)
 from inelsmqtt.discovery import InelsDiscovery
 from inelsmqtt import InelsMqtt
 
 from tests.const import (
+    TEST_AVAILABILITY_ON,
     TEST_INELS_MQTT_CLASS_NAMESPACE,
+    TEST_LIGHT_DIMMABLE_TOPIC_STATE,
+    TEST_AVAILABILITY_OFF,
+    TEST_LIGH_STATE_INELS_VALUE,
+    TEST_SENSOR_TOPIC_CONNECTED,
+    TEST_SENSOR_TOPIC_STATE,
     TEST_SWITCH_TOPIC_STATE,
+    TEST_SWITICH_TOPIC_CONNECTED,
+    TEST_TEMPERATURE_DATA,
 )
 from tests.devices.setup_test import DeviceSetup
 
@@ -30,10 +47,14 @@ class DiscoveryTest(DeviceSetup, TestCase):
 
         self.i_dis = InelsDiscovery(mqtt)
 
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.snapshot = os.path.join(self.tmp_dir.name, "snapshot.json")
+
     def tearDown(self) -> None:
         """Destroy all instances and stop patches"""
         self.patches = None
         self.i_dis = None
+        self.tmp_dir.cleanup()
 
     def test_init_discovery(self) -> None:
         """Initialize test instance of the InelsDiscovery"""
@@ -41,11 +62,12 @@ class DiscoveryTest(DeviceSetup, TestCase):
         self.assertIsInstance(self.i_dis.devices, list)
         self.assertEqual(len(self.i_dis.devices), 0)
 
+    @patch(f"{TEST_INELS_MQTT_CLASS_NAMESPACE}.subscribe_availability", return_value={})
     @patch(
         f"{TEST_INELS_MQTT_CLASS_NAMESPACE}.discovery_all",
         return_value={TEST_SWITCH_TOPIC_STATE: "data"},
     )
-    def test_discovery(self, mock_discovery_all) -> None:
+    def test_discovery(self, mock_discovery_all, mock_subscribe_availability) -> None:
         """Test get list of devices"""
 
         coordinators_with_devices = self.i_dis.discovery()
@@ -58,3 +80,264 @@ class DiscoveryTest(DeviceSetup, TestCase):
 
         mock_discovery_all.assert_called()
         mock_discovery_all.assert_called_once()
+
+        # availability of all devices subscribed with one call
+        mock_subscribe_availability.assert_called_once_with(
+            [TEST_SWITICH_TOPIC_CONNECTED]
+        )
+
+    def create_mqtt(self, config: dict = None) -> InelsMqtt:
+        """Mqtt instance keeping its own messages, even when other tests
+        left messages patched."""
+        mqtt = InelsMqtt({**self.config, **(config or {})})
+        patcher = patch.object(
+            mqtt,
+            "messages",
+            lambda: mqtt._InelsMqtt__messages,  # pylint: disable=protected-access
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        return mqtt
+
+    def save_snapshot(self) -> None:
+        """Discover switch and sensor and save them into the snapshot."""
+        devs = {
+            TEST_SWITCH_TOPIC_STATE: b"02\n01\n",
+            TEST_SENSOR_TOPIC_STATE: TEST_TEMPERATURE_DATA,
+        }
+        mqtt = self.create_mqtt()
+        mqtt.restore_messages(
+            {**devs, TEST_SWITICH_TOPIC_CONNECTED: TEST_AVAILABILITY_ON.encode()}
+        )
+
+        with patch.object(mqtt, "discovery_all", return_value=devs), patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ):
+            discovery = InelsDiscovery(mqtt)
+            discovery.discovery()
+            discovery.save_snapshot(self.snapshot)
+
+    def test_load_snapshot(self) -> None:
+        """Test devices are created from snapshot without discovery."""
+        self.save_snapshot()
+        mqtt = self.create_mqtt()
+        discovery = InelsDiscovery(mqtt)
+
+        with patch.object(mqtt, "discovery_all") as mock_discovery_all, patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ) as mock_subscribe_availability:
+            devices = discovery.load_snapshot(self.snapshot)
+
+        mock_discovery_all.assert_not_called()
+        mock_subscribe_availability.assert_called_once()
+        self.assertFalse(mock_subscribe_availability.call_args.kwargs["wait"])
+
+        switch = next(d for d in devices if d.state_topic == TEST_SWITCH_TOPIC_STATE)
+        self.assertEqual(len(devices), 2)
+        self.assertTrue(switch.state.on)
+        self.assertTrue(switch.is_available)
+
+    def test_load_missing_snapshot(self) -> None:
+        """Test missing snapshot creates no device."""
+        with patch.object(self.i_dis, "_InelsDiscovery__mqtt"):
+            self.assertListEqual(self.i_dis.load_snapshot(self.snapshot), [])
+
+    def test_reconcile(self) -> None:
+        """Test reconcile reports added, removed and changed devices."""
+        self.save_snapshot()
+        mqtt = self.create_mqtt()
+        discovery = InelsDiscovery(mqtt)
+        listener = Mock()
+        discovery.subscribe_listener(listener)
+
+        with patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ), self.discovered(
+            mqtt,
+            {
+                TEST_SWITCH_TOPIC_STATE: b"02\n00\n",
+                TEST_LIGHT_DIMMABLE_TOPIC_STATE: TEST_LIGH_STATE_INELS_VALUE,
+            },
+        ):
+            discovery.load_snapshot(self.snapshot)
+            events = discovery.reconcile()
+
+        self.assertListEqual(
+            [(event.type, event.device.state_topic) for event in events],
+            [
+                (DiscoveryEventType.CHANGED, TEST_SWITCH_TOPIC_STATE),
+                (DiscoveryEventType.REMOVED, TEST_SENSOR_TOPIC_STATE),
+                (DiscoveryEventType.ADDED, TEST_LIGHT_DIMMABLE_TOPIC_STATE),
+            ],
+        )
+        self.assertEqual(listener.call_count, 3)
+
+        switch = discovery.registry.by_state_topic(TEST_SWITCH_TOPIC_STATE)
+        self.assertFalse(switch.state.on)
+        self.assertEqual(len(discovery.devices), 2)
+        self.assertIsNone(discovery.registry.by_state_topic(TEST_SENSOR_TOPIC_STATE))
+
+    def test_live_discovery(self) -> None:
+        """Test devices are added and removed by messages after discovery."""
+        mqtt = self.create_mqtt()
+        discovery = InelsDiscovery(mqtt)
+        listener = Mock()
+        discovery.subscribe_listener(listener)
+
+        def message(topic: str, payload: bytes) -> None:
+            msg = type("msg", (object,), {"topic": topic, "payload": payload})
+            mqtt._InelsMqtt__on_message(  # pylint: disable=protected-access
+                mqtt, None, msg
+            )
+
+        with patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ), patch.object(
+            mqtt, "discovery_all", return_value={TEST_SWITCH_TOPIC_STATE: b"02\n01\n"}
+        ):
+            discovery.discovery()
+            self.assertTrue(discovery.is_live)
+
+            message(TEST_SENSOR_TOPIC_STATE, TEST_TEMPERATURE_DATA)
+            message(TEST_SENSOR_TOPIC_STATE, TEST_TEMPERATURE_DATA)
+            message(TEST_LIGHT_DIMMABLE_TOPIC_STATE, TEST_LIGH_STATE_INELS_VALUE)
+            message(TEST_SENSOR_TOPIC_CONNECTED, TEST_AVAILABILITY_OFF.encode())
+            message(TEST_SWITCH_TOPIC_STATE, b"")
+
+        self.assertListEqual(
+            [
+                (call.args[0].type, call.args[0].device.state_topic)
+                for call in listener.call_args_list
+            ],
+            [
+                (DiscoveryEventType.ADDED, TEST_SENSOR_TOPIC_STATE),
+                (DiscoveryEventType.ADDED, TEST_LIGHT_DIMMABLE_TOPIC_STATE),
+                (DiscoveryEventType.REMOVED, TEST_SENSOR_TOPIC_STATE),
+                (DiscoveryEventType.REMOVED, TEST_SWITCH_TOPIC_STATE),
+            ],
+        )
+        self.assertEqual(
+            [dev.state_topic for dev in discovery.devices],
+            [TEST_LIGHT_DIMMABLE_TOPIC_STATE],
+        )
+
+        discovery.stop_live()
+        message(TEST_SENSOR_TOPIC_STATE, TEST_TEMPERATURE_DATA)
+        self.assertFalse(discovery.is_live)
+        self.assertEqual(len(discovery.devices), 1)
+
+    @staticmethod
+    def send(mqtt: InelsMqtt, topic: str, payload: bytes) -> None:
+        """Broker sends message to the current callback of the client."""
+        msg = type("msg", (object,), {"topic": topic, "payload": payload})
+        mqtt.client.on_message(mqtt.client, None, msg)
+
+    def retained(self, mqtt: InelsMqtt):
+        """Patch subscribe, broker sends retained status of the switch."""
+
+        def subscribe(topic, *args, **kwargs) -> None:
+            if topic == MQTT_DISCOVER_TOPIC:
+                self.send(mqtt, TEST_SWITCH_TOPIC_STATE, b"02\n01\n")
+
+        return patch.object(mqtt.client, "subscribe", side_effect=subscribe)
+
+    def discovered(self, mqtt: InelsMqtt, devs: dict[str, bytes]):
+        """Patch discovery_all, broker sends status of every device
+        while the topics are collected."""
+
+        def discovery_all() -> dict[str, bytes]:
+            for topic, payload in devs.items():
+                msg = type("msg", (object,), {"topic": topic, "payload": payload})
+                mqtt._InelsMqtt__on_message(  # pylint: disable=protected-access
+                    mqtt.client, None, msg
+                )
+            return devs
+
+        return patch.object(mqtt, "discovery_all", side_effect=discovery_all)
+
+    def test_reconcile_warm_start(self) -> None:
+        """Test changed device after snapshot gets its status only once."""
+        self.save_snapshot()
+        mqtt = self.create_mqtt()
+        discovery = InelsDiscovery(mqtt)
+        listener = Mock()
+
+        with patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ), self.discovered(mqtt, {TEST_SWITCH_TOPIC_STATE: b"02\n00\n"}):
+            discovery.load_snapshot(self.snapshot)
+            switch = discovery.registry.by_state_topic(TEST_SWITCH_TOPIC_STATE)
+            switch.subscribe_listerner("test", listener)
+
+            events = discovery.reconcile()
+
+        self.assertEqual(events[0].type, DiscoveryEventType.CHANGED)
+        listener.assert_called_once_with(b"02\n00\n")
+        self.assertFalse(switch.state.on)
+        self.assertTrue(switch.last_values.ha_value.on)
+
+    def test_second_reconcile(self) -> None:
+        """Test live messages during reconcile do not hide the change."""
+        mqtt = self.create_mqtt()
+        discovery = InelsDiscovery(mqtt)
+
+        with patch.object(mqtt, "subscribe_availability", return_value={}):
+            with self.discovered(mqtt, {TEST_SWITCH_TOPIC_STATE: b"02\n01\n"}):
+                discovery.discovery()
+                self.assertListEqual(discovery.reconcile(), [])
+
+            with self.discovered(mqtt, {TEST_SWITCH_TOPIC_STATE: b"02\n00\n"}):
+                events = discovery.reconcile()
+
+        self.assertListEqual(
+            [(event.type, event.payload) for event in events],
+            [(DiscoveryEventType.CHANGED, b"02\n00\n")],
+        )
+
+    def test_live_message_after_reconcile(self) -> None:
+        """Test devices get live messages after discovery and reconcile."""
+        mqtt = self.create_mqtt({MQTT_TIMEOUT: 1, MQTT_DISCOVERY_MIN_QUIET: 0.05})
+        discovery = InelsDiscovery(mqtt)
+
+        with patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ), self.retained(mqtt):
+            discovery.discovery()
+            discovery.reconcile()
+
+        switch = discovery.registry.by_state_topic(TEST_SWITCH_TOPIC_STATE)
+        self.assertTrue(switch.state.on)
+
+        self.send(mqtt, TEST_SWITCH_TOPIC_STATE, b"02\n00\n")
+
+        self.assertFalse(switch.state.on)
+        self.assertEqual(mqtt.messages()[TEST_SWITCH_TOPIC_STATE], b"02\n00\n")
+
+    def test_live_message_during_reconcile(self) -> None:
+        """Test background reconcile does not hold back live messages."""
+        mqtt = self.create_mqtt({MQTT_TIMEOUT: 2, MQTT_DISCOVERY_MIN_QUIET: 0.3})
+        discovery = InelsDiscovery(mqtt)
+        listener = Mock()
+
+        with patch.object(
+            mqtt, "subscribe_availability", return_value={}
+        ), self.retained(mqtt):
+            discovery.discovery()
+            switch = discovery.registry.by_state_topic(TEST_SWITCH_TOPIC_STATE)
+            switch.subscribe_listerner("test", listener)
+
+            thread = discovery.reconcile_in_background()
+            time.sleep(0.1)
+            self.send(mqtt, TEST_SWITCH_TOPIC_STATE, b"02\n00\n")
+
+            self.assertTrue(thread.is_alive())
+            self.assertFalse(switch.state.on)
+            self.assertEqual(mqtt.messages()[TEST_SWITCH_TOPIC_STATE], b"02\n00\n")
+            listener.assert_called_with(b"02\n00\n")
+
+            thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(switch.state.on)
+        self.assertEqual(discovery.devices, [switch])
@@ -0,0 +1,180 @@
+"""Unit tests for Dispatcher calling listeners in worker threads."""
+import threading
+from unittest import TestCase
+
+from inelsmqtt.const import OverflowPolicy
+from inelsmqtt.dispatcher import Dispatcher
+
+
+class DispatcherTest(TestCase):
+    """Testing class for Dispatcher."""
+
+    def setUp(self) -> None:
+        """Handler holding the first message till the gate is opened."""
+        self.handled = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    def handler(self, topic: str, payload) -> None:
+        """Record message, wait on the gate with the first one."""
+        self.started.set()
+        self.gate.wait(5)
+        self.handled.append((topic, payload))
+
+    def blocked(self, policy: OverflowPolicy) -> Dispatcher:
+        """Dispatcher with one worker holding the first message."""
+        dispatcher = Dispatcher(self.handler, 1, 2, policy)
+        dispatcher.submit("first", 0)
+        self.assertTrue(self.started.wait(5))
+
+        return dispatcher
+
+    def test_order_kept_per_topic(self) -> None:
+        """Test messages of one topic are handled in order of arrival."""
+        self.gate.set()
+        dispatcher = Dispatcher(self.handler, 4, 8, OverflowPolicy.BLOCK)
+        for index in range(200):
+            dispatcher.submit(f"inels/status/{index % 5}", index)
+        dispatcher.stop()
+
+        for topic in {topic for topic, _ in self.handled}:
+            payloads = [payload for name, payload in self.handled if name == topic]
+            self.assertEqual(payloads, sorted(payloads))
+
+        stats = dispatcher.stats()
+        self.assertEqual(stats.dispatched, 200)
+        self.assertEqual(stats.depth, 0)
+        self.assertFalse(dispatcher.is_running)
+
+    def test_drop_oldest(self) -> None:
+        """Test full queue drops its oldest message."""
+        dispatcher = self.blocked(OverflowPolicy.DROP_OLDEST)
+        for topic in ("a", "b", "c"):
+            dispatcher.submit(topic, 1)
+
+        stats = dispatcher.stats()
+        self.assertEqual(stats.depth, 2)
+        self.assertEqual(stats.dropped, 1)
+        self.assertGreater(stats.lag, 0)
+
+        self.gate.set()
+        dispatcher.stop()
+
+        self.assertEqual(self.handled, [("first", 0), ("b", 1), ("c", 1)])
+
+    def test_coalesce(self) -> None:
+        """Test full queue replaces payload of the queued topic."""
+        dispatcher = self.blocked("coalesce")
+        dispatcher.submit("a", 1)
+        dispatcher.submit("b", 1)
+        dispatcher.submit("a", 2)
+
+        self.assertEqual(dispatcher.stats().coalesced, 1)
+
+        self.gate.set()
+        dispatcher.stop()
+
+        self.assertEqual(self.handled, [("first", 0), ("a", 2), ("b", 1)])
+
+    def test_coalesce_always(self) -> None:
+        """Test only the newest queued payload of the topic is handled."""
+        dispatcher = Dispatcher(self.handler, 1, 100, coalesce=True)
+        dispatcher.submit("first", 0)
+        self.assertTrue(self.started.wait(5))
+
+        for payload in range(10):
+            dispatcher.submit("a", payload)
+            dispatcher.submit("b", payload)
+
+        stats = dispatcher.stats()
+        self.assertEqual(stats.depth, 2)
+        self.assertEqual(stats.coalesced, 18)
+
+        self.gate.set()
+        dispatcher.stop()
+
+        self.assertEqual(self.handled, [("first", 0), ("a", 9), ("b", 9)])
+
+    def test_block(self) -> None:
+        """Test full queue makes the caller wait for free place."""
+        dispatcher = self.blocked(OverflowPolicy.BLOCK)
+        dispatcher.submit("a", 1)
+        dispatcher.submit("b", 1)
+
+        caller = threading.Thread(target=dispatcher.submit, args=("c", 1))
+        caller.start()
+        caller.join(0.1)
+        self.assertTrue(caller.is_alive())
+
+        self.gate.set()
+        caller.join(5)
+        dispatcher.stop()
+
+        self.assertEqual([topic for topic, _ in self.handled], ["first", "a", "b", "c"])
+        self.assertEqual(dispatcher.stats().max_depth, 2)
+
+    def test_stop_blocked_caller(self) -> None:
+        """Test caller waiting for free place drops message after stop."""
+        dispatcher = self.blocked(OverflowPolicy.BLOCK)
+        dispatcher.submit("a", 1)
+        dispatcher.submit("b", 1)
+
+        caller = threading.Thread(target=dispatcher.submit, args=("c", 1))
+        caller.start()
+        caller.join(0.1)
+        stopping = threading.Thread(target=dispatcher.stop)
+        stopping.start()
+
+        caller.join(5)
+        self.assertFalse(caller.is_alive())
+        self.gate.set()
+        stopping.join(5)
+
+        self.assertEqual([topic for topic, _ in self.handled], ["first", "a", "b"])
+        self.assertEqual(dispatcher.stats().dropped, 1)
+
+    def test_failing_handler(self) -> None:
+        """Test failing handler does not stop the worker."""
+
+        def handler(topic: str, payload) -> None:
+            if payload == 1:
+                raise ValueError(payload)
+            self.handled.append((topic, payload))
+
+        dispatcher = Dispatcher(handler)
+        with self.assertLogs("inelsmqtt.dispatcher"):
+            dispatcher.submit("a", 1)
+            dispatcher.submit("a", 2)
+            dispatcher.stop()
+
+        self.assertEqual(self.handled, [("a", 2)])
+        self.assertEqual(dispatcher.stats().errors, 1)
+
+    def test_max_depth_of_worker(self) -> None:
+        """Test max depth is the longest queue, not a sum over workers."""
+        dispatcher = Dispatcher(self.handler, 2, 4, OverflowPolicy.DROP_OLDEST)
+        for index in range(20):
+            dispatcher.submit(f"inels/status/{index}", index)
+
+        self.assertEqual(dispatcher.stats().max_depth, 2)
+
+        self.gate.set()
+        dispatcher.stop()
+
+    def test_submit_after_stop(self) -> None:
+        """Test stopped dispatcher drops messages and keeps workers stopped."""
+        self.gate.set()
+        dispatcher = Dispatcher(self.handler)
+        dispatcher.submit("a", 1)
+        dispatcher.stop()
+
+        dispatcher.submit("a", 2)
+
+        self.assertFalse(dispatcher.is_running)
+        self.assertEqual(self.handled, [("a", 1)])
+        self.assertEqual(dispatcher.stats().dropped, 1)
+
+    def test_invalid_workers(self) -> None:
+        """Test dispatcher needs at least one worker."""
+        with self.assertRaises(ValueError):
+            Dispatcher(self.handler, 0)
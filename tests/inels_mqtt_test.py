@@ -1,11 +1,30 @@
 """Unit tests for InelsMqtt class
     handling mqtt broker communication.
 """
+import threading
+import time
 from typing import Any
 from unittest.mock import patch, Mock
 from unittest import TestCase
 
+from paho.mqtt.client import MQTTMessageInfo, MQTT_ERR_SUCCESS
+
 from inelsmqtt import InelsMqtt
+from inelsmqtt.const import (
+    MQTT_CONNECTED_TOPIC,
+    MQTT_TIMEOUT,
+    MQTT_MAX_INFLIGHT,
+    MQTT_DISCOVERY_MIN_QUIET,
+    MQTT_DISCOVERY_MAX_QUIET,
+    MQTT_DISCOVERY_SENTINEL,
+    MQTT_DISPATCH_WORKERS,
+    MQTT_DISPATCH_COALESCE,
+    MQTT_PUBLISH_RATE,
+    MQTT_PUBLISH_BURST,
+    MQTT_PUBLISH_QUEUE_TIMEOUT,
+    DiscoveryEnd,
+    PublishPriority,
+)
 
 from tests.const import (
     TEST_INELS_MQTT_CLASS_NAMESPACE,
@@ -14,9 +33,16 @@ from tests.const import (
     TEST_PORT,
     TEST_CLIMATE_RFATV_2_TOPIC_STATE,
     TEST_BUTTON_RFGB_40_TOPIC_STATE,
+    TEST_SWITCH_TOPIC_SET,
+    TEST_SWITICH_TOPIC_CONNECTED,
+    TEST_SENSOR_TOPIC_CONNECTED,
+    TEST_AVAILABILITY_ON,
 )
 from tests.devices.setup_test import DeviceSetup
 
+# DeviceSetup patches __connect of the class once the tests start
+CONNECT = InelsMqtt._InelsMqtt__connect  # pylint: disable=protected-access
+
 
 class InelsMqttTest(DeviceSetup, TestCase):
     """Testing class for InelsMqtt."""
@@ -40,6 +66,13 @@ class InelsMqttTest(DeviceSetup, TestCase):
         """
         self.patches = None
 
+    @staticmethod
+    def message_info(mid: int) -> MQTTMessageInfo:
+        """Paho result of the publish call."""
+        info = MQTTMessageInfo(mid)
+        info.rc = MQTT_ERR_SUCCESS
+        return info
+
     def test_instance_initialization(self) -> None:
         """Testing initialization of all props. InelsMqtt class."""
         self.assertEqual(
@@ -73,6 +106,31 @@ class InelsMqttTest(DeviceSetup, TestCase):
         on_connect(self, 135)
         self.assertEqual(self.mqtt.is_available, False)
 
+    def test_subscriptions_restored_after_reconnect(self) -> None:
+        """Test topics are subscribed again when the broker lost the session."""
+        on_connect = (
+            self.mqtt._InelsMqtt__on_connect
+        )  # pylint: disable=protected-access
+        topics = [TEST_SWITICH_TOPIC_CONNECTED, TEST_SENSOR_TOPIC_CONNECTED]
+
+        with patch.object(self.mqtt.client, "subscribe") as mock_subscribe:
+            on_connect(Mock(), None, {"session present": 0}, 0)
+            mock_subscribe.assert_not_called()
+
+            self.mqtt.subscribe_many(topics, wait=False)
+            self.mqtt.subscribe_availability(wait=False)
+            mock_subscribe.reset_mock()
+
+            on_connect(Mock(), None, {"session present": 1}, 0)
+            mock_subscribe.assert_not_called()
+
+            on_connect(Mock(), None, {"session present": 0}, 0)
+
+        mock_subscribe.assert_called_once_with(
+            [(topic, 0) for topic in topics] + [(MQTT_CONNECTED_TOPIC, 0)]
+        )
+        self.assertTrue(self.mqtt.is_subscribed(TEST_SWITICH_TOPIC_CONNECTED))
+
     @patch(
         f"{TEST_INELS_MQTT_CLASS_NAMESPACE}._InelsMqtt__connect", return_value=Mock()
     )
@@ -99,6 +157,71 @@ class InelsMqttTest(DeviceSetup, TestCase):
         devices = self.mqtt.discovery_all()
         self.assertEqual(len(devices), 3)
 
+    def discover(self, mqtt: InelsMqtt, topic: str, payload: Any = None) -> None:
+        """Broker sends message during discovery."""
+        msg = type("msg", (object,), {"topic": topic, "payload": payload})
+        mqtt._InelsMqtt__on_discover(  # pylint: disable=protected-access
+            mqtt, Mock(), msg
+        )
+
+    def test_discovery_all_ends_after_quiet_window(self) -> None:
+        """Test discovery ends shortly after the retained burst."""
+        mqtt = InelsMqtt(
+            {**self.config, MQTT_TIMEOUT: 2, MQTT_DISCOVERY_MIN_QUIET: 0.05}
+        )
+
+        def retained(*args, **kwargs) -> None:
+            """Broker sends retained messages in one burst."""
+            for uid in ["457544", "74544", "8887"]:
+                self.discover(mqtt, f"inels/status/45464654/02/{uid}", b"02\n01\n")
+
+        with patch.object(mqtt.client, "subscribe", side_effect=retained):
+            devices = mqtt.discovery_all()
+
+        self.assertEqual(len(devices), 3)
+        self.assertEqual(mqtt.last_discovery.reason, DiscoveryEnd.QUIET)
+        self.assertEqual(mqtt.last_discovery.messages, 3)
+        self.assertLess(mqtt.last_discovery.elapsed, 1)
+
+    def test_discovery_all_without_messages(self) -> None:
+        """Test discovery gives up after the max quiet window."""
+        mqtt = InelsMqtt({**self.config, MQTT_DISCOVERY_MAX_QUIET: 0.05})
+
+        with patch.object(mqtt.client, "subscribe"):
+            self.assertDictEqual(mqtt.discovery_all(), {})
+
+        self.assertEqual(mqtt.last_discovery.reason, DiscoveryEnd.TIMEOUT)
+        self.assertEqual(mqtt.last_discovery.messages, 0)
+
+    def test_discovery_all_ends_with_sentinel(self) -> None:
+        """Test discovery ends when sentinel message comes back."""
+        mqtt = InelsMqtt(
+            {
+                **self.config,
+                MQTT_DISCOVERY_MIN_QUIET: 2,
+                MQTT_DISCOVERY_SENTINEL: True,
+            }
+        )
+
+        def retained(topic, *args, **kwargs) -> None:
+            """Broker sends retained messages of the discovery topic."""
+            if topic.startswith("inels/status"):
+                self.discover(mqtt, "inels/status/45464654/02/457544", b"02\n01\n")
+
+        def sentinel(topic, *args, **kwargs) -> None:
+            """Sentinel comes back after retained messages."""
+            self.discover(mqtt, topic)
+
+        with patch.object(mqtt.client, "subscribe", side_effect=retained), patch.object(
+            mqtt.client, "publish", side_effect=sentinel
+        ), patch.object(mqtt.client, "unsubscribe") as mock_unsubscribe:
+            devices = mqtt.discovery_all()
+
+        self.assertEqual(list(devices), ["inels/status/45464654/02/457544"])
+        self.assertEqual(mqtt.last_discovery.reason, DiscoveryEnd.SENTINEL)
+        self.assertLess(mqtt.last_discovery.elapsed, 1)
+        mock_unsubscribe.assert_called_once()
+
     @patch(f"{TEST_INELS_MQTT_CLASS_NAMESPACE}.subscribe")
     def test_subscribe_message(self, mock_broker_subscribe) -> None:
         """Testing subscribtion of the message from the broker."""
@@ -162,3 +285,406 @@ class InelsMqttTest(DeviceSetup, TestCase):
         self.mqtt.unsubscribe_listeners()
 
         self.assertEqual(0, len(self.mqtt.list_of_listeners))
+
+    def test_wildcard_listeners(self) -> None:
+        """Test message is passed into all matching listeners."""
+        coordinator, device = Mock(), Mock()
+
+        self.mqtt.subscribe_listener("inels/status/45464654/#", coordinator)
+        self.mqtt.subscribe_listener("inels/status/45464654/02/457544", device)
+
+        msg = type(
+            "msg",
+            (object,),
+            {"topic": "inels/status/45464654/02/457544", "payload": b"02\n01\n"},
+        )
+        self.mqtt._InelsMqtt__on_message(  # pylint: disable=protected-access
+            self.mqtt, Mock(), msg
+        )
+
+        coordinator.assert_called_once_with(msg.payload)
+        device.assert_called_once_with(msg.payload)
+
+        self.assertTrue(
+            self.mqtt.unsubscribe_listener("inels/status/45464654/#", coordinator)
+        )
+        self.assertEqual(1, len(self.mqtt.list_of_listeners))
+
+    def test_publish_released_by_acknowledge(self) -> None:
+        """Test publish returns when broker acknowledges the message."""
+
+        def acknowledge(*args, **kwargs) -> MQTTMessageInfo:
+            """Broker acknowledges from the network thread."""
+            threading.Timer(
+                0.01,
+                self.mqtt._InelsMqtt__on_publish,  # pylint: disable=protected-access
+                (Mock(), Mock(), 1),
+            ).start()
+            return self.message_info(1)
+
+        with patch.object(self.mqtt.client, "publish", side_effect=acknowledge):
+            self.assertTrue(self.mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"))
+
+    def test_publish_without_acknowledge(self) -> None:
+        """Test publish returns False when no acknowledge comes in time."""
+        mqtt = InelsMqtt({**self.config, MQTT_TIMEOUT: 0.1})
+
+        with patch.object(mqtt.client, "publish", return_value=self.message_info(1)):
+            self.assertFalse(mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"))
+
+    def test_subscribe_many(self) -> None:
+        """Test all topics are subscribed with one call and waited at once."""
+        topics = [TEST_SWITICH_TOPIC_CONNECTED, TEST_SENSOR_TOPIC_CONNECTED]
+
+        def retained(*args, **kwargs) -> None:
+            """Broker sends retained messages of all topics."""
+            for topic in topics:
+                msg = type(
+                    "msg", (object,), {"topic": topic, "payload": TEST_AVAILABILITY_ON}
+                )
+                threading.Timer(
+                    0.01,
+                    self.mqtt._InelsMqtt__on_message,  # pylint: disable=protected-access
+                    (Mock(), Mock(), msg),
+                ).start()
+
+        with patch.object(
+            self.mqtt.client, "subscribe", side_effect=retained
+        ) as mock_subscribe:
+            payloads = self.mqtt.subscribe_many(topics + topics)
+
+        mock_subscribe.assert_called_once()
+        self.assertEqual(len(mock_subscribe.call_args[0][0]), 2)
+        self.assertDictEqual(
+            payloads,
+            {topic: TEST_AVAILABILITY_ON for topic in topics},
+        )
+
+    def test_subscribe_availability(self) -> None:
+        """Test availability of all devices is one wildcard subscription
+        feeding the availability table."""
+        listener = Mock()
+        self.mqtt.availability.subscribe_listener(listener)
+
+        def message(topic: str, payload: bytes) -> None:
+            msg = type("msg", (object,), {"topic": topic, "payload": payload})
+            self.mqtt._InelsMqtt__on_message(  # pylint: disable=protected-access
+                Mock(), Mock(), msg
+            )
+
+        with patch.object(self.mqtt.client, "subscribe") as mock_subscribe:
+            self.mqtt.subscribe_availability([TEST_SWITICH_TOPIC_CONNECTED], False)
+            self.mqtt.subscribe_availability([TEST_SENSOR_TOPIC_CONNECTED], False)
+
+        mock_subscribe.assert_called_once_with(MQTT_CONNECTED_TOPIC, 0, None, None)
+
+        message(TEST_SWITICH_TOPIC_CONNECTED, b"on\n")
+        message(TEST_SWITICH_TOPIC_CONNECTED, b"on\n")
+        message(TEST_SENSOR_TOPIC_CONNECTED, b"off\n")
+        message(TEST_SWITICH_TOPIC_CONNECTED, b"off\n")
+
+        self.assertFalse(self.mqtt.availability.get(TEST_SWITICH_TOPIC_CONNECTED))
+        self.assertFalse(self.mqtt.availability.get(TEST_SENSOR_TOPIC_CONNECTED))
+        self.assertEqual(
+            [call.args for call in listener.call_args_list],
+            [
+                (TEST_SWITICH_TOPIC_CONNECTED, True),
+                (TEST_SWITICH_TOPIC_CONNECTED, False),
+            ],
+        )
+
+    def test_publish_acknowledged_by_message_id(self) -> None:
+        """Test every publish waits for acknowledge of its own message."""
+        with patch.object(
+            self.mqtt.client,
+            "publish",
+            side_effect=[self.message_info(1), self.message_info(2)],
+        ):
+            first = self.mqtt.publish_nowait(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n")
+            second = self.mqtt.publish_nowait(TEST_SWITCH_TOPIC_SET, "02\n00\n00\n")
+
+        self.mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+            Mock(), Mock(), 2
+        )
+
+        self.assertTrue(second.wait(0))
+        self.assertFalse(first.wait(0))
+        self.assertFalse(first.is_published)
+
+        self.mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+            Mock(), Mock(), 1
+        )
+
+        self.assertTrue(first.wait(0))
+
+    def test_publish_acknowledged_during_publish_call(self) -> None:
+        """Test acknowledge which arrives before publish returns is not lost."""
+
+        def acknowledge(*args, **kwargs) -> MQTTMessageInfo:
+            """Paho without network thread writes and acknowledges at once."""
+            self.mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+                Mock(), Mock(), 7
+            )
+            return self.message_info(7)
+
+        with patch.object(self.mqtt.client, "publish", side_effect=acknowledge):
+            self.assertTrue(self.mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"))
+
+    def test_publish_concurrent_qos1(self) -> None:
+        """Test acknowledges called under the paho lock do not deadlock
+        publishes running in other threads."""
+        out_message_mutex = threading.Lock()
+        mids = iter(range(1, 100))
+
+        def acknowledge(mid: int, locked: threading.Event) -> None:
+            """Network thread handles PUBACK holding the paho lock."""
+            with out_message_mutex:
+                locked.set()
+                self.mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+                    Mock(), Mock(), mid
+                )
+
+        def publish(*args, **kwargs) -> MQTTMessageInfo:
+            """Paho takes its lock while the network thread holds it."""
+            with out_message_mutex:
+                mid = next(mids)
+            locked = threading.Event()
+            threading.Thread(target=acknowledge, args=(mid, locked)).start()
+            locked.wait(1)
+            with out_message_mutex:
+                return self.message_info(mid)
+
+        results = []
+        with patch.object(self.mqtt.client, "publish", side_effect=publish):
+            threads = [
+                threading.Thread(
+                    target=lambda: results.append(
+                        self.mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n", qos=1)
+                    ),
+                    daemon=True,
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(3)
+
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(results, [True] * 4)
+
+    def test_publish_inflight_window(self) -> None:
+        """Test publish fails when inflight window stays full."""
+        mqtt = InelsMqtt({**self.config, MQTT_TIMEOUT: 0.1, MQTT_MAX_INFLIGHT: 1})
+
+        with patch.object(
+            mqtt.client,
+            "publish",
+            side_effect=[self.message_info(1), self.message_info(2)],
+        ):
+            first = mqtt.publish_nowait(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n")
+            second = mqtt.publish_nowait(TEST_SWITCH_TOPIC_SET, "02\n00\n00\n")
+
+            self.assertIsNotNone(first.mid)
+            self.assertIsNone(second.mid)
+            self.assertFalse(second.wait(0))
+
+            mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+                Mock(), Mock(), 1
+            )
+            third = mqtt.publish_nowait(TEST_SWITCH_TOPIC_SET, "02\n00\n00\n")
+
+        self.assertTrue(first.wait(0))
+        self.assertEqual(third.mid, 2)
+
+    def test_dispatch_listeners_in_workers(self) -> None:
+        """Test listeners are called outside of the network thread."""
+        self.assertIsNone(self.mqtt.dispatch_stats)
+
+        mqtt = InelsMqtt({**self.config, MQTT_DISPATCH_WORKERS: 2})
+        mqtt._InelsMqtt__messages = {}  # pylint: disable=protected-access
+        threads = []
+        mqtt.subscribe_listener(
+            "inels/status/#", lambda payload: threads.append(threading.get_ident())
+        )
+
+        for uid in range(10):
+            msg = type(
+                "msg",
+                (object,),
+                {"topic": f"inels/status/45464654/02/{uid:06d}", "payload": b""},
+            )
+            mqtt._InelsMqtt__on_message(  # pylint: disable=protected-access
+                mqtt, Mock(), msg
+            )
+        mqtt.close()
+
+        self.assertEqual(len(threads), 10)
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(mqtt.dispatch_stats.dispatched, 10)
+        self.assertEqual(mqtt.dispatch_stats.workers, 2)
+
+    def test_dispatch_after_reconnect(self) -> None:
+        """Test listeners get messages again after disconnect and connect."""
+        mqtt = InelsMqtt({**self.config, MQTT_DISPATCH_WORKERS: 2})
+        mqtt._InelsMqtt__messages = {}  # pylint: disable=protected-access
+        on_message = mqtt._InelsMqtt__on_message  # pylint: disable=protected-access
+        payloads = []
+        mqtt.subscribe_listener(TEST_CLIMATE_RFATV_2_TOPIC_STATE, payloads.append)
+
+        def message(payload: bytes):
+            return type(
+                "msg",
+                (object,),
+                {"topic": TEST_CLIMATE_RFATV_2_TOPIC_STATE, "payload": payload},
+            )
+
+        on_message(mqtt, Mock(), message(b"0"))
+        mqtt.disconnect()
+
+        mqtt._InelsMqtt__connected.set()  # pylint: disable=protected-access
+        with patch.object(mqtt.client, "is_connected", return_value=True):
+            CONNECT(mqtt)
+        on_message(mqtt, Mock(), message(b"1"))
+        mqtt.close()
+
+        self.assertEqual(payloads, [b"0", b"1"])
+        self.assertEqual(mqtt.dispatch_stats.dispatched, 2)
+        self.assertEqual(mqtt.dispatch_stats.dropped, 0)
+
+    def test_dispatch_coalesce(self) -> None:
+        """Test listener gets only the newest payload of the topic."""
+        mqtt = InelsMqtt({**self.config, MQTT_DISPATCH_COALESCE: True})
+        mqtt._InelsMqtt__messages = {}  # pylint: disable=protected-access
+        on_message = mqtt._InelsMqtt__on_message  # pylint: disable=protected-access
+
+        started, gate, payloads = threading.Event(), threading.Event(), []
+
+        def listener(payload) -> None:
+            started.set()
+            gate.wait(5)
+            payloads.append(payload)
+
+        mqtt.subscribe_listener(TEST_CLIMATE_RFATV_2_TOPIC_STATE, listener)
+
+        def message(payload: bytes):
+            return type(
+                "msg",
+                (object,),
+                {"topic": TEST_CLIMATE_RFATV_2_TOPIC_STATE, "payload": payload},
+            )
+
+        on_message(mqtt, Mock(), message(b"0"))
+        self.assertTrue(started.wait(5))
+        for payload in (b"1", b"2", b"3"):
+            on_message(mqtt, Mock(), message(payload))
+
+        gate.set()
+        mqtt.close()
+
+        self.assertEqual(payloads, [b"0", b"3"])
+        self.assertEqual(mqtt.last_value(TEST_CLIMATE_RFATV_2_TOPIC_STATE), b"2")
+        self.assertEqual(mqtt.dispatch_stats.coalesced, 2)
+        self.assertEqual(mqtt.dispatch_stats.workers, 1)
+
+    def test_publish_scheduled(self) -> None:
+        """Test publish goes through the scheduler of the coordinator."""
+        self.assertIsNone(self.mqtt.publish_stats)
+        mqtt = InelsMqtt({**self.config, MQTT_PUBLISH_RATE: 10})
+
+        def acknowledge(*args, **kwargs) -> MQTTMessageInfo:
+            """Paho without network thread writes and acknowledges at once."""
+            mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+                Mock(), Mock(), 3
+            )
+            return self.message_info(3)
+
+        with patch.object(mqtt.client, "publish", side_effect=acknowledge) as publish:
+            self.assertTrue(
+                mqtt.publish(
+                    TEST_SWITCH_TOPIC_SET, "01\n00\n00\n", priority=PublishPriority.USER
+                )
+            )
+            mqtt.close()
+
+        publish.assert_called_once_with(
+            TEST_SWITCH_TOPIC_SET, "01\n00\n00\n", 0, True, None
+        )
+        (stats,) = mqtt.publish_stats.values()
+        self.assertEqual(stats.sent, 1)
+
+    def test_publish_scheduled_timeout_after_sent(self) -> None:
+        """Test time in the queue of the coordinator is not a timeout."""
+        mqtt = InelsMqtt(
+            {
+                **self.config,
+                MQTT_TIMEOUT: 0.2,
+                MQTT_PUBLISH_RATE: 2,
+                MQTT_PUBLISH_BURST: 1,
+            }
+        )
+        mids = iter(range(1, 10))
+
+        def acknowledge(*args, **kwargs) -> MQTTMessageInfo:
+            """Paho without network thread writes and acknowledges at once."""
+            mid = next(mids)
+            mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+                Mock(), Mock(), mid
+            )
+            return self.message_info(mid)
+
+        with patch.object(mqtt.client, "publish", side_effect=acknowledge):
+            self.assertTrue(mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"))
+            start = time.monotonic()
+            self.assertTrue(mqtt.publish(TEST_SWITCH_TOPIC_SET, "02\n00\n00\n"))
+            self.assertGreater(time.monotonic() - start, 0.2)
+            mqtt.close()
+
+    def test_publish_scheduled_queue_timeout(self) -> None:
+        """Test command waiting in the queue too long is not sent."""
+        mqtt = InelsMqtt(
+            {
+                **self.config,
+                MQTT_PUBLISH_RATE: 2,
+                MQTT_PUBLISH_BURST: 1,
+                MQTT_PUBLISH_QUEUE_TIMEOUT: 0.1,
+            }
+        )
+        mids = iter(range(1, 10))
+
+        def acknowledge(*args, **kwargs) -> MQTTMessageInfo:
+            """Paho without network thread writes and acknowledges at once."""
+            mid = next(mids)
+            mqtt._InelsMqtt__on_publish(  # pylint: disable=protected-access
+                Mock(), Mock(), mid
+            )
+            return self.message_info(mid)
+
+        with patch.object(
+            mqtt.client, "publish", side_effect=acknowledge
+        ) as publish, patch.object(mqtt.client, "is_connected", return_value=True):
+            self.assertTrue(mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"))
+            start = time.monotonic()
+            self.assertFalse(mqtt.publish(TEST_SWITCH_TOPIC_SET, "02\n00\n00\n"))
+            self.assertLess(time.monotonic() - start, 0.4)
+
+            time.sleep(0.6)
+            mqtt.close()
+
+        publish.assert_called_once()
+        (stats,) = mqtt.publish_stats.values()
+        self.assertEqual(stats.expired, 1)
+
+    def test_publish_scheduled_disconnected(self) -> None:
+        """Test scheduled commands fail at once while the broker is down."""
+        mqtt = InelsMqtt({**self.config, MQTT_TIMEOUT: 1, MQTT_PUBLISH_RATE: 10})
+
+        with patch.object(mqtt.client, "publish") as publish, patch.object(
+            mqtt.client, "is_connected", return_value=False
+        ):
+            start = time.monotonic()
+            self.assertFalse(mqtt.publish(TEST_SWITCH_TOPIC_SET, "01\n00\n00\n"))
+            self.assertLess(time.monotonic() - start, 0.5)
+            mqtt.close()
+
+        publish.assert_not_called()
@@ -0,0 +1,96 @@
+"""Unit tests for NetworkLoop driving many paho clients."""
+import os
+import socket
+import time
+from unittest import TestCase, skipUnless
+from unittest.mock import Mock, patch
+
+from paho.mqtt.client import MQTT_ERR_NO_CONN, MQTT_ERR_SUCCESS
+
+from inelsmqtt.network import NetworkLoop
+
+
+def wait_for(condition, timeout: float = 2) -> bool:
+    """Poll the condition till it is true or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class NetworkLoopTest(TestCase):
+    """Testing class for NetworkLoop."""
+
+    def setUp(self) -> None:
+        """Loop with one client owning one end of a socket pair."""
+        self.loop = NetworkLoop()
+        self.sock, self.peer = socket.socketpair()
+        self.client = Mock()
+        self.client.loop_misc.return_value = MQTT_ERR_SUCCESS
+
+        self.loop.attach(self.client)
+        self.client.on_socket_open(self.client, None, self.sock)
+
+    def tearDown(self) -> None:
+        """Stop loop and close sockets."""
+        self.loop.stop()
+        self.sock.close()
+        self.peer.close()
+
+    def test_read_and_write(self) -> None:
+        """Test client reads when data arrive and writes when it asks."""
+        self.assertTrue(self.loop.is_running)
+        self.assertTrue(wait_for(lambda: self.loop.connection(self.client).opened))
+
+        self.peer.send(b"\x20")
+        self.assertTrue(wait_for(lambda: self.client.loop_read.called))
+
+        self.client.on_socket_register_write(self.client, None, self.sock)
+        self.assertTrue(wait_for(lambda: self.client.loop_write.called))
+
+    def test_detach_after_close(self) -> None:
+        """Test detached client is removed once its socket is closed."""
+        self.assertTrue(wait_for(lambda: self.loop.connection(self.client).opened))
+
+        self.loop.detach(self.client)
+        self.assertEqual(len(self.loop), 1)
+
+        self.client.on_socket_close(self.client, None, self.sock)
+        self.assertTrue(wait_for(lambda: len(self.loop) == 0))
+
+    def test_reconnect_lost_client(self) -> None:
+        """Test client without connection is connected again."""
+        client = Mock()
+        client.loop_misc.return_value = MQTT_ERR_NO_CONN
+        client.reconnect.side_effect = [OSError("refused"), MQTT_ERR_SUCCESS]
+
+        with patch("inelsmqtt.network.MISC_LOOP_INTERVAL", 0.01), patch(
+            "inelsmqtt.network.RECONNECT_MIN_DELAY", 0.01
+        ):
+            loop = NetworkLoop()
+            self.addCleanup(loop.stop)
+            loop.attach(client)
+            client.on_socket_open(client, None, self.peer)
+
+            self.assertTrue(wait_for(lambda: client.reconnect.call_count == 2))
+
+        self.assertEqual(loop.connection(client).reconnects, 2)
+
+    @skipUnless(os.path.isdir("/proc/self/fd"), "needs /proc")
+    def test_stop_releases_sockets(self) -> None:
+        """Test stopped loop closes its sockets and can not be used."""
+        opened = len(os.listdir("/proc/self/fd"))
+
+        for attach in (False, True):
+            loop = NetworkLoop()
+            if attach:
+                loop.attach(Mock())
+            loop.stop()
+
+            self.assertFalse(loop.is_running)
+            self.assertEqual(len(os.listdir("/proc/self/fd")), opened)
+
+        with self.assertRaises(RuntimeError):
+            loop.attach(self.client)
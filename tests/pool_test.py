@@ -0,0 +1,103 @@
+"""Unit tests for BrokerPool of many sites."""
+from unittest import TestCase
+from unittest.mock import Mock
+
+from inelsmqtt.const import MQTT_HOST, MQTT_PORT, PublishPriority
+from inelsmqtt.network import NetworkLoop
+from inelsmqtt.pool import BrokerPool, ConnectionStats
+
+
+def create_mqtt(config, network_loop):
+    """Client of the site without broker connection."""
+    mqtt = Mock(
+        host=config[MQTT_HOST],
+        port=config[MQTT_PORT],
+        messages_received=0,
+        messages_published=0,
+        last_received=None,
+    )
+    mqtt.network_loop = network_loop
+    mqtt.client.is_connected.return_value = False
+    return mqtt
+
+
+class BrokerPoolTest(TestCase):
+    """Testing class for BrokerPool."""
+
+    def setUp(self) -> None:
+        """Pool with two network loops and two sites."""
+        self.pool = BrokerPool(loops=2, factory=create_mqtt)
+        self.home = self.pool.add("home", {MQTT_HOST: "10.0.0.1", MQTT_PORT: 1883})
+        self.office = self.pool.add("office", {MQTT_HOST: "10.0.0.2", MQTT_PORT: 1884})
+
+    def tearDown(self) -> None:
+        """Close pool."""
+        self.pool.close()
+
+    def test_add_and_remove(self) -> None:
+        """Test sites are spread over loops and removed ones disconnected."""
+        self.assertEqual(len(self.pool), 2)
+        self.assertEqual(self.pool.sites, ["home", "office"])
+        self.assertIn("home", self.pool)
+        self.assertIs(self.pool["home"], self.home)
+        self.assertIsNone(self.pool.get("garage"))
+
+        self.assertIsInstance(self.home.network_loop, NetworkLoop)
+        self.assertIsNot(self.home.network_loop, self.office.network_loop)
+
+        with self.assertRaises(ValueError):
+            self.pool.add("home", {MQTT_HOST: "10.0.0.3", MQTT_PORT: 1883})
+
+        self.assertTrue(self.pool.remove("home"))
+        self.home.disconnect.assert_called_once()
+        self.assertFalse(self.pool.remove("home"))
+        self.assertNotIn("home", self.pool)
+
+        with self.assertRaises(ValueError):
+            BrokerPool(loops=0)
+
+    def test_routing(self) -> None:
+        """Test calls reach the client of the site."""
+        topic = "inels/set/2C4A4F103290/02/010203"
+        fnc = Mock()
+
+        self.pool.publish("office", topic, b"01\n", priority=PublishPriority.USER)
+        self.office.publish.assert_called_once_with(
+            topic, b"01\n", 0, True, priority=PublishPriority.USER
+        )
+        self.home.publish.assert_not_called()
+
+        self.pool.subscribe("home", topic)
+        self.home.subscribe.assert_called_once_with(topic, 0)
+
+        self.pool.subscribe_listener("home", topic, fnc)
+        self.home.subscribe_listener.assert_called_once_with(topic, fnc)
+
+        self.pool.unsubscribe_listener("home", topic, fnc)
+        self.home.unsubscribe_listener.assert_called_once_with(topic, fnc)
+
+        with self.assertRaises(KeyError):
+            self.pool.publish("garage", topic, b"01\n")
+
+    def test_stats(self) -> None:
+        """Test stats of sites and rates since the previous call."""
+        self.pool.stats()
+        self.home.messages_received = 10
+        self.home.messages_published = 4
+
+        stats = self.pool.stats()
+
+        self.assertEqual(set(stats), {"home", "office"})
+        home = stats["home"]
+        self.assertIsInstance(home, ConnectionStats)
+        self.assertEqual((home.host, home.port), ("10.0.0.1", 1883))
+        self.assertFalse(home.connected)
+        self.assertEqual(home.connects, 0)
+        self.assertEqual(home.received, 10)
+        self.assertEqual(home.published, 4)
+        self.assertGreater(home.received_rate, 0)
+        self.assertGreater(home.published_rate, 0)
+        self.assertIsNone(home.idle)
+        self.assertEqual(stats["office"].received_rate, 0)
+
+        self.assertEqual(self.pool.stats()["home"].received_rate, 0)
@@ -0,0 +1,66 @@
+"""Unit tests for detection of the retained messages burst end."""
+from unittest import TestCase
+from unittest.mock import patch
+
+from inelsmqtt.const import DiscoveryEnd
+from inelsmqtt.quiescence import QuiescenceDetector
+
+
+class QuiescenceDetectorTest(TestCase):
+    """Testing class for QuiescenceDetector."""
+
+    def setUp(self) -> None:
+        """Control the clock of the detector."""
+        self.now = 100.0
+        self.patch = patch(
+            "inelsmqtt.quiescence.time.monotonic", side_effect=lambda: self.now
+        )
+        self.patch.start()
+
+        self.detector = QuiescenceDetector(min_quiet=0.1, max_quiet=5, factor=10)
+
+    def tearDown(self) -> None:
+        """Stop patches."""
+        self.patch.stop()
+
+    def arrive(self, *gaps: float) -> None:
+        """Messages arrive after the gaps."""
+        for gap in gaps:
+            self.now += gap
+            self.detector.arrived()
+
+    def test_waits_max_quiet_for_first_message(self) -> None:
+        """Test nothing is known before the first message."""
+        self.assertEqual(self.detector.window, 5)
+
+    def test_window_follows_longest_gap(self) -> None:
+        """Test window is multiple of the longest gap between messages."""
+        self.arrive(0.3, 0.001)
+        self.assertEqual(self.detector.window, 0.1)
+
+        self.arrive(0.02, 0.001)
+        self.assertAlmostEqual(self.detector.window, 0.2)
+
+        self.arrive(1)
+        self.assertEqual(self.detector.window, 5)
+
+    def test_report(self) -> None:
+        """Test report of the burst."""
+        self.arrive(0.3, 0.01, 0.01)
+        self.now += 0.1
+
+        report = self.detector.report(DiscoveryEnd.QUIET)
+
+        self.assertEqual(report.reason, DiscoveryEnd.QUIET)
+        self.assertEqual(report.messages, 3)
+        self.assertAlmostEqual(report.burst, 0.02)
+        self.assertAlmostEqual(report.elapsed, 0.42)
+        self.assertAlmostEqual(report.quiet, 0.1)
+
+    def test_start_forgets_previous_burst(self) -> None:
+        """Test new discovery starts with empty history."""
+        self.arrive(0.3, 1)
+        self.detector.start()
+
+        self.assertEqual(self.detector.messages, 0)
+        self.assertEqual(self.detector.window, 5)
@@ -0,0 +1,69 @@
+"""Unit tests for DeviceRegistry class
+    indexing discovered devices.
+"""
+from unittest import TestCase
+from unittest.mock import Mock
+
+from inelsmqtt.const import Element, Platform
+from inelsmqtt.devices import Device
+from inelsmqtt.registry import DeviceRegistry
+
+from tests.const import (
+    TEST_SENSOR_RFTC_10_G_TOPIC_STATE,
+    TEST_SENSOR_TOPIC_STATE,
+    TEST_SWITCH_TOPIC_STATE,
+)
+
+
+class DeviceRegistryTest(TestCase):
+    """Testing class for DeviceRegistry."""
+
+    def setUp(self) -> None:
+        """Create registry with devices of two coordinators."""
+        mqtt = Mock()
+        self.switch = Device(mqtt, TEST_SWITCH_TOPIC_STATE)
+        self.sensor = Device(mqtt, TEST_SENSOR_TOPIC_STATE)
+        self.thermo = Device(mqtt, TEST_SENSOR_RFTC_10_G_TOPIC_STATE)
+
+        self.registry = DeviceRegistry()
+        for dev in (self.switch, self.sensor, self.thermo):
+            self.registry.add(dev)
+
+    def tearDown(self) -> None:
+        """Destroy registry."""
+        self.registry = None
+
+    def test_indexes(self) -> None:
+        """Test devices are found by all indexes."""
+        self.assertEqual(len(self.registry), 3)
+        self.assertIn(TEST_SWITCH_TOPIC_STATE, self.registry)
+        self.assertIs(self.registry.get(self.switch.unique_id), self.switch)
+        self.assertIs(
+            self.registry.by_state_topic(TEST_SENSOR_TOPIC_STATE), self.sensor
+        )
+        self.assertEqual(
+            self.registry.by_coordinator("4254524524"), [self.switch, self.sensor]
+        )
+        self.assertEqual(
+            self.registry.by_platform(Platform.SENSOR), [self.sensor, self.thermo]
+        )
+        self.assertEqual(self.registry.by_element(Element.RFSC_61), [self.switch])
+        self.assertEqual(self.registry.coordinators, ["4254524524", "2C4A4F103290"])
+        self.assertEqual(self.registry.devices, [self.switch, self.sensor, self.thermo])
+
+    def test_duplicate_topic(self) -> None:
+        """Test device with known state topic is not added again."""
+        self.assertFalse(self.registry.add(Device(Mock(), TEST_SWITCH_TOPIC_STATE)))
+        self.assertIs(
+            self.registry.by_state_topic(TEST_SWITCH_TOPIC_STATE), self.switch
+        )
+
+    def test_remove(self) -> None:
+        """Test removed device disappears from all indexes."""
+        self.assertTrue(self.registry.remove(self.thermo))
+        self.assertFalse(self.registry.remove(self.thermo))
+
+        self.assertIsNone(self.registry.get(self.thermo.unique_id))
+        self.assertEqual(self.registry.by_platform(Platform.SENSOR), [self.sensor])
+        self.assertEqual(self.registry.by_element(Element.RFTC_10_G), [])
+        self.assertEqual(self.registry.coordinators, ["4254524524"])
@@ -0,0 +1,91 @@
+"""Unit tests for TopicRouter class
+    routing topics to listeners.
+"""
+from unittest import TestCase
+
+from inelsmqtt.router import TopicRouter
+
+from tests.const import (
+    TEST_SWITCH_TOPIC_STATE,
+    TEST_SWITICH_TOPIC_CONNECTED,
+    TEST_SENSOR_TOPIC_STATE,
+)
+
+
+class TopicRouterTest(TestCase):
+    """Testing class for TopicRouter."""
+
+    def setUp(self) -> None:
+        """Create empty router."""
+        self.router = TopicRouter()
+
+    def tearDown(self) -> None:
+        """Destroy router."""
+        self.router = None
+
+    def test_exact_topic(self) -> None:
+        """Test exact topic matches only itself."""
+        self.router.add(TEST_SWITCH_TOPIC_STATE, print)
+
+        self.assertEqual(self.router.match(TEST_SWITCH_TOPIC_STATE), [print])
+        self.assertEqual(self.router.match(TEST_SENSOR_TOPIC_STATE), [])
+        self.assertEqual(self.router.match("inels/status/4254524524/02"), [])
+
+    def test_wildcards(self) -> None:
+        """Test single and multi level wildcards."""
+        self.router.add("inels/status/4254524524/#", "coordinator")
+        self.router.add("inels/status/+/02/+", "switches")
+        self.router.add("inels/#", "all")
+        self.router.add("#", "everything")
+
+        self.assertCountEqual(
+            self.router.match(TEST_SWITCH_TOPIC_STATE),
+            ["coordinator", "switches", "all", "everything"],
+        )
+        self.assertCountEqual(
+            self.router.match(TEST_SENSOR_TOPIC_STATE),
+            ["coordinator", "all", "everything"],
+        )
+        self.assertCountEqual(
+            self.router.match(TEST_SWITICH_TOPIC_CONNECTED), ["all", "everything"]
+        )
+        # multi level wildcard matches the parent level too
+        self.assertCountEqual(self.router.match("inels"), ["all", "everything"])
+        # topics starting with $ are not matched by wildcards on first level
+        self.assertEqual(self.router.match("$SYS/broker/uptime"), [])
+
+    def test_many_listeners_on_one_topic(self) -> None:
+        """Test listeners are appended and not replaced."""
+        self.router.add(TEST_SWITCH_TOPIC_STATE, "first")
+        self.router.add(TEST_SWITCH_TOPIC_STATE, "second")
+        self.router.add(TEST_SWITCH_TOPIC_STATE, "second")
+
+        self.assertEqual(
+            self.router.match(TEST_SWITCH_TOPIC_STATE), ["first", "second"]
+        )
+        self.assertEqual(len(self.router), 1)
+
+    def test_remove(self) -> None:
+        """Test removing of listeners."""
+        self.router.add(TEST_SWITCH_TOPIC_STATE, "first")
+        self.router.add(TEST_SWITCH_TOPIC_STATE, "second")
+        self.router.add("inels/status/+/02/+", "switches")
+
+        self.assertTrue(self.router.remove(TEST_SWITCH_TOPIC_STATE, "first"))
+        self.assertFalse(self.router.remove(TEST_SWITCH_TOPIC_STATE, "first"))
+        self.assertCountEqual(
+            self.router.match(TEST_SWITCH_TOPIC_STATE), ["second", "switches"]
+        )
+
+        self.assertTrue(self.router.remove("inels/status/+/02/+"))
+        self.assertEqual(self.router.match(TEST_SWITCH_TOPIC_STATE), ["second"])
+        self.assertFalse(self.router.remove(TEST_SENSOR_TOPIC_STATE))
+
+        self.router.remove(TEST_SWITCH_TOPIC_STATE, "second")
+
+        self.assertEqual(len(self.router), 0)
+        # all empty levels are pruned
+        self.assertEqual(
+            self.router._TopicRouter__root.children,
+            {},  # pylint: disable=protected-access
+        )
@@ -0,0 +1,146 @@
+"""Unit tests for PublishScheduler limiting publishes per coordinator."""
+from unittest import TestCase
+
+from inelsmqtt import PublishAck
+from inelsmqtt.const import PublishPriority
+from inelsmqtt.scheduler import PublishScheduler
+
+SET_TOPIC = "inels/set/2C4A4F103290/02/{}"
+OTHER_SET_TOPIC = "inels/set/4254524524/02/{}"
+
+
+class PublishSchedulerTest(TestCase):
+    """Testing class for PublishScheduler."""
+
+    def setUp(self) -> None:
+        """Scheduler sending one message at once and then 20 per second."""
+        self.published = []
+        self.scheduler = PublishScheduler(self.publish, rate=20, burst=1)
+
+    def tearDown(self) -> None:
+        """Stop scheduler."""
+        self.scheduler.stop()
+
+    def publish(self, topic, payload, qos, retain, properties) -> PublishAck:
+        """Record message and acknowledge it."""
+        self.published.append((topic, payload))
+        ack = PublishAck(len(self.published))
+        ack._resolve(True)  # pylint: disable=protected-access
+        return ack
+
+    def test_rate_per_coordinator(self) -> None:
+        """Test coordinators have their own buckets."""
+        acks = [
+            self.scheduler.submit(SET_TOPIC.format(uid), b"01\n") for uid in range(3)
+        ]
+        other = self.scheduler.submit(OTHER_SET_TOPIC.format(0), b"01\n")
+
+        self.assertTrue(other.wait(1))
+        self.assertTrue(acks[0].wait(1))
+        self.assertFalse(acks[2].is_published)
+        self.assertTrue(all(ack.wait(1) for ack in acks))
+
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["2C4A4F103290"].sent, 3)
+        self.assertEqual(stats["4254524524"].sent, 1)
+        self.assertGreater(stats["2C4A4F103290"].max_wait, 0.05)
+        self.assertEqual(stats["2C4A4F103290"].queued, 0)
+
+    def test_priority(self) -> None:
+        """Test user command is sent before background commands."""
+        first = self.scheduler.submit(SET_TOPIC.format(0), b"01\n")
+        self.assertTrue(first.wait(1))
+        background = self.scheduler.submit(
+            SET_TOPIC.format(1), b"01\n", priority=PublishPriority.BACKGROUND
+        )
+        user = self.scheduler.submit(
+            SET_TOPIC.format(2), b"01\n", priority=PublishPriority.USER
+        )
+
+        self.assertTrue(background.wait(1) and user.wait(1))
+        self.assertEqual(
+            [topic for topic, _ in self.published],
+            [SET_TOPIC.format(0), SET_TOPIC.format(2), SET_TOPIC.format(1)],
+        )
+
+    def test_collapse(self) -> None:
+        """Test stale command to the same topic is not sent."""
+        topic = SET_TOPIC.format(0)
+        self.scheduler.submit(topic, b"01\n").wait(1)
+
+        stale = self.scheduler.submit(topic, b"02\n")
+        newest = self.scheduler.submit(topic, b"03\n", priority=PublishPriority.USER)
+
+        self.assertIs(stale, newest)
+        self.assertTrue(newest.wait(1))
+        self.assertEqual(self.published, [(topic, b"01\n"), (topic, b"03\n")])
+        self.assertEqual(self.scheduler.stats()["2C4A4F103290"].collapsed, 1)
+
+    def test_stop_drops_queued(self) -> None:
+        """Test queued commands are not published after stop."""
+        self.scheduler.submit(SET_TOPIC.format(0), b"01\n").wait(1)
+        queued = self.scheduler.submit(SET_TOPIC.format(1), b"01\n")
+
+        self.scheduler.stop()
+
+        self.assertFalse(queued.wait(1))
+        self.assertIsNone(queued.mid)
+        self.assertFalse(self.scheduler.is_running)
+        self.assertEqual(len(self.published), 1)
+
+    def test_capacity(self) -> None:
+        """Test commands wait for capacity without blocking the thread."""
+        # like the inflight window, sent messages take the room
+        room = [0]
+        scheduler = PublishScheduler(
+            self.publish,
+            rate=100,
+            burst=5,
+            capacity=lambda: room[0] - len(self.published),
+        )
+        self.addCleanup(scheduler.stop)
+
+        acks = [scheduler.submit(SET_TOPIC.format(uid), b"01\n") for uid in range(2)]
+        self.assertFalse(acks[0].wait_sent(0.1))
+        self.assertEqual(self.published, [])
+
+        room[0] = 1
+        scheduler.wake()
+        self.assertTrue(acks[0].wait(1))
+        self.assertFalse(acks[1].wait_sent(0.1))
+
+        room[0] = 2
+        scheduler.wake()
+        self.assertTrue(acks[1].wait(1))
+        self.assertEqual(len(self.published), 2)
+
+    def test_queue_timeout(self) -> None:
+        """Test command waiting too long is dropped, unless submitted again."""
+        room = [0]
+        scheduler = PublishScheduler(
+            self.publish,
+            rate=100,
+            burst=5,
+            capacity=lambda: room[0],
+            queue_timeout=0.05,
+        )
+        self.addCleanup(scheduler.stop)
+
+        stale = scheduler.submit(SET_TOPIC.format(0), b"01\n")
+        scheduler.submit(SET_TOPIC.format(1), b"01\n")
+        self.assertFalse(stale.wait_sent(0.1))
+        fresh = scheduler.submit(SET_TOPIC.format(1), b"02\n")
+
+        room[0] = 2
+        scheduler.wake()
+
+        self.assertTrue(fresh.wait(1))
+        self.assertFalse(stale.wait(1))
+        self.assertIsNone(stale.mid)
+        self.assertEqual(self.published, [(SET_TOPIC.format(1), b"02\n")])
+        self.assertEqual(scheduler.stats()["2C4A4F103290"].expired, 1)
+
+    def test_invalid_rate(self) -> None:
+        """Test rate has to be positive."""
+        with self.assertRaises(ValueError):
+            PublishScheduler(self.publish, rate=0)
@@ -0,0 +1,143 @@
+"""Unit tests for utility functions."""
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from inelsmqtt.codec import Codec, get_codec
+from inelsmqtt.const import STATE_OPEN, STOP_DOWN, Element, Platform
+from inelsmqtt.util import (
+    DeviceValue,
+    SwitchTempValue,
+    create_value,
+    parse_topic,
+    topic_cache_info,
+    value_cache_info,
+)
+
+from tests.const import (
+    FRAGMENT_TOPIC_CU_ID,
+    TEST_SENSOR_TOPIC_STATE,
+    TEST_SWITCH_TOPIC_STATE,
+    TEST_SWITCH_TOPIC_SET,
+    TEST_SWITICH_TOPIC_CONNECTED,
+)
+
+
+class ParseTopicTest(TestCase):
+    """Testing parsed topic cache."""
+
+    def setUp(self) -> None:
+        """Start every test with empty cache."""
+        parse_topic.cache_clear()
+
+    def test_fragments(self) -> None:
+        """Test topic is split into fragments and device type is resolved."""
+        topic = parse_topic(TEST_SWITCH_TOPIC_STATE)
+
+        self.assertEqual(topic.domain, "inels")
+        self.assertEqual(topic.state, "status")
+        self.assertEqual(topic.serial, "4254524524")
+        self.assertEqual(topic.type, "02")
+        self.assertEqual(topic.uid, "452454")
+        self.assertEqual(topic.platform, Platform.SWITCH)
+        self.assertEqual(topic.element, Element.RFSC_61)
+        self.assertEqual(topic.state_topic, TEST_SWITCH_TOPIC_STATE)
+        self.assertEqual(topic.set_topic, TEST_SWITCH_TOPIC_SET)
+        self.assertEqual(topic.connected_topic, TEST_SWITICH_TOPIC_CONNECTED)
+
+        # related topics of commands and availability are built only once
+        self.assertIs(topic.set_topic, topic.set_topic)
+        self.assertIs(topic.connected_topic, topic.connected_topic)
+
+    def test_cached(self) -> None:
+        """Test the same topic returns the same object and counts hits."""
+        first = parse_topic(TEST_SWITCH_TOPIC_STATE)
+        second = parse_topic(TEST_SWITCH_TOPIC_STATE)
+        parse_topic(TEST_SENSOR_TOPIC_STATE)
+
+        self.assertIs(first, second)
+        self.assertEqual(topic_cache_info().hits, 1)
+        self.assertEqual(topic_cache_info().misses, 2)
+
+    def test_unknown_topic(self) -> None:
+        """Test short and unknown topics have no platform."""
+        short = parse_topic(f"inels/status/{FRAGMENT_TOPIC_CU_ID}")
+        unknown = parse_topic(f"inels/status/{FRAGMENT_TOPIC_CU_ID}/FF/1234")
+
+        self.assertIsNone(short.type)
+        self.assertIsNone(short.platform)
+        self.assertIsNone(short.connected_topic)
+        self.assertEqual(unknown.uid, "1234")
+        self.assertIsNone(unknown.platform)
+        self.assertIsNone(unknown.element)
+
+
+class DeviceValueTest(TestCase):
+    """Testing decoded values."""
+
+    def test_value_types_are_shared(self) -> None:
+        """Test decoded values are instances of predefined slotted classes."""
+        first = DeviceValue(
+            Platform.SWITCH, Element.RFSTI_11B, inels_value="07\n01\n92\n09\n"
+        ).ha_value
+        second = DeviceValue(
+            Platform.SWITCH, Element.RFSTI_11B, inels_value="07\n00\n34\n08\n"
+        ).ha_value
+
+        self.assertIsInstance(first, SwitchTempValue)
+        self.assertIs(type(first), type(second))
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertTrue(first.on)
+        self.assertFalse(second.on)
+
+    def test_decode_bytes_payload(self) -> None:
+        """Test payload from broker is decoded without converting it to str."""
+        value = DeviceValue(
+            Platform.CLIMATE, Element.RFATV_2, inels_value=b"50\n34\n00\n40\n00\n"
+        )
+
+        self.assertEqual(value.ha_value.current, 26.0)
+        self.assertEqual(value.ha_value.required, 32.0)
+        self.assertEqual(value.inels_status_value, "50\n34\n00\n40\n00\n")
+
+    def test_low_cardinality_values_are_shared(self) -> None:
+        """Test repeated payload of switch returns the same decoded value."""
+        get_codec(Element.RFSC_61).cache.clear()
+        hits = value_cache_info().hits
+        first = create_value(Platform.SWITCH, Element.RFSC_61, b"02\n01\n")
+        second = create_value(Platform.SWITCH, Element.RFSC_61, b"02\n01\n")
+        payload = b"50\n34\n00\n40\n00\n"
+        valve = create_value(Platform.CLIMATE, Element.RFATV_2, payload)
+
+        self.assertIs(first, second)
+        self.assertTrue(first.ha_value.on)
+        self.assertIsNot(
+            valve, create_value(Platform.CLIMATE, Element.RFATV_2, payload)
+        )
+        self.assertEqual(value_cache_info().hits, hits + 1)
+
+    def test_encode_from_reverse_tables(self) -> None:
+        """Test brightness is rounded and unknown cover state keeps the last."""
+        light = DeviceValue(
+            Platform.LIGHT, Element.RFDAC_71B, ha_value=57, last_value=0
+        )
+        cover = DeviceValue(
+            Platform.COVER, Element.RFJA_12, ha_value=STOP_DOWN, last_value=STATE_OPEN
+        )
+
+        self.assertEqual(light.inels_status_value, "AA\n0F\n")
+        self.assertEqual(light.inels_set_value, "01 AA 0F")
+        self.assertEqual(light.ha_value, 60)
+        self.assertEqual(cover.inels_status_value, "03\n01\n")
+        self.assertEqual(cover.inels_set_value, "03 00 00")
+        self.assertEqual(cover.ha_value, STATE_OPEN)
+
+    def test_payload_decoded_on_first_read(self) -> None:
+        """Test status payload is decoded once, when a value is read."""
+        decode = Mock(return_value=(26.0, "01 34"))
+        with patch.dict("inelsmqtt.codec._CODECS", {"RFTI-LAZY": Codec(decode)}):
+            value = DeviceValue(Platform.SENSOR, "RFTI-LAZY", inels_value=b"34\n")
+            decode.assert_not_called()
+
+            self.assertEqual(value.ha_value, 26.0)
+            self.assertEqual(value.inels_set_value, "01 34")
+            decode.assert_called_once_with(b"34\n", None)